@@ -0,0 +1,68 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class SlidingWindowLimiter:
+    """
+    Sliding-window counter backed by the shared cache.
+
+    Keeps one counter per fixed window and weights the previous window by
+    how much of it still overlaps the sliding window, so a burst can't
+    double up across a window boundary. Two cache reads + one incr per hit.
+    """
+
+    def __init__(self, scope, limit, window):
+        self.scope = scope
+        self.limit = limit
+        self.window = window    # seconds
+
+    def _key(self, identity, index):
+        digest = hashlib.md5(str(identity).lower().encode()).hexdigest()
+        return f"ratelimit:{self.scope}:{digest}:{index}"
+
+    def _state(self, identity, now):
+        index = int(now // self.window)
+        counts = cache.get_many([self._key(identity, index - 1), self._key(identity, index)])
+        previous = counts.get(self._key(identity, index - 1), 0)
+        current = counts.get(self._key(identity, index), 0)
+        overlap = 1 - (now % self.window) / self.window
+        return index, previous * overlap + current
+
+    def hit(self, identity):
+        """
+        Count one attempt. Returns seconds to wait if the limit is already
+        reached (the attempt is not counted), else 0.
+        """
+        now = time.time()
+        index, used = self._state(identity, now)
+        if used + 1 > self.limit:
+            return max(1, int(self.window - now % self.window))
+
+        key = self._key(identity, index)
+        # Lives two windows so it can still weigh in as "previous"
+        if not cache.add(key, 1, timeout=self.window * 2):
+            try:
+                cache.incr(key)
+            except ValueError:  # expired between add() and incr()
+                cache.set(key, 1, timeout=self.window * 2)
+        return 0
+
+
+def client_ip(request):
+    """
+    The address rate limits are keyed on. X-Forwarded-For is client
+    controlled except for the entries our own proxies append, so with
+    RATELIMIT_TRUSTED_PROXIES = N we take the N-th entry from the right;
+    with 0 (no proxy in front) the header is ignored entirely.
+    """
+    trusted = getattr(settings, "RATELIMIT_TRUSTED_PROXIES", 0)
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+
+    if trusted and forwarded:
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        if len(hops) >= trusted:
+            return hops[-trusted]
+    return request.META.get("REMOTE_ADDR", "")
@@ -1,3 +1,82 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import RequestFactory, TestCase, override_settings
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .ratelimit import SlidingWindowLimiter, client_ip
+
+
+class SlidingWindowLimiterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.limiter = SlidingWindowLimiter("test", limit=3, window=60)
+
+    def hit_at(self, now, identity="a"):
+        with mock.patch("accounts.ratelimit.time.time", return_value=now):
+            return self.limiter.hit(identity)
+
+    def test_blocks_after_limit_with_retry_after(self):
+        for _ in range(3):
+            self.assertEqual(self.hit_at(6000), 0)
+        self.assertEqual(self.hit_at(6010), 50)     # rest of the window
+        self.assertEqual(self.hit_at(6010, "b"), 0)
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(3):
+            self.hit_at(6059)
+        # 15s into the next window 75% of the old count still applies
+        self.assertGreater(self.hit_at(6075), 0)
+        # 45s in only 25% does → 0.75 + 1 ≤ 3
+        self.assertEqual(self.hit_at(6105), 0)
+
+
+class ClientIPTests(TestCase):
+    def request(self, xff=None):
+        extra = {"REMOTE_ADDR": "10.0.0.9"}
+        if xff:
+            extra["HTTP_X_FORWARDED_FOR"] = xff
+        return RequestFactory().get("/", **extra)
+
+    def test_forwarded_for_ignored_without_trusted_proxy(self):
+        self.assertEqual(client_ip(self.request("1.2.3.4")), "10.0.0.9")
+
+    @override_settings(RATELIMIT_TRUSTED_PROXIES=1)
+    def test_uses_entry_appended_by_proxy(self):
+        # The client sent "6.6.6.6"; our proxy appended the real peer
+        self.assertEqual(client_ip(self.request("6.6.6.6, 203.0.113.7")), "203.0.113.7")
+
+    @override_settings(RATELIMIT_TRUSTED_PROXIES=2)
+    def test_too_few_hops_falls_back_to_remote_addr(self):
+        self.assertEqual(client_ip(self.request("203.0.113.7")), "10.0.0.9")
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class SendOTPRateLimitTests(TestCase):
+    URL = reverse("customer-send-otp")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def send(self, email, xff=None):
+        extra = {"HTTP_X_FORWARDED_FOR": xff} if xff else {}
+        return self.client.post(self.URL, {"email": email}, format="json", **extra)
+
+    def test_per_email_limit(self):
+        for _ in range(3):
+            self.assertEqual(self.send("a@example.com").status_code, 200)
+
+        response = self.send("a@example.com")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+    def test_spoofed_forwarded_for_does_not_reset_ip_limit(self):
+        for n in range(10):
+            response = self.send(f"user{n}@example.com", xff=f"198.51.100.{n}")
+            self.assertEqual(response.status_code, 200)
+
+        response = self.send("another@example.com", xff="198.51.100.250")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
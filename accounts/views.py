@@ -1,7 +1,7 @@
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.mail import send_mail
+from django.db import transaction
 from django.conf import settings
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
@@ -17,6 +17,8 @@ import random
 from .models import CustomUser, EmailOTP
 from .serializers import ProfileSerializer
 from .utils import get_tokens_for_user
+from .ratelimit import SlidingWindowLimiter, client_ip
+from jobs.mail import queue_mail
 
 User = get_user_model()
 token_generator = PasswordResetTokenGenerator()
@@ -92,6 +94,15 @@ class ChangePasswordView(APIView):
 
 #         return Response({"message": "OTP has been sent to your email"})
 
+# Bots hammering send-otp shouldn't be able to flood inboxes or the relay
+OTP_EMAIL_LIMIT = SlidingWindowLimiter(
+    "otp-email", getattr(settings, "OTP_EMAIL_RATE", 3), window=10 * 60
+)
+OTP_IP_LIMIT = SlidingWindowLimiter(
+    "otp-ip", getattr(settings, "OTP_IP_RATE", 10), window=10 * 60
+)
+
+
 class CustomerSendOTP(APIView):
     permission_classes = [AllowAny]
 
@@ -101,20 +112,20 @@ class CustomerSendOTP(APIView):
         if not email:
             return Response({"error": "Email is required"}, status=400)
 
+        for limiter, identity in ((OTP_IP_LIMIT, client_ip(request)), (OTP_EMAIL_LIMIT, email)):
+            retry_after = limiter.hit(identity)
+            if retry_after:
+                return Response(
+                    {"error": "Too many OTP requests. Please try again later."},
+                    status=status.HTTP_429_TOO_MANY_REQUESTS,
+                    headers={"Retry-After": str(retry_after)},
+                )
+
         if CustomUser.objects.filter(email=email, is_active=True).exists():
             return Response({"error": "Email already registered"}, status=400)
 
         otp = str(random.randint(100000, 999999))
 
-        EmailOTP.objects.filter(user__email=email).delete()
-
-        customer, _ = CustomUser.objects.get_or_create(
-            email=email,
-            defaults={"is_active": False}
-        )
-
-        EmailOTP.objects.create(user=customer, otp=otp)
-
         subject = "Your OTP Verification Code"
 
         message = f"""
@@ -127,17 +138,20 @@ This OTP is valid for 5 minutes.
 Perfume Store Team
 """
 
-        try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [email],
-                fail_silently=False
+        # OTP row and mail job commit together; the job worker sends it over
+        # its pooled SMTP connection, so this request never waits on SMTP.
+        with transaction.atomic():
+            EmailOTP.objects.filter(user__email=email).delete()
+
+            customer, _ = CustomUser.objects.get_or_create(
+                email=email,
+                defaults={"is_active": False}
             )
-        except Exception as e:
-            print("Email error:", e)
-            return Response({"error": "Email sending failed"}, status=500)
+
+            EmailOTP.objects.create(user=customer, otp=otp)
+
+            # A retried OTP mail is useless once the OTP has expired
+            queue_mail(subject=subject, body=message, to=[email], max_attempts=2)
 
         return Response({"message": "OTP sent successfully"})
 # class CustomerVerifyOTP(APIView):
@@ -307,7 +321,8 @@ class ForgotPasswordView(APIView):
         token = token_generator.make_token(user)
         reset_link = f"{settings.FRONTEND_URL}/reset-password/{uid}/{token}"
 
-        send_mail(subject="Reset your password", message=f"Click the link to reset your password:\n{reset_link}", from_email=settings.DEFAULT_FROM_EMAIL, recipient_list=[email])
+        # Sent by the job worker over its pooled SMTP connection
+        queue_mail(subject="Reset your password", body=f"Click the link to reset your password:\n{reset_link}", to=[email])
         return Response({"message": "Reset link sent to your email"})
 
 
@@ -27,7 +27,10 @@ DEBUG = False
 
 
 import os
+import sys
+
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 DATABASES = {
     "default": dj_database_url.config(
@@ -64,6 +67,7 @@ INSTALLED_APPS = [
     'dashboard',
     
     "orders.apps.OrdersConfig",
+    "jobs",
      
 ]
 
@@ -220,6 +224,57 @@ SIMPLE_JWT = {
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Invoice PDFs: TTF fonts with a ₹ glyph (e.g. DejaVuSans); "Rs." if unset
+INVOICE_FONT = os.environ.get("INVOICE_FONT")
+INVOICE_FONT_BOLD = os.environ.get("INVOICE_FONT_BOLD")
+
+# ======================
+# CACHE
+# ======================
+# default: counters that rely on atomic cache.incr() across processes —
+#   rate limits, dashboard counters, report data versions. Must be shared
+#   by every web and worker process, so production needs REDIS_URL.
+#   LocMemCache (atomic but per-process) is only allowed for DEBUG and
+#   for build steps that neither serve requests nor run jobs.
+# catalog: pre-rendered catalog pages + their version. File-based so
+#   every gunicorn worker on the box shares them; a lost increment there
+#   still changes the version, which is all invalidation needs.
+REDIS_URL = os.environ.get("REDIS_URL")
+NO_SHARED_CACHE_COMMANDS = {"check", "collectstatic", "makemigrations", "migrate", "test"}
+
+if REDIS_URL:
+    DEFAULT_CACHE = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+elif DEBUG or NO_SHARED_CACHE_COMMANDS & set(sys.argv[1:2]):
+    DEFAULT_CACHE = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+else:
+    raise ImproperlyConfigured(
+        "REDIS_URL is not set. Rate limits, dashboard counters and report "
+        "versions need a cache shared by all processes."
+    )
+
+CACHES = {
+    "default": DEFAULT_CACHE,
+    "catalog": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CACHE_DIR", os.path.join(BASE_DIR, "cache")),
+    },
+}
+
+# The test runner gets private in-process caches whatever the environment
+# points at, so tests never touch a shared Redis or the on-disk catalog
+if sys.argv[1:2] == ["test"]:
+    CACHES = {
+        alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": alias}
+        for alias in CACHES
+    }
+
+# Proxies in front of the app that append to X-Forwarded-For (Render's
+# load balancer = 1). 0 → rate limits key on REMOTE_ADDR only.
+RATELIMIT_TRUSTED_PROXIES = int(os.environ.get("RATELIMIT_TRUSTED_PROXIES", 0))
+
 # ======================
 # EMAIL (GMAIL)
 # ======================
@@ -245,7 +300,10 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
 import os
 
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# SMTP with one long-lived connection per worker thread (jobs/mail.py)
+EMAIL_BACKEND = "jobs.mail.PooledSMTPBackend"
+EMAIL_POOL_MAX_IDLE = 30
+EMAIL_POOL_MAX_AGE = 300
 
 EMAIL_HOST = "smtp-relay.brevo.com"
 EMAIL_PORT = 587
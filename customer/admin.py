@@ -1,3 +1,12 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import CustomerStats
+
+
+@admin.register(CustomerStats)
+class CustomerStatsAdmin(admin.ModelAdmin):
+    list_display = ("customer", "order_count", "lifetime_spend", "first_order", "last_order")
+    list_select_related = ("customer",)
+    search_fields = ("customer__email", "customer__name")
+    ordering = ("-lifetime_spend",)
+    raw_id_fields = ("customer",)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from customer.stats import rebuild_customer_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild customer lifetime stats from confirmed orders"
+
+    def handle(self, *args, **options):
+        rows = rebuild_customer_stats()
+        self.stdout.write(f"Rebuilt stats for {rows} customers")
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.21 on 2026-10-18 04:42
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+import django.db.models.deletion
+
+
+def backfill(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    CustomerStats = apps.get_model("customer", "CustomerStats")
+
+    totals = (
+        Order.objects.filter(status="CONFIRMED")
+        .values("customer_id")
+        .annotate(
+            n=Count("id"),
+            spend=Sum("total_amount"),
+            first=Min("created_at"),
+            last=Max("created_at"),
+        )
+    )
+    CustomerStats.objects.bulk_create([
+        CustomerStats(
+            customer_id=t["customer_id"],
+            order_count=t["n"],
+            lifetime_spend=t["spend"] or 0,
+            first_order=t["first"],
+            last_order=t["last"],
+        )
+        for t in totals
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('orders', '0005_report_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerStats',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('lifetime_spend', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('first_order', models.DateTimeField(blank=True, null=True)),
+                ('last_order', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'customer stats',
+                'indexes': [models.Index(fields=['-lifetime_spend'], name='customer_stats_spend_idx'), models.Index(fields=['-order_count'], name='customer_stats_orders_idx'), models.Index(fields=['-last_order'], name='customer_stats_last_idx')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
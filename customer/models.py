@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db import models
+
+
+# =======================
+# 📊 CUSTOMER LIFETIME STATS
+# =======================
+# One row per customer, bumped when an order is confirmed
+# (see customer/signals.py) so listings never aggregate over orders.
+class CustomerStats(models.Model):
+    customer = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats"
+    )
+    order_count = models.PositiveIntegerField(default=0)
+    lifetime_spend = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    first_order = models.DateTimeField(null=True, blank=True)
+    last_order = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "customer stats"
+        indexes = [
+            models.Index(fields=["-lifetime_spend"], name="customer_stats_spend_idx"),
+            models.Index(fields=["-order_count"], name="customer_stats_orders_idx"),
+            models.Index(fields=["-last_order"], name="customer_stats_last_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.customer_id}: {self.order_count} orders"
@@ -3,7 +3,10 @@ from rest_framework import serializers
 from accounts.models import CustomUser
 
 class CustomerSerializer(serializers.ModelSerializer):
+    # Lifetime totals over confirmed orders only (customer/stats.py)
     total_orders = serializers.IntegerField(read_only=True)
+    total_spent = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    last_order = serializers.DateTimeField(read_only=True)
 
     class Meta:
         model = CustomUser
@@ -15,6 +18,8 @@ class CustomerSerializer(serializers.ModelSerializer):
             "address",
             "is_active",
             "total_orders",
+            "total_spent",
+            "last_order",
             "date_joined",
         ]
 
@@ -0,0 +1,11 @@
+from django.dispatch import receiver
+
+from orders.signals import order_confirmed
+from .stats import record_confirmed_order
+
+
+# Sent inside VerifyPayment's transaction → the stats row commits
+# (or rolls back) together with the order's status change.
+@receiver(order_confirmed)
+def update_customer_stats(sender, instance, **kwargs):
+    record_confirmed_order(instance)
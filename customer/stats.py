@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import Greatest, Least
+
+from orders.models import Order
+from .models import CustomerStats
+
+# Lifetime totals (stats rows, the customer list, the customer report and
+# its export) count paid orders only — the same basis as the sales
+# rollup. Pending, failed and cancelled checkouts are not spend.
+COUNTED_STATUS = "CONFIRMED"
+
+
+def record_confirmed_order(order):
+    """Fold one freshly confirmed order into its customer's stats row."""
+    row, _ = CustomerStats.objects.get_or_create(
+        customer_id=order.customer_id,
+        defaults={"first_order": order.created_at, "last_order": order.created_at},
+    )
+    # F() increments → concurrent confirmations can't lose updates
+    CustomerStats.objects.filter(pk=row.pk).update(
+        order_count=F("order_count") + 1,
+        lifetime_spend=F("lifetime_spend") + order.total_amount,
+        first_order=Least("first_order", order.created_at),
+        last_order=Greatest("last_order", order.created_at),
+    )
+
+
+def rebuild_customer_stats():
+    """Recompute every row from confirmed orders."""
+    totals = (
+        Order.objects
+        .filter(status=COUNTED_STATUS)
+        .values("customer_id")
+        .annotate(
+            n=Count("id"),
+            spend=Sum("total_amount"),
+            first=Min("created_at"),
+            last=Max("created_at"),
+        )
+    )
+
+    with transaction.atomic():
+        CustomerStats.objects.all().delete()
+        created = CustomerStats.objects.bulk_create([
+            CustomerStats(
+                customer_id=t["customer_id"],
+                order_count=t["n"],
+                lifetime_spend=t["spend"] or 0,
+                first_order=t["first"],
+                last_order=t["last"],
+            )
+            for t in totals
+        ], batch_size=1000)
+
+    return len(created)
@@ -1,3 +1,110 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from orders.models import Order
+from orders.signals import order_confirmed
+from products.reports import customer_order_totals, customer_report
+from .models import CustomerStats
+from .stats import rebuild_customer_stats
+
+
+class CustomerStatsTests(TestCase):
+    """CustomerStats must always agree with a live aggregate over orders."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = CustomUser.objects.create_user(
+            email="alice@example.com", password="x", name="Alice"
+        )
+        cls.bob = CustomUser.objects.create_user(
+            email="bob@example.com", password="x", name="Bob"
+        )
+
+    def place(self, customer, total, days_ago=0):
+        order = Order.objects.create(
+            customer=customer,
+            ship_name=customer.name,
+            ship_phone="9999999999",
+            ship_address="Somewhere",
+            ship_pincode="600001",
+            total_amount=Decimal(total),
+        )
+        Order.objects.filter(pk=order.pk).update(
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+        order.refresh_from_db()
+        return order
+
+    def confirm(self, order):
+        # What VerifyPaymentView does once the signature checks out
+        Order.objects.filter(pk=order.pk).update(status="CONFIRMED")
+        order.status = "CONFIRMED"
+        order_confirmed.send(sender=Order, instance=order, previous_status="PENDING")
+
+    def live(self):
+        return {
+            user.id: (user.total_orders, user.total_spent or Decimal("0"), user.last_order)
+            for user in customer_order_totals()
+        }
+
+    def stored(self):
+        stats = {s.customer_id: s for s in CustomerStats.objects.all()}
+        return {
+            user_id: (
+                stats[user_id].order_count if user_id in stats else 0,
+                stats[user_id].lifetime_spend if user_id in stats else Decimal("0"),
+                stats[user_id].last_order if user_id in stats else None,
+            )
+            for user_id in self.live()
+        }
+
+    def seed(self):
+        self.confirm(self.place(self.alice, "1000.00", days_ago=30))
+        self.confirm(self.place(self.alice, "250.50", days_ago=2))
+        self.place(self.alice, "999.00")                 # abandoned checkout
+        self.confirm(self.place(self.bob, "400.00", days_ago=5))
+        self.place(self.bob, "50.00", days_ago=1)
+
+    def test_signal_keeps_stats_in_step(self):
+        self.seed()
+
+        self.assertEqual(self.stored(), self.live())
+
+        alice = CustomerStats.objects.get(customer=self.alice)
+        self.assertEqual(alice.order_count, 2)
+        self.assertEqual(alice.lifetime_spend, Decimal("1250.50"))
+        self.assertLess(alice.first_order, alice.last_order)
+
+    def test_pending_orders_are_not_counted(self):
+        self.place(self.bob, "50.00")
+        self.assertFalse(CustomerStats.objects.exists())
+        self.assertEqual(self.live()[self.bob.id][0], 0)
+
+    def test_rebuild_matches_live_aggregate(self):
+        self.seed()
+        CustomerStats.objects.update(order_count=99, lifetime_spend=0)
+
+        self.assertEqual(rebuild_customer_stats(), 2)
+        self.assertEqual(self.stored(), self.live())
+
+    def test_rebuild_command(self):
+        self.seed()
+        CustomerStats.objects.all().delete()
+
+        call_command("rebuild_customer_stats", stdout=StringIO())
+
+        self.assertEqual(self.stored(), self.live())
+
+    def test_all_time_report_matches_ranged_report(self):
+        # All-time reads CustomerStats, a date range aggregates orders
+        self.seed()
+        today = timezone.localdate()
+        ranged = customer_report(str(today - timedelta(days=365)), str(today))
 
-# Create your tests here.
+        self.assertEqual(list(customer_report()), list(ranged))
@@ -1,5 +1,8 @@
 from django.shortcuts import get_object_or_404
-from django.db.models import Count, Q
+from decimal import Decimal
+
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -14,6 +17,15 @@ from .pagination import CustomerPagination
 # =======================
 # 👤 CUSTOMER LIST
 # =======================
+# ?ordering= value → DB ordering (stats columns are indexed)
+CUSTOMER_ORDERING = {
+    "newest": ("-id",),
+    "orders": (F("stats__order_count").desc(nulls_last=True), "-id"),
+    "spend": (F("stats__lifetime_spend").desc(nulls_last=True), "-id"),
+    "recent": (F("stats__last_order").desc(nulls_last=True), "-id"),
+}
+
+
 class CustomerListAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -22,11 +34,21 @@ class CustomerListAPIView(APIView):
             return Response({"error": "Permission denied"}, status=403)
 
         search = request.GET.get("search")
+        ordering = CUSTOMER_ORDERING.get(
+            request.GET.get("ordering"), CUSTOMER_ORDERING["newest"]
+        )
+
+        # Totals come from the one-row-per-customer stats table,
+        # not a COUNT over the orders join
         customers = (
             CustomUser.objects
             .filter(role="CUSTOMER", is_staff=False, is_superuser=False)
-            .annotate(total_orders=Count("orders"))
-            .order_by("-id")
+            .annotate(
+                total_orders=Coalesce("stats__order_count", 0),
+                total_spent=Coalesce("stats__lifetime_spend", Value(Decimal("0"))),
+                last_order=F("stats__last_order"),
+            )
+            .order_by(*ordering)
         )
 
         if search:
@@ -0,0 +1,125 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from orders.models import Order
+from orders.utils.date_range import created_on
+from products.models import Perfume
+from .models import DailySalesRollup
+
+# =====================================
+# DASHBOARD COUNTERS
+# =====================================
+# Totals live in the cache and are nudged by events (order placed /
+# confirmed, customer signed up, perfume stock edited). Money is kept in
+# paise so cache.incr() stays integer. Whenever the reconcile marker has
+# expired (or any key is missing) the next read recomputes everything
+# from the DB, which also corrects any drift from racing updates.
+PREFIX = "dashboard:counter"
+RECONCILE_EVERY = getattr(settings, "DASHBOARD_RECONCILE_EVERY", 10 * 60)   # seconds
+LOW_STOCK = 5
+MARKER = f"{PREFIX}:reconciled"
+
+NAMES = [
+    "total_users",
+    "total_orders",
+    "today_orders",
+    "pending_orders",
+    "total_revenue",
+    "today_revenue",
+    "low_stock_perfumes",
+]
+DAILY = {"today_orders", "today_revenue"}     # one key per local day
+MONEY = {"total_revenue", "today_revenue"}
+
+
+def _key(name, day=None):
+    if name in DAILY:
+        day = day or timezone.localdate()
+        return f"{PREFIX}:{name}:{day.isoformat()}"
+    return f"{PREFIX}:{name}"
+
+
+def _paise(amount):
+    return int((Decimal(amount or 0) * 100).to_integral_value())
+
+
+# =====================================
+# WRITE SIDE (event handlers call these)
+# =====================================
+def incr(name, delta, day=None):
+    """Nudge a counter; a missing key is left for the next reconcile."""
+    if not delta:
+        return
+    try:
+        cache.incr(_key(name, day), delta)
+    except ValueError:
+        pass
+
+
+def incr_money(name, amount, day=None):
+    incr(name, _paise(amount), day)
+
+
+def set_low_stock_count():
+    cache.set(
+        _key("low_stock_perfumes"),
+        Perfume.objects.filter(stock__lt=LOW_STOCK).count(),
+        timeout=None,
+    )
+
+
+def invalidate():
+    """Force the next read to reconcile from the DB."""
+    cache.delete(MARKER)
+
+
+# =====================================
+# READ SIDE
+# =====================================
+def compute_counters():
+    """The DB truth (what DashboardStats used to query every time)."""
+    today = timezone.localdate()
+    rollup = DailySalesRollup.objects.all()
+
+    return {
+        "total_users": CustomUser.objects.filter(
+            is_staff=False,
+            is_superuser=False
+        ).count(),
+        "total_orders": Order.objects.count(),
+        "today_orders": Order.objects.filter(created_on(today)).count(),
+        "pending_orders": Order.objects.filter(status="PENDING").count(),
+        "total_revenue": _paise(rollup.aggregate(revenue=Sum("subtotal"))["revenue"]),
+        "today_revenue": _paise(
+            rollup.filter(date=today).aggregate(revenue=Sum("subtotal"))["revenue"]
+        ),
+        "low_stock_perfumes": Perfume.objects.filter(stock__lt=LOW_STOCK).count(),
+    }
+
+
+def reconcile():
+    values = compute_counters()
+    cache.set_many({_key(name): value for name, value in values.items()}, timeout=None)
+    cache.set(MARKER, True, timeout=RECONCILE_EVERY)
+    return values
+
+
+def get_counters():
+    """One cache round-trip; falls back to reconcile() when stale/missing."""
+    keys = {name: _key(name) for name in NAMES}
+    found = cache.get_many(list(keys.values()) + [MARKER])
+
+    if MARKER in found and all(key in found for key in keys.values()):
+        values = {name: found[key] for name, key in keys.items()}
+    else:
+        values = reconcile()
+
+    return {
+        name: (value / 100 if name in MONEY else value)
+        for name, value in values.items()
+    }
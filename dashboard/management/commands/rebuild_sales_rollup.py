@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.rollup import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily sales rollup from confirmed orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start-date", help="YYYY-MM-DD (default: all time)")
+        parser.add_argument("--end-date", help="YYYY-MM-DD (default: all time)")
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollup(options["start_date"], options["end_date"])
+        self.stdout.write(f"Rebuilt {rows} daily sales rollup rows")
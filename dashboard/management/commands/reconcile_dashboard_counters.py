@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.counters import MONEY, reconcile
+
+
+class Command(BaseCommand):
+    help = "Recompute the cached dashboard counters from the database"
+
+    def handle(self, *args, **options):
+        values = reconcile()
+        self.stdout.write(
+            "Reconciled dashboard counters: "
+            + ", ".join(
+                f"{name}={value / 100 if name in MONEY else value}"
+                for name, value in values.items()
+            )
+        )
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.21 on 2026-10-18 04:32
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    DailySalesRollup = apps.get_model("dashboard", "DailySalesRollup")
+
+    totals = (
+        Order.objects.filter(status="CONFIRMED")
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "payment_mode")
+        .annotate(
+            n=Count("id"),
+            subtotal_sum=Sum("subtotal"),
+            revenue_sum=Sum("total_amount"),
+            cgst_sum=Sum("cgst_total"),
+            sgst_sum=Sum("sgst_total"),
+            discount_sum=Sum("discount_amount"),
+        )
+    )
+    DailySalesRollup.objects.bulk_create([
+        DailySalesRollup(
+            date=t["day"],
+            payment_mode=t["payment_mode"],
+            orders=t["n"],
+            subtotal=t["subtotal_sum"] or 0,
+            revenue=t["revenue_sum"] or 0,
+            cgst=t["cgst_sum"] or 0,
+            sgst=t["sgst_sum"] or 0,
+            discount=t["discount_sum"] or 0,
+        )
+        for t in totals
+    ])
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('orders', '0004_notification_receipts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('payment_mode', models.CharField(max_length=30)),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('subtotal', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cgst', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('sgst', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('discount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'ordering': ['-date', 'payment_mode'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailysalesrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'payment_mode'), name='unique_daily_sales_rollup'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,31 @@
 from django.db import models
 
-# Create your models here.
+
+# ================= DAILY SALES ROLLUP =================
+class DailySalesRollup(models.Model):
+    """
+    Confirmed-order totals per local (IST) day and payment mode.
+    Updated on every confirmation (dashboard/rollup.py); rebuild with
+    `manage.py rebuild_sales_rollup`.
+    """
+    date = models.DateField()
+    payment_mode = models.CharField(max_length=30)
+
+    orders = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cgst = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    sgst = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    discount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "payment_mode"],
+                name="unique_daily_sales_rollup",
+            ),
+        ]
+        ordering = ["-date", "payment_mode"]
+
+    def __str__(self):
+        return f"{self.date} · {self.payment_mode} · {self.orders}"
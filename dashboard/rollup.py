@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from orders.models import Order
+from orders.utils.date_range import created_between
+from .models import DailySalesRollup
+
+
+def record_confirmed_order(order):
+    """Add one freshly confirmed order to its day's rollup row."""
+    row, _ = DailySalesRollup.objects.get_or_create(
+        date=timezone.localdate(order.created_at),
+        payment_mode=order.payment_mode,
+    )
+    # F() increments → concurrent confirmations can't lose updates
+    DailySalesRollup.objects.filter(pk=row.pk).update(
+        orders=F("orders") + 1,
+        subtotal=F("subtotal") + order.subtotal,
+        revenue=F("revenue") + order.total_amount,
+        cgst=F("cgst") + order.cgst_total,
+        sgst=F("sgst") + order.sgst_total,
+        discount=F("discount") + order.discount_amount,
+    )
+
+
+def rebuild_rollup(start_date=None, end_date=None):
+    """Recompute rollup rows from Order (optionally only a date range)."""
+    orders = Order.objects.filter(status="CONFIRMED")
+    rows = DailySalesRollup.objects.all()
+
+    orders = orders.filter(created_between(start_date, end_date))
+    if start_date:
+        rows = rows.filter(date__gte=start_date)
+    if end_date:
+        rows = rows.filter(date__lte=end_date)
+
+    # TruncDate uses the current time zone (Asia/Kolkata) → IST days
+    totals = (
+        orders
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "payment_mode")
+        .annotate(
+            n=Count("id"),
+            subtotal_sum=Sum("subtotal"),
+            revenue_sum=Sum("total_amount"),
+            cgst_sum=Sum("cgst_total"),
+            sgst_sum=Sum("sgst_total"),
+            discount_sum=Sum("discount_amount"),
+        )
+    )
+
+    with transaction.atomic():
+        rows.delete()
+        created = DailySalesRollup.objects.bulk_create([
+            DailySalesRollup(
+                date=t["day"],
+                payment_mode=t["payment_mode"],
+                orders=t["n"],
+                subtotal=t["subtotal_sum"] or 0,
+                revenue=t["revenue_sum"] or 0,
+                cgst=t["cgst_sum"] or 0,
+                sgst=t["sgst_sum"] or 0,
+                discount=t["discount_sum"] or 0,
+            )
+            for t in totals
+        ])
+
+    return len(created)
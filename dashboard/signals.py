@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from orders.models import Order
+from orders.signals import order_confirmed
+from products.models import Perfume
+from . import counters
+from .rollup import record_confirmed_order
+
+User = get_user_model()
+
+
+@receiver(order_confirmed)
+def update_sales_rollup(sender, instance, **kwargs):
+    record_confirmed_order(instance)
+
+
+# =====================================
+# DASHBOARD COUNTERS
+# =====================================
+# Applied on commit so a rolled-back checkout never skews the counters.
+@receiver(order_confirmed)
+def count_confirmed_order(sender, instance, previous_status=None, **kwargs):
+    day = timezone.localdate(instance.created_at)
+
+    def apply():
+        if previous_status == "PENDING":
+            counters.incr("pending_orders", -1)
+        counters.incr_money("total_revenue", instance.subtotal)
+        counters.incr_money("today_revenue", instance.subtotal, day=day)
+
+    transaction.on_commit(apply)
+
+
+@receiver(post_save, sender=Order)
+def count_saved_order(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        day = timezone.localdate(instance.created_at)
+        pending = instance.status == "PENDING"
+
+        def apply():
+            counters.incr("total_orders", 1)
+            counters.incr("today_orders", 1, day=day)
+            if pending:
+                counters.incr("pending_orders", 1)
+
+        transaction.on_commit(apply)
+        return
+
+    # Gateway bookkeeping etc. doesn't move any counter
+    if update_fields and not {"status", "subtotal", "created_at"} & set(update_fields):
+        return
+    transaction.on_commit(counters.invalidate)
+
+
+@receiver(post_delete, sender=Order)
+def count_deleted_order(sender, instance, **kwargs):
+    transaction.on_commit(counters.invalidate)
+
+
+@receiver(post_save, sender=User)
+def count_saved_user(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+
+    if instance.is_staff or instance.is_superuser:
+        if not created:
+            transaction.on_commit(counters.invalidate)   # may just have been promoted
+        return
+
+    if created:
+        transaction.on_commit(lambda: counters.incr("total_users", 1))
+    elif update_fields is None or {"is_staff", "is_superuser"} & set(update_fields):
+        transaction.on_commit(counters.invalidate)
+
+
+@receiver(post_delete, sender=User)
+def count_deleted_user(sender, instance, **kwargs):
+    transaction.on_commit(counters.invalidate)
+
+
+@receiver(post_save, sender=Perfume)
+@receiver(post_delete, sender=Perfume)
+def count_low_stock(sender, instance, **kwargs):
+    transaction.on_commit(counters.set_low_stock_count)
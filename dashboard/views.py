@@ -15,16 +15,17 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from orders.models import Order
+from .models import DailySalesRollup
 
 class OrdersPerDay(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        # Confirmed orders per IST day, straight from the rollup
         data = (
-            Order.objects
-            .annotate(date=TruncDate("created_at"))
+            DailySalesRollup.objects
             .values("date")
-            .annotate(orders=Count("id"))
+            .annotate(orders=Sum("orders"))
             .order_by("date")
         )
         return Response(data)
@@ -71,55 +72,14 @@ from django.db.models import Sum, F
 from accounts.models import CustomUser
 from orders.models import Order, OrderItem
 from products.models import Perfume
+from .counters import get_counters
 
 class DashboardStats(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        today = now().date()
-
-        delivered_orders = Order.objects.filter(status="CONFIRMED")
-
-        total_revenue = (
-            OrderItem.objects
-            .filter(order__in=delivered_orders)
-            .aggregate(
-                revenue=Sum(F("price") * F("quantity"))
-            )["revenue"] or 0
-        )
-
-        today_revenue = (
-            OrderItem.objects
-            .filter(
-                order__in=delivered_orders,
-                order__created_at__date=today
-            )
-            .aggregate(
-                revenue=Sum(F("price") * F("quantity"))
-            )["revenue"] or 0
-        )
-
-        data = {
-            "total_users": CustomUser.objects.filter(
-                is_staff=False,
-                is_superuser=False
-            ).count(),
-
-            "total_orders": Order.objects.count(),
-
-            "today_orders": Order.objects.filter(
-                created_at__date=today
-            ).count(),
-
-            "pending_orders": Order.objects.filter(
-                status="PENDING"
-            ).count(),
-
-            "total_revenue": float(total_revenue),
-            "today_revenue": float(today_revenue),
-
-            "low_stock_perfumes": Perfume.objects.filter(stock__lt=5).count(),
-        }
+        # Event-maintained counters: one cache read (see dashboard/counters.py)
+        data = get_counters()
 
         return Response(data)
 # views.py
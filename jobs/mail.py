@@ -0,0 +1,273 @@
+import logging
+import smtplib
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.smtp import EmailBackend
+
+from .queue import enqueue
+
+# A pooled connection idle longer than this gets a NOOP before reuse;
+# older than MAX_AGE it is replaced outright (relays drop long sessions).
+MAX_IDLE = getattr(settings, "EMAIL_POOL_MAX_IDLE", 30)      # seconds
+MAX_AGE = getattr(settings, "EMAIL_POOL_MAX_AGE", 5 * 60)    # seconds
+
+# Errors that mean "the pooled connection is dead", not "the message is bad"
+BROKEN_CONNECTION = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+logger = logging.getLogger(__name__)
+
+
+# =====================================
+# METRICS
+# =====================================
+class MailMetrics:
+    """In-process send counters + a rolling window of per-message latency."""
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.sent = 0
+            self.failed = 0
+            self.connections_opened = 0
+            self.connection_seconds = 0.0
+            self._latencies.clear()
+
+    def record_connect(self, seconds):
+        with self._lock:
+            self.connections_opened += 1
+            self.connection_seconds += seconds
+
+    def record_send(self, seconds, ok=True):
+        with self._lock:
+            if ok:
+                self.sent += 1
+                self._latencies.append(seconds)
+            else:
+                self.failed += 1
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            data = {
+                "sent": self.sent,
+                "failed": self.failed,
+                "connections_opened": self.connections_opened,
+                "connect_ms_total": round(self.connection_seconds * 1000, 1),
+            }
+
+        def pct(p):
+            if not latencies:
+                return 0.0
+            index = min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))
+            return round(latencies[index] * 1000, 1)
+
+        data.update({
+            "latency_ms_avg": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+            "latency_ms_p50": pct(0.50),
+            "latency_ms_p95": pct(0.95),
+            "latency_ms_max": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        })
+        return data
+
+
+metrics = MailMetrics()
+
+
+def get_mail_metrics():
+    return metrics.snapshot()
+
+
+# =====================================
+# POOLED SMTP BACKEND
+# =====================================
+_pool = threading.local()
+_all_connections = set()     # so the worker can hang up every thread's
+_all_lock = threading.Lock() # connection on shutdown
+
+
+class PooledSMTPBackend(EmailBackend):
+    """
+    SMTP backend that keeps one authenticated connection per thread and
+    reuses it across send_messages() calls, so the TCP + STARTTLS + AUTH
+    handshake is paid once per worker thread instead of once per email.
+
+    close() only detaches from the pooled connection; use
+    close_pooled_connections() to really hang up (worker shutdown).
+    """
+
+    def open(self):
+        if self.connection:
+            return False
+
+        pooled = getattr(_pool, "connection", None)
+        if pooled is not None and self._usable(pooled):
+            self.connection = pooled
+            return False
+
+        _discard_pooled()
+
+        start = time.perf_counter()
+        opened = super().open()
+        if self.connection is None:
+            return opened   # failed silently
+
+        metrics.record_connect(time.perf_counter() - start)
+        _pool.connection = self.connection
+        with _all_lock:
+            _all_connections.add(self.connection)
+        _pool.opened_at = _pool.used_at = time.monotonic()
+        return opened
+
+    def close(self):
+        self.connection = None
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+
+        with self._lock:
+            num_sent = 0
+            pending = list(email_messages)
+            retried = False
+            error = None
+
+            while pending:
+                if self.open() is None or not self.connection:
+                    return num_sent
+
+                try:
+                    while pending:
+                        try:
+                            if self._timed_send(pending[0]):
+                                num_sent += 1
+                        except BROKEN_CONNECTION:
+                            raise
+                        except smtplib.SMTPRecipientsRefused as exc:
+                            # Bad address: this message only, retrying can't help
+                            logger.warning(
+                                "Dropped mail %r: recipients refused %s",
+                                pending[0].subject, exc.recipients,
+                            )
+                        except smtplib.SMTPException as exc:
+                            # Don't let one message sink the rest of the batch;
+                            # report the failure once they're all out
+                            error = error or exc
+                        pending.pop(0)
+                        _pool.used_at = time.monotonic()
+                except BROKEN_CONNECTION:
+                    # Server hung up on the pooled connection: reconnect
+                    # once and carry on with the unsent messages.
+                    self.connection = None
+                    _discard_pooled()
+                    if retried:
+                        if self.fail_silently:
+                            return num_sent
+                        raise
+                    retried = True
+                finally:
+                    self.close()
+
+            if error is not None and not self.fail_silently:
+                raise error
+
+        return num_sent
+
+    def _timed_send(self, message):
+        start = time.perf_counter()
+        fail_silently, self.fail_silently = self.fail_silently, False
+        try:
+            sent = self._send(message)
+        except BROKEN_CONNECTION:
+            metrics.record_send(time.perf_counter() - start, ok=False)
+            raise
+        except smtplib.SMTPException:
+            metrics.record_send(time.perf_counter() - start, ok=False)
+            if not fail_silently:
+                raise
+            return False
+        finally:
+            self.fail_silently = fail_silently
+
+        metrics.record_send(time.perf_counter() - start, ok=sent)
+        return sent
+
+    @staticmethod
+    def _usable(connection):
+        now = time.monotonic()
+        if now - _pool.opened_at > MAX_AGE:
+            return False
+        if now - _pool.used_at <= MAX_IDLE:
+            return True
+        try:
+            return connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+
+def _hang_up(connection):
+    with _all_lock:
+        _all_connections.discard(connection)
+    try:
+        connection.quit()
+    except (smtplib.SMTPException, OSError):
+        connection.close()
+
+
+def _discard_pooled():
+    connection = getattr(_pool, "connection", None)
+    _pool.connection = None
+    if connection is not None:
+        _hang_up(connection)
+
+
+def close_pooled_connections():
+    """Hang up every pooled SMTP connection in this process."""
+    with _all_lock:
+        connections = list(_all_connections)
+    for connection in connections:
+        _hang_up(connection)
+
+
+# =====================================
+# DISPATCH
+# =====================================
+def send_batch(messages, fail_silently=False):
+    """Send several EmailMessages over one connection in one call."""
+    connection = get_connection(fail_silently=fail_silently)
+    return connection.send_messages(messages)
+
+
+def queue_mail(subject, body, to, html=False, from_email=None, **options):
+    """
+    Hand a simple mail to the job worker instead of sending inline.
+    `options` (delay, max_attempts) go to enqueue().
+    """
+    return enqueue(
+        "mail.send",
+        **options,
+        subject=subject,
+        body=body,
+        to=list(to),
+        html=html,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def build_message(subject, body, to, html=False, from_email=None):
+    message = EmailMessage(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=to,
+    )
+    if html:
+        message.content_subtype = "html"
+    return message
@@ -0,0 +1,117 @@
+import socketserver
+import threading
+import time
+
+from django.core.mail import EmailMessage
+from django.core.mail.backends.smtp import EmailBackend
+from django.core.management.base import BaseCommand
+
+from jobs.mail import PooledSMTPBackend, close_pooled_connections, metrics
+
+
+# =====================================
+# LOCAL SMTP STAND-IN
+# =====================================
+class _SinkHandler(socketserver.StreamRequestHandler):
+    """Bare-bones SMTP server: accepts and discards everything."""
+
+    def handle(self):
+        # Stand-in for the TCP + TLS + AUTH round trips of a real relay
+        time.sleep(self.server.handshake_delay)
+        self.server.connections += 1
+        self.reply("220 localhost sink ready")
+
+        in_data = False
+        for raw in self.rfile:
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+
+            if in_data:
+                if line == ".":
+                    in_data = False
+                    self.server.received += 1
+                    self.reply("250 OK queued")
+                continue
+
+            verb = line[:4].upper()
+            if verb == "EHLO":
+                self.reply("250 localhost")
+            elif verb == "RCPT" and any(addr in line for addr in self.server.reject):
+                self.reply("550 No such user")
+            elif verb == "DATA":
+                in_data = True
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:   # HELO, MAIL, RCPT, RSET, NOOP
+                self.reply("250 OK")
+
+    def reply(self, text):
+        self.wfile.write(f"{text}\r\n".encode())
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handshake_delay):
+        super().__init__(("127.0.0.1", 0), _SinkHandler)
+        self.handshake_delay = handshake_delay
+        self.received = 0
+        self.connections = 0
+        self.reject = set()     # recipient addresses answered with 550
+
+
+# =====================================
+# BENCHMARK
+# =====================================
+class Command(BaseCommand):
+    help = "Compare per-message SMTP connections with the pooled backend against a local sink"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=50)
+        parser.add_argument(
+            "--handshake-ms", type=float, default=150,
+            help="Simulated connection setup cost per new connection"
+        )
+
+    def handle(self, *args, **options):
+        count = options["messages"]
+        sink = SMTPSink(options["handshake_ms"] / 1000)
+        threading.Thread(target=sink.serve_forever, daemon=True).start()
+        host, port = sink.server_address
+
+        def backend(cls):
+            return cls(host=host, port=port, username="", password="",
+                       use_tls=False, use_ssl=False, timeout=10)
+
+        messages = [
+            EmailMessage(f"Benchmark {i}", "body", "bench@example.com", ["to@example.com"])
+            for i in range(count)
+        ]
+
+        try:
+            # One connection per email — what EmailMessage.send() did before
+            start = time.perf_counter()
+            for message in messages:
+                backend(EmailBackend).send_messages([message])
+            baseline = time.perf_counter() - start
+
+            metrics.reset()
+            start = time.perf_counter()
+            for message in messages:
+                backend(PooledSMTPBackend).send_messages([message])
+            pooled = time.perf_counter() - start
+            close_pooled_connections()
+        finally:
+            sink.shutdown()
+            sink.server_close()
+
+        stats = metrics.snapshot()
+        self.stdout.write(f"📨 {count} messages per run, sink received {sink.received} in total")
+        self.stdout.write(f"  per-message connections: {baseline * 1000:.0f} ms ({baseline / count * 1000:.1f} ms/msg)")
+        self.stdout.write(f"  pooled connection:       {pooled * 1000:.0f} ms ({pooled / count * 1000:.1f} ms/msg)")
+        self.stdout.write(
+            "  pooled metrics: connections={connections_opened} connect={connect_ms_total}ms "
+            "p50={latency_ms_p50}ms p95={latency_ms_p95}ms max={latency_ms_max}ms".format(**stats)
+        )
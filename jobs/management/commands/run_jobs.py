@@ -0,0 +1,111 @@
+import os
+import socket
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobs.mail import close_pooled_connections, get_mail_metrics
+from jobs.queue import (
+    LEASE, claim_jobs, purge_done_jobs, renew_leases, run_job, requeue_stale_jobs,
+)
+
+
+def _run_in_thread(job):
+    try:
+        return run_job(job)
+    finally:
+        # Each pool thread has its own DB connection
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Run the background job worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=4,
+            help="Maximum jobs running at once"
+        )
+        parser.add_argument(
+            "--poll", type=float, default=1.0,
+            help="Seconds to sleep when the queue is empty"
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Drain the currently due jobs and exit"
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = False
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.stdout.write(f"🔧 Job worker {worker_id} (concurrency={concurrency})")
+
+        running = {}     # future → job id
+        last_stale_check = 0
+        last_purge = 0
+        last_heartbeat = time.monotonic()
+        last_mail_report = time.monotonic()
+        reported_sent = 0
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while not self.stopping:
+                close_old_connections()
+
+                # Heartbeat well inside the lease so long jobs (report
+                # exports) are never mistaken for a dead worker
+                if time.monotonic() - last_heartbeat > LEASE / 4:
+                    renew_leases(worker_id, list(running.values()))
+                    last_heartbeat = time.monotonic()
+
+                if time.monotonic() - last_stale_check > 60:
+                    requeue_stale_jobs()
+                    last_stale_check = time.monotonic()
+
+                if time.monotonic() - last_purge > 60 * 60:
+                    purge_done_jobs()
+                    last_purge = time.monotonic()
+
+                if time.monotonic() - last_mail_report > 60:
+                    reported_sent = self._report_mail(reported_sent)
+                    last_mail_report = time.monotonic()
+
+                free = concurrency - len(running)
+                jobs = claim_jobs(worker_id, free) if free else []
+
+                for job in jobs:
+                    running[pool.submit(_run_in_thread, job)] = job.id
+
+                if running:
+                    done, _ = wait(running, timeout=options["poll"], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del running[future]
+                elif options["once"]:
+                    break
+                else:
+                    time.sleep(options["poll"])
+
+            wait(running)
+
+        close_pooled_connections()
+        self._report_mail(reported_sent)
+        self.stdout.write("👋 Job worker stopped")
+
+    def _report_mail(self, reported_sent):
+        stats = get_mail_metrics()
+        if stats["sent"] + stats["failed"] > reported_sent:
+            self.stdout.write(
+                "📧 mail sent={sent} failed={failed} connections={connections_opened} "
+                "p50={latency_ms_p50}ms p95={latency_ms_p95}ms max={latency_ms_max}ms".format(**stats)
+            )
+        return stats["sent"] + stats["failed"]
+
+    def _stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.21 on 2026-10-18 04:59
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_leases(apps, schema_editor):
+    # Jobs already RUNNING keep the old 15-minute staleness window
+    Job = apps.get_model("jobs", "Job")
+    Job.objects.filter(status="RUNNING", locked_at__isnull=False).update(
+        locked_until=F("locked_at") + timedelta(minutes=15)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'locked_until'], name='job_status_lease_idx'),
+        ),
+        migrations.RunPython(backfill_leases, migrations.RunPython.noop),
+    ]
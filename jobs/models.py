@@ -0,0 +1,66 @@
+from django.db import models
+
+
+# =====================================
+# JOB (durable background work item)
+# =====================================
+class Job(models.Model):
+    STATUS_CHOICES = (
+        ("QUEUED", "Queued"),
+        ("RUNNING", "Running"),
+        ("DONE", "Done"),
+    )
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="QUEUED")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+
+    run_at = models.DateTimeField()
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    # Lease: the worker keeps pushing this forward while the job runs;
+    # once it lapses the worker is presumed dead (see requeue_stale_jobs)
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    # At most one QUEUED/RUNNING job per key (see enqueue(dedupe_key=...))
+    dedupe_key = models.CharField(max_length=100, null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_at"], name="job_status_run_at_idx"),
+            models.Index(fields=["status", "locked_until"], name="job_status_lease_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=models.Q(status__in=["QUEUED", "RUNNING"]),
+                name="job_active_dedupe_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
+
+
+# =====================================
+# DEAD LETTER (jobs that exhausted retries)
+# =====================================
+class DeadLetterJob(models.Model):
+    job_id = models.BigIntegerField()
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField()
+    failed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} #{self.job_id} (dead)"
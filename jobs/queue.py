@@ -0,0 +1,242 @@
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job, DeadLetterJob
+
+MAX_ATTEMPTS = getattr(settings, "JOBS_MAX_ATTEMPTS", 5)
+BACKOFF_BASE = getattr(settings, "JOBS_BACKOFF_BASE", 10)        # seconds
+BACKOFF_MAX = getattr(settings, "JOBS_BACKOFF_MAX", 60 * 60)     # seconds
+LEASE = getattr(settings, "JOBS_LEASE", 2 * 60)                  # seconds
+DONE_RETENTION_DAYS = getattr(settings, "JOBS_DONE_RETENTION_DAYS", 7)
+
+
+# =====================================
+# HANDLER REGISTRY
+# =====================================
+_handlers = {}
+_dead_letter_handlers = {}
+
+
+def job_handler(name):
+    """
+    Register a function as the handler for jobs called `name`.
+    Handlers receive the job payload as keyword arguments.
+    """
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def dead_letter_handler(name):
+    """
+    Register a function called when a `name` job runs out of attempts
+    (handler errors and lost leases alike), with the final error and the
+    payload as keyword arguments. It runs in the dead-lettering
+    transaction, so if it raises the job stays put and is reaped again.
+    """
+    def decorator(func):
+        _dead_letter_handlers[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name):
+    return _handlers.get(name)
+
+
+# =====================================
+# ENQUEUE
+# =====================================
+def enqueue(name, delay=0, max_attempts=MAX_ATTEMPTS, dedupe_key=None, **payload):
+    """
+    Queue a job. With a dedupe_key, returns None instead when a job with
+    that key is already queued or running (enforced by a unique index,
+    so concurrent callers can't both get through).
+    """
+    job = Job(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        dedupe_key=dedupe_key,
+    )
+    if dedupe_key is None:
+        job.save()
+        return job
+
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return None
+    return job
+
+
+def enqueue_many(jobs):
+    """jobs: iterable of (name, payload) → one INSERT."""
+    now = timezone.now()
+    return Job.objects.bulk_create([
+        Job(name=name, payload=payload, max_attempts=MAX_ATTEMPTS, run_at=now)
+        for name, payload in jobs
+    ])
+
+
+# =====================================
+# WORKER SIDE
+# =====================================
+def backoff_seconds(attempts):
+    return min(BACKOFF_BASE * (2 ** (attempts - 1)), BACKOFF_MAX)
+
+
+def claim_jobs(worker_id, limit):
+    """
+    Claim up to `limit` due jobs. Each claim is a conditional UPDATE, so
+    two workers can never run the same job (works on SQLite too).
+    """
+    now = timezone.now()
+    candidate_ids = list(
+        Job.objects
+        .filter(status="QUEUED", run_at__lte=now)
+        .order_by("run_at", "id")
+        .values_list("id", flat=True)[:limit * 2]
+    )
+
+    claimed = []
+    for job_id in candidate_ids:
+        if len(claimed) >= limit:
+            break
+        updated = Job.objects.filter(id=job_id, status="QUEUED").update(
+            status="RUNNING",
+            locked_at=now,
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=LEASE),
+        )
+        if updated:
+            claimed.append(job_id)
+
+    return list(Job.objects.filter(id__in=claimed).order_by("run_at", "id"))
+
+
+def renew_leases(worker_id, job_ids):
+    """Heartbeat: extend the lease on jobs this worker is still running."""
+    if not job_ids:
+        return 0
+    return Job.objects.filter(
+        id__in=job_ids, status="RUNNING", locked_by=worker_id
+    ).update(locked_until=timezone.now() + timedelta(seconds=LEASE))
+
+
+def requeue_stale_jobs():
+    """
+    Jobs whose lease lapsed belong to a worker that died mid-run (OOM,
+    kill -9). That run counts as a failed attempt: the job is retried
+    with backoff, or dead-lettered once max_attempts is reached, so a
+    job that keeps crashing its worker can't loop forever.
+    """
+    reaped = 0
+    stale = Job.objects.filter(status="RUNNING", locked_until__lt=timezone.now())
+
+    for job in stale:
+        # Conditional on the lease we saw, so concurrent reapers (or a
+        # late heartbeat) can't double-count the same crash
+        taken = Job.objects.filter(
+            id=job.id,
+            status="RUNNING",
+            locked_by=job.locked_by,
+            locked_until=job.locked_until,
+        ).update(attempts=F("attempts") + 1, locked_until=None)
+        if not taken:
+            continue
+
+        job.refresh_from_db()
+        fail_job(job, f"Worker {job.locked_by or '?'} lost the job (lease expired)")
+        reaped += 1
+
+    return reaped
+
+
+def _owned(job):
+    """This run's claim on the job — gone once the lease is reaped."""
+    return Job.objects.filter(
+        id=job.id,
+        status="RUNNING",
+        locked_by=job.locked_by,
+        locked_at=job.locked_at,
+    )
+
+
+def run_job(job):
+    handler = get_handler(job.name)
+    job.attempts += 1
+
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job '{job.name}'")
+        handler(**job.payload)
+    except Exception:
+        fail_job(job, traceback.format_exc())
+        return False
+
+    # Conditional: if the lease was reaped meanwhile the job is already
+    # re-queued (or dead-lettered) and its new state must not be clobbered
+    job.status = "DONE"
+    job.finished_at = timezone.now()
+    job.last_error = ""
+    return bool(_owned(job).update(
+        status=job.status,
+        attempts=job.attempts,
+        finished_at=job.finished_at,
+        last_error=job.last_error,
+    ))
+
+
+def fail_job(job, error):
+    if job.attempts >= job.max_attempts:
+        with transaction.atomic():
+            if not _owned(job).delete()[0]:
+                return      # reaped and handled elsewhere
+            DeadLetterJob.objects.create(
+                job_id=job.id,
+                name=job.name,
+                payload=job.payload,
+                attempts=job.attempts,
+                error=error,
+                created_at=job.created_at,
+            )
+            on_dead = _dead_letter_handlers.get(job.name)
+            if on_dead is not None:
+                on_dead(error=error, **job.payload)
+        return
+
+    claim = _owned(job)
+    job.status = "QUEUED"
+    job.last_error = error
+    job.locked_at = None
+    job.locked_by = ""
+    job.locked_until = None
+    job.run_at = timezone.now() + timedelta(seconds=backoff_seconds(job.attempts))
+    claim.update(
+        status=job.status,
+        attempts=job.attempts,
+        last_error=job.last_error,
+        locked_at=None,
+        locked_by="",
+        locked_until=None,
+        run_at=job.run_at,
+    )
+
+
+# =====================================
+# RETENTION
+# =====================================
+def purge_done_jobs(older_than_days=DONE_RETENTION_DAYS):
+    """Delete finished jobs past retention; returns how many."""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    deleted, _ = Job.objects.filter(status="DONE", finished_at__lt=cutoff).delete()
+    return deleted
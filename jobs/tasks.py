@@ -0,0 +1,10 @@
+from .mail import build_message, send_batch
+from .queue import job_handler
+
+
+# =========================
+# 📧 Queued transactional mail
+# =========================
+@job_handler("mail.send")
+def send_mail_job(subject, body, to, html=False, from_email=None):
+    send_batch([build_message(subject, body, to, html=html, from_email=from_email)])
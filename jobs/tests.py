@@ -0,0 +1,337 @@
+import smtplib
+import socket
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core.mail import EmailMessage
+from django.core.mail.backends.smtp import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs import queue
+from jobs.mail import (
+    PooledSMTPBackend, close_pooled_connections, get_mail_metrics, metrics,
+    send_batch, _pool as mail_pool,
+)
+from jobs.management.commands.mail_benchmark import SMTPSink
+from jobs.models import DeadLetterJob, Job
+from jobs.queue import (
+    backoff_seconds, claim_jobs, enqueue, job_handler, purge_done_jobs,
+    renew_leases, requeue_stale_jobs, run_job,
+)
+
+calls = []
+
+
+@job_handler("tests.ok")
+def ok_job(**payload):
+    calls.append(payload)
+
+
+@job_handler("tests.boom")
+def boom_job(**payload):
+    raise RuntimeError("boom")
+
+
+# =====================================
+# CLAIMING
+# =====================================
+class ClaimJobsTests(TestCase):
+    def test_claimed_job_is_not_handed_out_twice(self):
+        job = enqueue("tests.ok")
+
+        first = claim_jobs("worker-a", 10)
+        second = claim_jobs("worker-b", 10)
+
+        self.assertEqual([j.id for j in first], [job.id])
+        self.assertEqual(second, [])
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "RUNNING")
+        self.assertEqual(job.locked_by, "worker-a")
+        self.assertGreater(job.locked_until, timezone.now())
+
+    def test_future_jobs_are_not_claimed(self):
+        enqueue("tests.ok", delay=60)
+        self.assertEqual(claim_jobs("worker-a", 10), [])
+
+    def test_limit(self):
+        for _ in range(3):
+            enqueue("tests.ok")
+        self.assertEqual(len(claim_jobs("worker-a", 2)), 2)
+        self.assertEqual(len(claim_jobs("worker-b", 2)), 1)
+
+    def test_dedupe_key_allows_one_active_job(self):
+        first = enqueue("tests.ok", dedupe_key="tests.ok:1")
+        self.assertIsNone(enqueue("tests.ok", dedupe_key="tests.ok:1"))
+
+        [job] = claim_jobs("worker-a", 10)
+        self.assertIsNone(enqueue("tests.ok", dedupe_key="tests.ok:1"))
+
+        # Once it's finished the key is free again
+        run_job(job)
+        self.assertNotEqual(enqueue("tests.ok", dedupe_key="tests.ok:1").id, first.id)
+
+
+# =====================================
+# RUNNING / RETRIES
+# =====================================
+class RunJobTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_success(self):
+        enqueue("tests.ok", order_id=7)
+        [job] = claim_jobs("worker-a", 1)
+
+        self.assertTrue(run_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "DONE")
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(calls, [{"order_id": 7}])
+
+    def test_failure_backs_off(self):
+        enqueue("tests.boom")
+        [job] = claim_jobs("worker-a", 1)
+
+        before = timezone.now()
+        self.assertFalse(run_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "QUEUED")
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("RuntimeError: boom", job.last_error)
+        self.assertEqual(job.locked_by, "")
+        self.assertIsNone(job.locked_until)
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=backoff_seconds(1)))
+
+        # Not due again until the backoff passes
+        self.assertEqual(claim_jobs("worker-a", 1), [])
+
+    def test_backoff_doubles_and_caps(self):
+        self.assertEqual(backoff_seconds(2), 2 * backoff_seconds(1))
+        self.assertEqual(backoff_seconds(50), queue.BACKOFF_MAX)
+
+    def test_dead_letter_at_max_attempts(self):
+        job = enqueue("tests.boom", max_attempts=2, order_id=7)
+
+        for _ in range(2):
+            Job.objects.filter(id=job.id).update(run_at=timezone.now())
+            [claimed] = claim_jobs("worker-a", 1)
+            run_job(claimed)
+
+        self.assertFalse(Job.objects.filter(id=job.id).exists())
+        dead = DeadLetterJob.objects.get(job_id=job.id)
+        self.assertEqual(dead.attempts, 2)
+        self.assertEqual(dead.payload, {"order_id": 7})
+        self.assertIn("RuntimeError: boom", dead.error)
+
+    def test_unknown_handler_fails(self):
+        enqueue("tests.missing", max_attempts=1)
+        [job] = claim_jobs("worker-a", 1)
+
+        self.assertFalse(run_job(job))
+        self.assertIn("No handler", DeadLetterJob.objects.get().error)
+
+
+# =====================================
+# LEASES
+# =====================================
+class LeaseTests(TestCase):
+    def expire(self, job):
+        Job.objects.filter(id=job.id).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_renewed_lease_is_not_reaped(self):
+        enqueue("tests.ok")
+        [job] = claim_jobs("worker-a", 1)
+        self.expire(job)
+
+        self.assertEqual(renew_leases("worker-a", [job.id]), 1)
+        self.assertEqual(requeue_stale_jobs(), 0)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "RUNNING")
+
+    def test_other_worker_cannot_renew(self):
+        enqueue("tests.ok")
+        [job] = claim_jobs("worker-a", 1)
+        self.assertEqual(renew_leases("worker-b", [job.id]), 0)
+
+    def test_expired_lease_counts_as_attempt(self):
+        enqueue("tests.ok")
+        [job] = claim_jobs("worker-a", 1)
+        self.expire(job)
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "QUEUED")
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.locked_by, "")
+        self.assertIsNone(job.locked_until)
+        self.assertIn("lease expired", job.last_error)
+        self.assertGreater(job.run_at, timezone.now())
+
+    def test_finish_after_reap_does_not_clobber_retry(self):
+        enqueue("tests.ok")
+        [job] = claim_jobs("worker-a", 1)
+        self.expire(job)
+        requeue_stale_jobs()
+
+        # The "dead" worker was only slow and finishes afterwards
+        self.assertFalse(run_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "QUEUED")
+        self.assertEqual(job.attempts, 1)
+
+    def test_finish_after_dead_letter_is_harmless(self):
+        enqueue("tests.ok", max_attempts=1)
+        [job] = claim_jobs("worker-a", 1)
+        self.expire(job)
+        requeue_stale_jobs()
+
+        self.assertFalse(run_job(job))
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(DeadLetterJob.objects.count(), 1)
+
+    def test_failure_after_reap_is_not_counted_twice(self):
+        enqueue("tests.boom")
+        [job] = claim_jobs("worker-a", 1)
+        self.expire(job)
+        requeue_stale_jobs()
+
+        run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("lease expired", job.last_error)
+
+    def test_job_that_keeps_crashing_is_dead_lettered(self):
+        job = enqueue("tests.ok", max_attempts=3)
+
+        for _ in range(3):
+            Job.objects.filter(id=job.id).update(run_at=timezone.now())
+            [claimed] = claim_jobs("worker-a", 1)
+            self.expire(claimed)
+            requeue_stale_jobs()
+
+        self.assertFalse(Job.objects.filter(id=job.id).exists())
+        self.assertEqual(DeadLetterJob.objects.get(job_id=job.id).attempts, 3)
+
+
+# =====================================
+# POOLED SMTP
+# =====================================
+class PooledSMTPBackendTests(TestCase):
+    """Against the mail_benchmark SMTP sink on a local port."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.sink = SMTPSink(handshake_delay=0)
+        threading.Thread(target=cls.sink.serve_forever, daemon=True).start()
+        cls.host, cls.port = cls.sink.server_address
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sink.shutdown()
+        cls.sink.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        close_pooled_connections()
+        self.addCleanup(close_pooled_connections)
+        metrics.reset()
+        self.sink.received = self.sink.connections = 0
+        self.sink.reject = set()
+
+    def backend(self, fail_silently=False):
+        return PooledSMTPBackend(
+            host=self.host, port=self.port, username="", password="",
+            use_tls=False, use_ssl=False, timeout=10, fail_silently=fail_silently,
+        )
+
+    def messages(self, *recipients):
+        return [EmailMessage("Hi", "body", "shop@example.com", [to]) for to in recipients]
+
+    def wait_for_sink(self, received):
+        # The sink counts a message after replying, on its own thread
+        deadline = time.monotonic() + 5
+        while self.sink.received < received and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.sink.received, received)
+
+    def test_connection_reused_across_sends(self):
+        for _ in range(3):
+            self.assertEqual(self.backend().send_messages(self.messages("a@example.com")), 1)
+
+        self.wait_for_sink(3)
+        self.assertEqual(self.sink.connections, 1)
+        self.assertEqual(get_mail_metrics()["connections_opened"], 1)
+
+    def test_reconnects_after_server_hang_up(self):
+        self.backend().send_messages(self.messages("a@example.com"))
+        mail_pool.connection.sock.shutdown(socket.SHUT_RDWR)
+
+        sent = self.backend().send_messages(self.messages("b@example.com", "c@example.com"))
+
+        self.assertEqual(sent, 2)
+        self.wait_for_sink(3)
+        self.assertEqual(self.sink.connections, 2)
+
+    def test_bad_recipient_does_not_drop_batch(self):
+        self.sink.reject = {"bad@example.com"}
+
+        with self.assertLogs("jobs.mail", "WARNING") as logs:
+            sent = self.backend().send_messages(
+                self.messages("a@example.com", "bad@example.com", "b@example.com")
+            )
+
+        self.assertEqual(sent, 2)
+        self.wait_for_sink(2)
+        self.assertEqual(get_mail_metrics()["failed"], 1)
+        self.assertIn("bad@example.com", logs.output[0])
+
+    def test_transient_failure_reported_after_batch(self):
+        error = smtplib.SMTPDataError(451, b"Try again later")
+        with mock.patch.object(EmailBackend, "_send", side_effect=[error, True, True]):
+            with self.assertRaises(smtplib.SMTPDataError):
+                self.backend().send_messages(self.messages("a@", "b@", "c@"))
+
+        with mock.patch.object(EmailBackend, "_send", side_effect=[error, True]) as send:
+            self.assertEqual(self.backend(fail_silently=True).send_messages(self.messages("a@", "b@")), 1)
+        self.assertEqual(send.call_count, 2)
+
+    def test_send_batch_uses_configured_backend(self):
+        with override_settings(
+            EMAIL_BACKEND="jobs.mail.PooledSMTPBackend",
+            EMAIL_HOST=self.host, EMAIL_PORT=self.port,
+            EMAIL_HOST_USER="", EMAIL_HOST_PASSWORD="", EMAIL_USE_TLS=False,
+        ):
+            sent = send_batch(self.messages("a@example.com", "b@example.com"))
+
+        self.assertEqual(sent, 2)
+        self.wait_for_sink(2)
+        self.assertEqual(self.sink.connections, 1)
+
+
+# =====================================
+# RETENTION
+# =====================================
+class PurgeDoneJobsTests(TestCase):
+    def test_only_old_finished_jobs_are_deleted(self):
+        for _ in range(3):
+            enqueue("tests.ok")
+        done = claim_jobs("worker-a", 2)
+        for job in done:
+            run_job(job)
+        Job.objects.filter(id=done[0].id).update(finished_at=timezone.now() - timedelta(days=30))
+
+        self.assertEqual(purge_done_jobs(), 1)
+        self.assertEqual(Job.objects.count(), 2)
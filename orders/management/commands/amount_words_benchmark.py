@@ -0,0 +1,66 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from orders.utils.amount_to_words import amount_to_words
+
+
+def _num2words_amount(amount):
+    """The previous implementation, kept here as the baseline."""
+    from num2words import num2words
+
+    rupees = int(amount)
+    paise = int((amount - rupees) * 100)
+
+    words = num2words(rupees, lang="en_IN").replace(",", "").title()
+    text = f"Indian Rupees {words}"
+
+    if paise > 0:
+        text += f" And {num2words(paise).title()} Paise"
+
+    return text + " Only"
+
+
+# =====================================
+# BENCHMARK
+# =====================================
+class Command(BaseCommand):
+    help = "Time amount_to_words against the old num2words path"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--amounts", type=int, default=2_000,
+            help="Distinct amounts; keep under the LRU size (4096) for warm-cache numbers"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5,
+            help="Passes over the same amounts (later passes hit the LRU cache)"
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        amounts = [
+            Decimal(rng.randrange(10 ** rng.randint(2, 9))) + Decimal(rng.randrange(100)) / 100
+            for _ in range(options["amounts"])
+        ]
+
+        def timed(func):
+            start = time.perf_counter()
+            for amount in amounts:
+                func(amount)
+            return time.perf_counter() - start
+
+        baseline = timed(_num2words_amount)
+
+        amount_to_words.cache_clear()
+        cold = timed(amount_to_words)
+        warm = min(timed(amount_to_words) for _ in range(max(1, options["repeat"] - 1)))
+
+        per_call = lambda seconds: seconds / len(amounts) * 1_000_000   # µs
+        self.stdout.write(f"🔢 {len(amounts)} amounts")
+        self.stdout.write(f"  num2words:          {baseline * 1000:.0f} ms ({per_call(baseline):.1f} µs/call)")
+        self.stdout.write(f"  tables, cold cache: {cold * 1000:.0f} ms ({per_call(cold):.1f} µs/call)")
+        self.stdout.write(f"  tables, warm cache: {warm * 1000:.0f} ms ({per_call(warm):.2f} µs/call)")
+        self.stdout.write(f"  cache: {amount_to_words.cache_info()}")
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.models import Order
+from dashboard.counters import invalidate as invalidate_dashboard_counters
+from products.cache import bump_report_days
+
+
+class Command(BaseCommand):
+    help = "Cancel checkouts whose payment gateway order was never created"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--minutes", type=int, default=30)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options["minutes"])
+
+        stale = Order.objects.filter(
+            status="PENDING",
+            gateway_status__in=["PENDING", "CREATING", "FAILED"],
+            razorpay_order_id__isnull=True,
+            created_at__lt=cutoff,
+        )
+        days = list(stale.dates("created_at", "day"))    # local dates
+        cancelled = stale.update(status="CANCELLED")
+
+        if cancelled:
+            # .update() skips post_save, so invalidate the reports covering
+            # those days and the dashboard counters here
+            bump_report_days(days)
+            invalidate_dashboard_counters()
+
+        self.stdout.write(f"Cancelled {cancelled} failed checkouts")
@@ -0,0 +1,87 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from orders.models import Order
+from orders.utils.date_range import created_between
+from orders.utils.generate_invoice_pdf import remove_stale_invoices_on_commit
+from orders.utils.render_worker import init_render_worker, render_invoice_for_id
+
+BATCH_SIZE = 500   # Order rows recorded per bulk UPDATE
+
+
+class Command(BaseCommand):
+    help = "Re-render confirmed orders' invoice PDFs across a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start-date", help="YYYY-MM-DD (default: all time)")
+        parser.add_argument("--end-date", help="YYYY-MM-DD (default: all time)")
+        parser.add_argument(
+            "--missing", action="store_true",
+            help="Only orders with no recorded invoice"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help="Render processes"
+        )
+
+    def handle(self, *args, **options):
+        orders = (
+            Order.objects
+            .filter(status="CONFIRMED")
+            .filter(created_between(options["start_date"], options["end_date"]))
+        )
+        if options["missing"]:
+            orders = orders.filter(invoice_pdf="")
+
+        ids = list(orders.order_by("id").values_list("id", flat=True))
+        if not ids:
+            self.stdout.write("No invoices to render")
+            return
+
+        # Forked workers must not share the parent's DB connection
+        connections.close_all()
+
+        workers = max(1, options["workers"])
+        pending, failed, done = [], {}, 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_render_worker) as pool:
+            futures = {pool.submit(render_invoice_for_id, order_id): order_id for order_id in ids}
+            for future in as_completed(futures):
+                try:
+                    order_id, name, digest = future.result()
+                except Exception as exc:
+                    # One bad order must not lose the renders already done
+                    failed[futures[future]] = exc
+                    continue
+
+                pending.append(Order(
+                    id=order_id,
+                    invoice_pdf=name,
+                    invoice_hash=digest,
+                    invoice_rendered_at=timezone.now(),
+                ))
+                if len(pending) >= BATCH_SIZE:
+                    done += self._record(pending)
+
+        done += self._record(pending)
+        self.stdout.write(f"Rendered {done} invoices with {workers} workers")
+
+        if failed:
+            for order_id in sorted(failed):
+                self.stderr.write(f"Order {order_id}: {failed[order_id]!r}")
+            raise CommandError(
+                f"{len(failed)} invoices failed to render: "
+                + ", ".join(str(order_id) for order_id in sorted(failed))
+            )
+
+    def _record(self, pending):
+        Order.objects.bulk_update(
+            pending, ["invoice_pdf", "invoice_hash", "invoice_rendered_at"]
+        )
+        remove_stale_invoices_on_commit({o.id: o.invoice_pdf.name for o in pending})
+        count = len(pending)
+        pending.clear()
+        return count
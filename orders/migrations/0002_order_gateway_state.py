@@ -0,0 +1,34 @@
+# Generated by Django 4.2.21 on 2026-10-18 04:25
+
+from django.db import migrations, models
+
+
+def mark_existing_gateway_orders(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    Order.objects.filter(razorpay_order_id__isnull=False).update(gateway_status="CREATED")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='gateway_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='gateway_error',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='gateway_status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('CREATED', 'Created'), ('FAILED', 'Failed')], default='PENDING', max_length=10),
+        ),
+        migrations.RunPython(mark_existing_gateway_orders, migrations.RunPython.noop),
+    ]
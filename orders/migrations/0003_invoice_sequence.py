@@ -0,0 +1,55 @@
+# Generated by Django 4.2.21 on 2026-10-18 04:26
+
+from django.db import migrations, models
+
+
+def seed_invoice_sequence(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    InvoiceSequence = apps.get_model("orders", "InvoiceSequence")
+
+    last = (
+        Order.objects
+        .exclude(invoice_number="")
+        .order_by("-id")
+        .values_list("invoice_number", flat=True)
+        .first()
+    )
+    try:
+        next_value = int(last.split("-")[1]) + 1
+    except (AttributeError, IndexError, ValueError):
+        next_value = 1
+
+    InvoiceSequence.objects.update_or_create(
+        name="invoice",
+        defaults={"next_value": next_value},
+    )
+
+    # PostgreSQL gets a native sequence (see orders/utils/invoice_number.py)
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE SEQUENCE IF NOT EXISTS orders_invoice_number_seq START WITH %s"
+            % int(next_value)
+        )
+
+
+def drop_invoice_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP SEQUENCE IF EXISTS orders_invoice_number_seq")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_gateway_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceSequence',
+            fields=[
+                ('name', models.CharField(max_length=30, primary_key=True, serialize=False)),
+                ('next_value', models.PositiveBigIntegerField(default=1)),
+            ],
+        ),
+        migrations.RunPython(seed_invoice_sequence, drop_invoice_sequence),
+    ]
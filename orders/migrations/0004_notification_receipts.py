@@ -0,0 +1,52 @@
+# Generated by Django 4.2.21 on 2026-10-18 04:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_read_state(apps, schema_editor):
+    # Old rows were one-per-admin: each becomes its own event + receipt
+    Notification = apps.get_model("orders", "Notification")
+    NotificationReceipt = apps.get_model("orders", "NotificationReceipt")
+
+    NotificationReceipt.objects.bulk_create([
+        NotificationReceipt(notification_id=n.id, admin_id=n.admin_id, is_read=n.is_read)
+        for n in Notification.objects.all().only("id", "admin_id", "is_read")
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0003_invoice_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_read', models.BooleanField(default=False)),
+                ('admin', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('notification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='orders.notification')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['admin', 'is_read'], name='notif_receipt_admin_read_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='notificationreceipt',
+            constraint=models.UniqueConstraint(fields=('notification', 'admin'), name='unique_notification_receipt'),
+        ),
+        migrations.RunPython(copy_read_state, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='notification',
+            name='admin',
+        ),
+        migrations.RemoveField(
+            model_name='notification',
+            name='is_read',
+        ),
+    ]
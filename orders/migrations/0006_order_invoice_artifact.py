@@ -0,0 +1,28 @@
+# Generated by Django 4.2.21 on 2026-10-18 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_report_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='invoice_hash',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='invoice_pdf',
+            field=models.FileField(blank=True, upload_to='invoices/'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='invoice_rendered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.21 on 2026-10-18 05:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_invoice_artifact'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='order',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='admin_notification', to='orders.order'),
+        ),
+    ]
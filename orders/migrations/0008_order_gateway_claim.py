@@ -0,0 +1,23 @@
+# Generated by Django 4.2.21 on 2026-10-18 05:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_notification_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='gateway_claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='gateway_status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('CREATING', 'Creating'), ('CREATED', 'Created'), ('FAILED', 'Failed')], default='PENDING', max_length=10),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models, transaction
+from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from decimal import Decimal
@@ -41,6 +41,18 @@ class Order(models.Model):
     razorpay_payment_id = models.CharField(max_length=100, blank=True, null=True)
     razorpay_signature = models.CharField(max_length=255, blank=True, null=True)
 
+    # Gateway order is created *after* the order commits (two-phase checkout)
+    GATEWAY_STATUS = (
+        ("PENDING", "Pending"),
+        ("CREATING", "Creating"),   # a request holds the claim (see razorpay_order)
+        ("CREATED", "Created"),
+        ("FAILED", "Failed"),
+    )
+    gateway_status = models.CharField(max_length=10, choices=GATEWAY_STATUS, default="PENDING")
+    gateway_claimed_at = models.DateTimeField(null=True, blank=True)
+    gateway_attempts = models.PositiveSmallIntegerField(default=0)
+    gateway_error = models.CharField(max_length=255, blank=True)
+
     # ---------------- AMOUNTS ----------------
     subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     cgst_total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
@@ -55,24 +67,31 @@ class Order(models.Model):
     status = models.CharField(max_length=20, choices=ORDER_STATUS, default="PENDING")
     tracking_number = models.CharField(max_length=100, blank=True, null=True)
 
+    # ---------------- INVOICE ----------------
+    # Rendered once by the orders.render_invoice job after confirmation
+    invoice_pdf = models.FileField(upload_to="invoices/", blank=True)
+    invoice_hash = models.CharField(max_length=16, blank=True)
+    invoice_rendered_at = models.DateTimeField(null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # date-range reports (orders/utils/date_range.py)
+            models.Index(fields=["created_at"], name="order_created_idx"),
+            models.Index(fields=["status", "created_at"], name="order_status_created_idx"),
+        ]
+
     # ---------------- SAVE LOGIC ----------------
     def save(self, *args, **kwargs):
         # Generate Order ID once
         if not self.order_id:
             self.order_id = f"ORD-{uuid.uuid4().hex[:10].upper()}"
 
-        # Generate Invoice Number safely
+        # Generate Invoice Number (sequence allocator, no hot-row lock)
         if not self.invoice_number:
-            with transaction.atomic():
-                last_order = Order.objects.select_for_update().order_by("-id").first()
-                if last_order and last_order.invoice_number:
-                    last_no = int(last_order.invoice_number.split("-")[1])
-                    new_no = last_no + 1
-                else:
-                    new_no = 1
-                self.invoice_number = f"INV-{new_no:03d}"
+            from orders.utils.invoice_number import generate_invoice_number
+            self.invoice_number = generate_invoice_number()
 
         super().save(*args, **kwargs)
 
@@ -87,6 +106,20 @@ class Order(models.Model):
         self.save()
 
 
+# ================= INVOICE SEQUENCE =================
+class InvoiceSequence(models.Model):
+    """
+    Counter row for invoice numbers on databases without native
+    sequences. Processes reserve blocks from it (see
+    orders/utils/invoice_number.py) instead of locking the latest Order.
+    """
+    name = models.CharField(max_length=30, primary_key=True)
+    next_value = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name} → {self.next_value}"
+
+
 # ================= ORDER ITEM =================
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name="items", on_delete=models.CASCADE)
@@ -98,6 +131,12 @@ class OrderItem(models.Model):
     sgst_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
+    class Meta:
+        indexes = [
+            # per-product report joins: order range → its lines by perfume
+            models.Index(fields=["order", "perfume"], name="orderitem_order_perfume_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         base_amount = self.price * self.quantity
         self.cgst_amount = base_amount * Decimal("0.09")
@@ -111,12 +150,42 @@ class OrderItem(models.Model):
 
 # ================= NOTIFICATION MODEL =================
 class Notification(models.Model):
-    admin = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    """One row per event — shared by every admin."""
+    # The order the event is about; unique so a retried job can't insert it twice
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="admin_notification",
+    )
     message = models.CharField(max_length=255)
-    is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return self.message
 
 
+class NotificationReceipt(models.Model):
+    """Per-admin read state for a Notification."""
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.CASCADE,
+        related_name="receipts"
+    )
+    admin = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    is_read = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["notification", "admin"],
+                name="unique_notification_receipt",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["admin", "is_read"], name="notif_receipt_admin_read_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.admin_id} · {self.notification_id}"
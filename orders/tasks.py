@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from channels.layers import get_channel_layer
+from asgiref.sync import async_to_sync
+
+from jobs.models import Job
+from jobs.queue import enqueue, enqueue_many, job_handler
+from .models import Order, Notification, NotificationReceipt
+from .utils.generate_invoice_pdf import render_order_invoice
+from .utils.send_invoice_email import send_invoice_email, send_invoice_email_admin
+from .utils.send_order_email_admin import send_order_email_admin
+
+User = get_user_model()
+
+
+def _load_order(order_id):
+    return (
+        Order.objects
+        .select_related("customer")
+        .prefetch_related("items__perfume")
+        .get(id=order_id)
+    )
+
+
+# =========================
+# 0️⃣ Render Invoice PDF
+# =========================
+# First pipeline stage: the PDF is rendered once and recorded on the
+# Order; the invoice email (and every download) then reads that file.
+@job_handler("orders.render_invoice")
+def render_invoice_job(order_id, send_email=True):
+    render_order_invoice(_load_order(order_id))
+    if send_email:
+        # One job per recipient: retrying a failed send never re-mails the other
+        enqueue_many([
+            ("orders.send_invoice_email", {"order_id": order_id}),
+            ("orders.send_invoice_email_admin", {"order_id": order_id}),
+        ])
+
+
+def queue_invoice_render(order_id):
+    """Render later on the worker (no email), unless a render is already due."""
+    due = Job.objects.filter(
+        name="orders.render_invoice",
+        status__in=["QUEUED", "RUNNING"],
+        payload__order_id=order_id,
+    )
+    if not due.exists():
+        # Keyed, so two downloads racing past the check queue one render
+        enqueue(
+            "orders.render_invoice",
+            dedupe_key=f"orders.render_invoice:{order_id}",
+            order_id=order_id,
+            send_email=False,
+        )
+
+
+# =========================
+# 1️⃣ Invoice Emails (customer, admin copy)
+# =========================
+@job_handler("orders.send_invoice_email")
+def send_invoice_email_job(order_id):
+    send_invoice_email(_load_order(order_id))
+
+
+@job_handler("orders.send_invoice_email_admin")
+def send_invoice_email_admin_job(order_id):
+    send_invoice_email_admin(_load_order(order_id))
+
+
+# =========================
+# 2️⃣ Order Email to Admin
+# =========================
+@job_handler("orders.send_order_email_admin")
+def send_order_email_admin_job(order_id):
+    send_order_email_admin(_load_order(order_id))
+
+
+# =========================
+# 3️⃣ Notify All Admins via WebSocket
+# =========================
+@job_handler("orders.notify_admins")
+def notify_admins_job(order_id):
+    instance = _load_order(order_id)
+
+    # One event row + one bulk insert of per-admin read state. Keyed on the
+    # order, so a retry after a failed broadcast reuses what's there.
+    with transaction.atomic():
+        notification, created = Notification.objects.get_or_create(
+            order=instance,
+            defaults={
+                "message": f"🛒 New order received from {instance.customer.username} - ₹{instance.total_amount}",
+            },
+        )
+        if created:
+            NotificationReceipt.objects.bulk_create([
+                NotificationReceipt(notification=notification, admin_id=admin_id)
+                for admin_id in User.objects.filter(is_staff=True).values_list("id", flat=True)
+            ])
+
+    # One broadcast — every connected admin socket gets it exactly once
+    channel_layer = get_channel_layer()
+    if channel_layer is None:   # no CHANNEL_LAYERS configured
+        return
+
+    async_to_sync(channel_layer.group_send)(
+        "admins",   # MUST match consumer group name
+        {
+            "type": "send_notification",
+            "data": {
+                "id": notification.id,
+                "text": notification.message,
+                "timestamp": notification.created_at.isoformat(),
+            }
+        }
+    )
@@ -1,3 +1,732 @@
-from django.test import TestCase
+import io
+import os
+import random
+import shutil
+import smtplib
+import subprocess
+import sys
+import tempfile
+import unittest
+import zipfile
+from concurrent.futures import Future
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.conf import settings
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from razorpay.errors import BadRequestError
+from reportlab.platypus.doctemplate import LayoutError
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from jobs.models import Job
+from jobs.queue import claim_jobs, run_job
+from orders.management.commands import regenerate_invoices
+from orders.models import InvoiceSequence, Notification, Order, OrderItem
+from orders.signals import order_confirmed
+from orders.tasks import notify_admins_job
+from orders.utils.amount_to_words import amount_to_words
+from orders.utils.date_range import created_between, local_day_bounds
+from orders.utils import generate_invoice_pdf, invoice_zip, razorpay_order, send_invoice_email
+from orders.utils.generate_invoice_pdf import render_order_invoice
+from orders.utils.invoice_number import InvoiceNumberAllocator
+from orders.utils.render_worker import render_invoice_for_id
+from products.models import Perfume
+
+try:
+    from num2words import num2words
+except ImportError:     # reference implementation only needed here
+    num2words = None
+
+
+class LocalDayRangeTests(TestCase):
+    def test_bounds_are_half_open_ist_days(self):
+        start, end = local_day_bounds("2024-03-01", "2024-03-31")
+
+        self.assertEqual(start.isoformat(), "2024-03-01T00:00:00+05:30")
+        self.assertEqual(end.isoformat(), "2024-04-01T00:00:00+05:30")
+
+    def test_open_ended(self):
+        self.assertEqual(local_day_bounds(None, None), (None, None))
+        self.assertEqual(len(created_between("2024-03-01").children), 1)
+
+    def test_invalid_dates_are_validation_errors(self):
+        for value in ("2024-13-01", "foo", "2024-02-30"):
+            with self.assertRaises(ValidationError):
+                created_between(value, "2024-03-01")
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "plan text is SQLite-specific")
+class OrderDateRangePlanTests(TestCase):
+    """
+    Seeds a year of orders and compares query plans: the old
+    `created_at__date__range` cast forces a full scan, the half-open
+    timestamp range is an index range search.
+    """
+
+    DAYS = 365
+    PER_DAY = 8
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = CustomUser.objects.create_user(
+            email="customer@example.com", password="x", name="Customer"
+        )
+        statuses = ["CONFIRMED", "PENDING", "CANCELLED", "CONFIRMED"]
+
+        Order.objects.bulk_create([
+            Order(
+                order_id=f"ORD-P{n:08d}",
+                invoice_number=f"P-{n}",
+                customer=customer,
+                ship_name="Customer",
+                ship_phone="9999999999",
+                ship_address="Somewhere",
+                ship_pincode="600001",
+                status=statuses[n % 4],
+            )
+            for n in range(cls.DAYS * cls.PER_DAY)
+        ], batch_size=1000)
+
+        # created_at is auto_now_add — spread the orders over the year
+        now = timezone.now()
+        ids = list(Order.objects.order_by("id").values_list("id", flat=True))
+        for day in range(cls.DAYS):
+            Order.objects.filter(id__in=ids[day::cls.DAYS]).update(
+                created_at=now - timedelta(days=day, hours=day % 24)
+            )
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        today = timezone.localdate()
+        self.start = today - timedelta(days=30)
+        self.end = today
+
+    def test_date_cast_scans_table(self):
+        plan = Order.objects.filter(
+            created_at__date__range=[self.start, self.end]
+        ).explain()
+        self.assertIn("SCAN", plan)
+        self.assertNotIn("order_created_idx", plan)
+
+    def test_timestamp_range_uses_index(self):
+        plan = Order.objects.filter(created_between(self.start, self.end)).explain()
+        self.assertIn("order_created_idx", plan)
+
+    def test_status_and_range_use_composite_index(self):
+        plan = (
+            Order.objects
+            .filter(created_between(self.start, self.end), status="CONFIRMED")
+            .explain()
+        )
+        self.assertIn("order_status_created_idx", plan)
+
+    def test_same_rows_either_way(self):
+        old = set(
+            Order.objects
+            .filter(created_at__date__range=[self.start, self.end])
+            .values_list("id", flat=True)
+        )
+        new = set(
+            Order.objects
+            .filter(created_between(self.start, self.end))
+            .values_list("id", flat=True)
+        )
+        self.assertTrue(old)
+        self.assertEqual(old, new)
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "native sequence is PostgreSQL-only")
+class PostgresInvoiceSequenceTests(TransactionTestCase):
+    def test_nextval_is_unique_and_survives_rollback(self):
+        first = InvoiceNumberAllocator().next()
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            InvoiceNumberAllocator().next()
+            raise RuntimeError("checkout failed")
+
+        # The rolled-back number is a gap, never handed out again
+        self.assertEqual(InvoiceNumberAllocator().next(), first + 2)
+
+
+@unittest.skipIf(connection.vendor == "postgresql", "PostgreSQL uses a native sequence")
+class InvoiceNumberAllocatorTests(TransactionTestCase):
+    """Outside TestCase's wrapping transaction, so blocks are really reserved."""
+
+    def test_seeds_from_last_issued_number(self):
+        customer = CustomUser.objects.create_user(
+            email="customer@example.com", password="x", name="Customer"
+        )
+        Order.objects.create(
+            order_id="ORD-S00000001",
+            invoice_number="INV-041",
+            customer=customer,
+            ship_name="Customer",
+            ship_phone="9999999999",
+            ship_address="Somewhere",
+            ship_pincode="600001",
+        )
+
+        self.assertEqual(InvoiceNumberAllocator(name="seeded").next(), 42)
+
+    def test_interleaved_allocators_never_overlap(self):
+        # Stand-ins for separate worker processes sharing the counter row
+        allocators = [InvoiceNumberAllocator(name="t", block_size=size) for size in (1, 3, 7)]
+
+        issued = [allocators[n % 3].next() for n in range(200)]
+
+        self.assertEqual(len(set(issued)), len(issued))
+        # Every reserved block came off the counter exactly once
+        reserved = sum(a._end for a in allocators) - sum(a._next for a in allocators)
+        self.assertEqual(
+            InvoiceSequence.objects.get(name="t").next_value - 1,
+            len(issued) + reserved,
+        )
+
+    def test_block_is_served_inside_a_transaction(self):
+        allocator = InvoiceNumberAllocator(name="t", block_size=5)
+        first = allocator.next()
+
+        with mock.patch.object(allocator, "_reserve", wraps=allocator._reserve) as reserve:
+            with transaction.atomic():
+                self.assertEqual([allocator.next() for _ in range(4)], list(range(first + 1, first + 5)))
+                reserve.assert_not_called()
+
+                # Block used up: one number, nothing kept
+                allocator.next()
+                allocator.next()
+            self.assertEqual([c.args for c in reserve.call_args_list], [(1,), (1,)])
+
+    def test_consecutive_reservations_are_disjoint(self):
+        allocator = InvoiceNumberAllocator(name="t")
+        blocks = [allocator._reserve(size) for size in (5, 1, 20, 3)]
+
+        for (_, end), (start, _) in zip(blocks, blocks[1:]):
+            self.assertEqual(start, end)
+
+
+@unittest.skipIf(num2words is None, "num2words not installed")
+class AmountToWordsTests(TestCase):
+    """
+    Randomised property check against num2words (en_IN) — the reference
+    the invoice wording used to come from. num2words tops out below
+    100 crore crore, so that is the sampled range.
+    """
+
+    SAMPLES = 20_000
+    MAX_RUPEES = 10 ** 10
+
+    def reference(self, amount):
+        rupees = int(amount)
+        paise = int((amount - rupees) * 100)
+        words = num2words(rupees, lang="en_IN").replace(",", "").title()
+        text = f"Indian Rupees {words}"
+        if paise > 0:
+            text += f" And {num2words(paise, lang='en_IN').title()} Paise"
+        return text + " Only"
+
+    def amounts(self):
+        rng = random.Random(2024)
+        for _ in range(self.SAMPLES):
+            # Mix magnitudes so lakh/crore boundaries and round numbers show up
+            digits = rng.randint(1, 10)
+            rupees = rng.randrange(10 ** digits) % self.MAX_RUPEES
+            if rng.random() < 0.2:
+                rupees -= rupees % 10 ** rng.randint(1, digits)
+            yield Decimal(rupees) + Decimal(rng.randrange(100)) / 100
+
+    def test_matches_num2words(self):
+        for amount in self.amounts():
+            self.assertEqual(amount_to_words(amount), self.reference(amount), amount)
+
+    def test_group_boundaries(self):
+        for rupees in [0, 1, 100, 1001, 100000, 100001, 1000001, 10000050, 999999999]:
+            amount = Decimal(rupees)
+            self.assertEqual(amount_to_words(amount), self.reference(amount))
+
+    def test_paise(self):
+        self.assertEqual(
+            amount_to_words(Decimal("1234567.05")),
+            "Indian Rupees Twelve Lakh Thirty-Four Thousand Five Hundred And "
+            "Sixty-Seven And Five Paise Only",
+        )
+
+    def test_negative_amounts(self):
+        for rupees in [-5, -100, -100001]:
+            amount = Decimal(rupees)
+            self.assertEqual(amount_to_words(amount), self.reference(amount))
+
+        self.assertEqual(
+            amount_to_words(Decimal("-5.25")),
+            "Indian Rupees Minus Five And Twenty-Five Paise Only",
+        )
+        self.assertEqual(
+            amount_to_words(Decimal("-0.50")),
+            "Indian Rupees Minus Zero And Fifty Paise Only",
+        )
+        self.assertEqual(amount_to_words(Decimal("-0.001")), "Indian Rupees Zero Only")
+
+    def test_num2words_not_imported(self):
+        code = "import sys, orders.utils.amount_to_words; print('num2words' in sys.modules)"
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        )
+        self.assertEqual(out.stdout.strip(), "False")
+
+
+# =====================================
+# INVOICE FILES
+# =====================================
+class InvoiceTestCase(TestCase):
+    """Confirmed orders plus a throwaway MEDIA_ROOT for their PDFs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user(
+            email="admin@example.com", password="x", name="Admin", is_staff=True
+        )
+        cls.customer = CustomUser.objects.create_user(
+            email="customer@example.com", password="x", name="Customer"
+        )
+        Order.objects.bulk_create([
+            Order(
+                order_id=f"ORD-I{n:08d}",
+                invoice_number=f"T-{n}",
+                customer=cls.customer,
+                ship_name="Customer",
+                ship_phone="9999999999",
+                ship_address="Somewhere",
+                ship_pincode="600001",
+                total_amount=Decimal("1180.00"),
+                status="PENDING" if n == 4 else "CONFIRMED",
+            )
+            for n in range(1, 5)
+        ])
+        cls.confirmed = list(Order.objects.filter(status="CONFIRMED").order_by("id"))
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+
+        overrides = override_settings(MEDIA_ROOT=media)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.client = APIClient()
+
+
+def inline_render(order_id):
+    """Stands in for the process pool, which can't see the test database."""
+    future = Future()
+    try:
+        future.set_result(invoice_zip.render_invoice_for_id(order_id))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+
+@mock.patch.object(invoice_zip, "_submit_render", inline_render)
+class AdminInvoiceZipTests(InvoiceTestCase):
+    URL = reverse("admin-invoice-zip")
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+
+    def download(self, **params):
+        today = timezone.localdate().isoformat()
+        params = {"start_date": today, "end_date": today, **params}
+        return self.client.get(self.URL, params)
+
+    def archive(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        return zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+
+    def test_one_entry_per_confirmed_order(self):
+        # One already rendered (read from disk), the rest render on demand
+        render_order_invoice(self.confirmed[0])
+
+        archive = self.archive(self.download())
+
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(
+            sorted(archive.namelist()),
+            sorted(f"Invoice_{order.invoice_number}.pdf" for order in self.confirmed),
+        )
+        for name in archive.namelist():
+            self.assertTrue(archive.read(name).startswith(b"%PDF"))
+
+        # On-demand renders are recorded for next time
+        self.assertFalse(Order.objects.filter(status="CONFIRMED", invoice_pdf="").exists())
+
+    def test_failed_render_is_listed_not_fatal(self):
+        broken = self.confirmed[1]
+        render = invoice_zip.render_invoice_for_id
+
+        def flaky(order_id):
+            if order_id == broken.id:
+                raise RuntimeError("font missing")
+            return render(order_id)
+
+        with mock.patch.object(invoice_zip, "render_invoice_for_id", flaky):
+            archive = self.archive(self.download())
+
+        self.assertIsNone(archive.testzip())
+        self.assertNotIn(f"Invoice_{broken.invoice_number}.pdf", archive.namelist())
+        self.assertEqual(len(archive.namelist()), len(self.confirmed))   # others + manifest
+
+        manifest = archive.read(invoice_zip.MANIFEST_NAME).decode()
+        self.assertIn(f"Invoice_{broken.invoice_number}.pdf: RuntimeError: font missing", manifest)
+
+    def test_renders_in_flight_are_bounded(self):
+        in_flight = []
+
+        def wait(futures, **kwargs):
+            in_flight.append(len(futures))
+            return real_wait(futures, **kwargs)
+
+        real_wait = invoice_zip.wait
+        with mock.patch.object(invoice_zip, "MAX_IN_FLIGHT", 1), \
+                mock.patch.object(invoice_zip, "wait", wait):
+            archive = self.archive(self.download())
+
+        self.assertEqual(len(archive.namelist()), len(self.confirmed))
+        self.assertEqual(in_flight, [1] * len(self.confirmed))
+
+    def test_vanished_file_is_rendered_again_once(self):
+        render_order_invoice(self.confirmed[0])
+        open_pdf = invoice_zip._open_pdf
+        vanished = []
+
+        def flaky(path, arcname):
+            if not vanished:
+                vanished.append(arcname)
+                raise FileNotFoundError(path)
+            return open_pdf(path, arcname)
+
+        with mock.patch.object(invoice_zip, "_open_pdf", flaky):
+            archive = self.archive(self.download())
+
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(vanished, [f"Invoice_{self.confirmed[0].invoice_number}.pdf"])
+        self.assertEqual(
+            sorted(archive.namelist()),
+            sorted(f"Invoice_{order.invoice_number}.pdf" for order in self.confirmed),
+        )
+
+    def test_bad_dates(self):
+        for params in [{"start_date": ""}, {"end_date": "2024-02-30"}, {"start_date": "yesterday"}]:
+            self.assertEqual(self.download(**params).status_code, 400, params)
+
+    def test_admin_only(self):
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.download().status_code, 403)
+
+
+class InvoiceRenderCacheTests(InvoiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.order = Order.objects.get(pk=self.confirmed[0].pk)
+
+    def test_content_hash(self):
+        context = generate_invoice_pdf.invoice_context(self.order)
+        digest = generate_invoice_pdf.content_hash(context)
+        self.assertEqual(generate_invoice_pdf.content_hash(dict(reversed(context.items()))), digest)
+
+        context["ship_name"] = "Someone Else"
+        self.assertNotEqual(generate_invoice_pdf.content_hash(context), digest)
+
+    def test_render_records_file_on_order(self):
+        path = render_order_invoice(self.order)
+
+        with open(path, "rb") as f:
+            self.assertTrue(f.read().startswith(b"%PDF"))
+
+        stored = Order.objects.get(pk=self.order.pk)
+        self.assertEqual(stored.invoice_pdf.name, f"invoices/{self.order.id}-{stored.invoice_hash}.pdf")
+        self.assertIsNotNone(stored.invoice_rendered_at)
+
+    def test_unchanged_order_is_not_rendered_again(self):
+        render_order_invoice(self.order)
+
+        with mock.patch.object(generate_invoice_pdf, "render_invoice") as render:
+            render_order_invoice(Order.objects.get(pk=self.order.pk))
+        render.assert_not_called()
+
+    def test_old_render_removed_only_after_commit(self):
+        old = render_order_invoice(self.order)
+
+        Order.objects.filter(pk=self.order.pk).update(ship_name="Someone Else")
+        with self.captureOnCommitCallbacks() as callbacks:
+            new = render_order_invoice(Order.objects.get(pk=self.order.pk))
+
+            # A download that already resolved the old path can still read it
+            self.assertNotEqual(old, new)
+            self.assertTrue(os.path.exists(old))
+
+        for callback in callbacks:
+            callback()
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(new))
+
+    def test_download_rerenders_missing_file(self):
+        os.remove(render_order_invoice(self.order))
+
+        self.client.force_authenticate(self.customer)
+        response = self.client.get(reverse("order-invoice-pdf", args=[self.order.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+
+
+class InlineExecutor:
+    """ProcessPoolExecutor stand-in that runs each task on submit."""
+
+    def __init__(self, max_workers=None, initializer=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+
+@mock.patch.object(regenerate_invoices, "connections", mock.Mock())
+@mock.patch.object(regenerate_invoices, "ProcessPoolExecutor", InlineExecutor)
+class RegenerateInvoicesTests(InvoiceTestCase):
+    def test_failed_order_does_not_lose_the_others(self):
+        broken = self.confirmed[1].id
+
+        def render(order_id):
+            if order_id == broken:
+                raise RuntimeError("bad order")
+            return render_invoice_for_id(order_id)
+
+        stderr = io.StringIO()
+        with mock.patch.object(regenerate_invoices, "render_invoice_for_id", render):
+            with self.assertRaisesMessage(CommandError, f"1 invoices failed to render: {broken}"):
+                call_command("regenerate_invoices", stdout=io.StringIO(), stderr=stderr)
+
+        self.assertIn(f"Order {broken}: RuntimeError('bad order')", stderr.getvalue())
+        recorded = dict(Order.objects.filter(status="CONFIRMED").values_list("id", "invoice_pdf"))
+        self.assertEqual(recorded.pop(broken), "")
+        self.assertTrue(all(recorded.values()))
+
+
+class InvoicePipelineTests(InvoiceTestCase):
+    """Confirmation → orders.render_invoice → orders.send_invoice_email."""
+
+    def setUp(self):
+        super().setUp()
+        perfume = Perfume.objects.create(name="Oud", category="Unisex", price=Decimal("1000"))
+        self.order = Order.objects.create(
+            customer=self.customer,
+            ship_name="Customer",
+            ship_phone="9999999999",
+            ship_address="Somewhere",
+            ship_pincode="600001",
+        )
+        OrderItem.objects.create(order=self.order, perfume=perfume, quantity=1, price=Decimal("1000"))
+        self.order.calculate_totals()
+        self.url = reverse("order-invoice-pdf", args=[self.order.id])
+        self.client.force_authenticate(self.customer)
+
+    def confirm(self):
+        Order.objects.filter(pk=self.order.pk).update(status="CONFIRMED")
+        self.order.status = "CONFIRMED"
+        order_confirmed.send(sender=Order, instance=self.order, previous_status="PENDING")
+
+    def run_worker(self):
+        while jobs := claim_jobs("test-worker", 10):
+            for job in jobs:
+                self.assertTrue(run_job(job), job.last_error)
+
+    def download(self):
+        response = self.client.get(self.url)
+        body = b"".join(response.streaming_content) if response.status_code == 200 else b""
+        return response, body
+
+    def test_confirmation_renders_then_emails(self):
+        self.confirm()
+        self.run_worker()
+
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.invoice_pdf.name.startswith(f"invoices/{self.order.id}-"))
+
+        with open(self.order.invoice_pdf.path, "rb") as f:
+            rendered = f.read()
+        invoice_mails = [m for m in mail.outbox if m.subject == f"Invoice {self.order.invoice_number}"]
+        self.assertEqual(len(invoice_mails), 1)
+        self.assertEqual(invoice_mails[0].to, [self.customer.email])
+        self.assertEqual(invoice_mails[0].attachments[0][1], rendered)
+
+        # The download serves the same recorded file
+        response, body = self.download()
+        self.assertEqual(response["ETag"], f'"{self.order.id}-{self.order.invoice_hash}"')
+        self.assertEqual(body, rendered)
+
+        # ...and revalidates against a list of (weak) tags
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"stale", W/{response["ETag"]}')
+        self.assertEqual(response.status_code, 304)
+
+    def test_download_before_render_job_renders_inline(self):
+        self.confirm()
+
+        response, body = self.download()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(body.startswith(b"%PDF"))
+        self.assertNotEqual(Order.objects.get(pk=self.order.pk).invoice_pdf.name, "")
+
+    def test_unpaid_order_has_no_invoice(self):
+        response, _ = self.download()
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Order.objects.get(pk=self.order.pk).invoice_pdf.name, "")
+        self.assertFalse(Job.objects.filter(name="orders.render_invoice").exists())
+
+    def test_programming_error_is_not_queued(self):
+        self.confirm()
+        Job.objects.all().delete()
+
+        with mock.patch.object(generate_invoice_pdf, "render_invoice", side_effect=TypeError):
+            with self.assertRaises(TypeError):
+                self.client.get(self.url)
+
+        self.assertFalse(Job.objects.exists())
+
+    def test_failed_customer_mail_does_not_resend_admin_copy(self):
+        self.confirm()
+        real_send = send_invoice_email.send_batch
+        failures = [smtplib.SMTPDataError(451, b"Try again later")]
+
+        def flaky_send(messages):
+            if messages[0].to == [self.customer.email] and failures:
+                raise failures.pop()
+            return real_send(messages)
+
+        with mock.patch.object(send_invoice_email, "send_batch", flaky_send):
+            while jobs := claim_jobs("test-worker", 10):
+                for job in jobs:
+                    run_job(job)
+                Job.objects.filter(status="QUEUED").update(run_at=timezone.now())
+
+        subjects = [m.subject for m in mail.outbox]
+        self.assertEqual(subjects.count(f"Invoice {self.order.invoice_number}"), 1)
+        self.assertEqual(subjects.count(f"🛒 New Order - {self.order.invoice_number}"), 1)
+
+    def test_failed_render_is_queued_once(self):
+        self.confirm()
+        Job.objects.all().delete()     # e.g. the pipeline's render was dead-lettered
+
+        with mock.patch.object(generate_invoice_pdf, "render_invoice", side_effect=LayoutError("too long")):
+            first, _ = self.download()
+            second, _ = self.download()
+
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(first["Retry-After"], "30")
+        self.assertEqual(second.status_code, 202)
+
+        [job] = Job.objects.all()
+        self.assertEqual(job.name, "orders.render_invoice")
+        self.assertEqual(job.payload, {"order_id": self.order.id, "send_email": False})
+
+        # The worker renders it without re-sending the invoice email
+        self.run_worker()
+        self.assertEqual(self.download()[0].status_code, 200)
+        self.assertEqual(mail.outbox, [])
+
+
+class AdminNotificationTests(InvoiceTestCase):
+    def test_retry_after_failed_broadcast_reuses_notification(self):
+        order = self.confirmed[0]
+        layer = mock.Mock(group_send=mock.AsyncMock(side_effect=[RuntimeError("down"), None]))
+
+        with mock.patch("orders.tasks.get_channel_layer", return_value=layer):
+            with self.assertRaises(RuntimeError):
+                notify_admins_job(order.id)
+            notify_admins_job(order.id)
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.order, order)
+        self.assertEqual(list(notification.receipts.values_list("admin", flat=True)), [self.admin.id])
+        self.assertEqual(layer.group_send.await_count, 2)
+
+
+@mock.patch.object(razorpay_order.time, "sleep", mock.Mock())
+class GatewayOrderTests(InvoiceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.order = Order.objects.get(pk=self.confirmed[0].pk)
+        Order.objects.filter(pk=self.order.pk).update(status="PENDING")
+        self.url = reverse("retry-razorpay-order", args=[self.order.id])
+        self.client.force_authenticate(self.customer)
+
+    def gateway(self, *results):
+        return mock.patch.object(razorpay_order.client.order, "create", side_effect=results)
+
+    def test_transient_error_is_retried(self):
+        with self.gateway(requests.Timeout("slow"), {"id": "order_rzp1", "amount": 118000}) as create:
+            response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["order_id"], "order_rzp1")
+        self.assertEqual(create.call_count, 2)
+        self.assertLessEqual(create.call_args.kwargs["timeout"], razorpay_order.DEADLINE)
+
+    def test_bad_request_is_not_retried(self):
+        with self.gateway(BadRequestError("amount invalid")) as create:
+            response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(create.call_count, 1)
+        order = Order.objects.get(pk=self.order.pk)
+        self.assertEqual(order.gateway_status, "FAILED")
+        self.assertEqual(order.gateway_error, "amount invalid")
+
+    def test_concurrent_retry_does_not_create_second_order(self):
+        # First click holds the claim while its gateway call is in flight
+        Order.objects.filter(pk=self.order.pk).update(
+            gateway_status="CREATING", gateway_claimed_at=timezone.now()
+        )
+        with self.gateway() as create:
+            self.assertEqual(self.client.post(self.url).status_code, 409)
+        create.assert_not_called()
+
+        # ...and once it has finished, the order it created is returned
+        Order.objects.filter(pk=self.order.pk).update(
+            gateway_status="CREATED", razorpay_order_id="order_rzp1"
+        )
+        with self.gateway() as create:
+            response = self.client.post(self.url)
+        self.assertEqual(response.data["order_id"], "order_rzp1")
+        create.assert_not_called()
+
+    def test_abandoned_claim_is_taken_over(self):
+        Order.objects.filter(pk=self.order.pk).update(
+            gateway_status="CREATING",
+            gateway_claimed_at=timezone.now() - timedelta(seconds=razorpay_order.CLAIM_TIMEOUT + 1),
+        )
+        with self.gateway({"id": "order_rzp2", "amount": 118000}):
+            self.assertEqual(self.client.post(self.url).status_code, 200)
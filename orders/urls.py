@@ -1,9 +1,11 @@
 from django.urls import path
 from .views import (
     CreateRazorpayOrderView,
+    RetryRazorpayOrderView,
     VerifyPaymentAPIView,
     MyOrdersAPIView,
     AdminOrderListAPIView,
+    AdminInvoiceZipAPIView,
     OrderInvoicePDFView,
     AdminNotificationsAPIView,
     MarkNotificationsReadAPIView,
@@ -15,6 +17,7 @@ urlpatterns = [
     # 💳 PAYMENT
     # =======================
     path("create-order/", CreateRazorpayOrderView.as_view(), name="create-razorpay-order"),
+    path("create-order/<int:order_id>/retry/", RetryRazorpayOrderView.as_view(), name="retry-razorpay-order"),
     path("verify-payment/", VerifyPaymentAPIView.as_view(), name="verify-payment"),
 
     # =======================
@@ -27,6 +30,7 @@ urlpatterns = [
     # 🛠 ADMIN ORDERS
     # =======================
     path("admin/", AdminOrderListAPIView.as_view(), name="admin-orders"),
+    path("admin/invoices/zip/", AdminInvoiceZipAPIView.as_view(), name="admin-invoice-zip"),
 
     # =======================
     # 🔔 NOTIFICATIONS
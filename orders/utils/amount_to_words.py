@@ -1,14 +1,80 @@
-from num2words import num2words
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
 
+# =====================================
+# INR AMOUNT → WORDS
+# =====================================
+# Indian numbering (thousand, lakh, crore) without num2words: every
+# phrase below 1000 comes from tables built once at import, so a call is
+# a few divmods and a join. Output matches the old
+# num2words(lang="en_IN").replace(",", "").title() wording exactly.
+TWOPLACES = Decimal("0.01")
+
+_ONES = [
+    "", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine",
+    "Ten", "Eleven", "Twelve", "Thirteen", "Fourteen", "Fifteen", "Sixteen",
+    "Seventeen", "Eighteen", "Nineteen",
+]
+_TENS = [
+    "", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety",
+]
+
+
+def _build_under_1000():
+    words = []
+    for n in range(100):
+        tens, ones = divmod(n, 10)
+        if n < 20:
+            words.append(_ONES[n])
+        else:
+            words.append(f"{_TENS[tens]}-{_ONES[ones]}" if ones else _TENS[tens])
+
+    for n in range(100, 1000):
+        hundreds, rest = divmod(n, 100)
+        head = f"{_ONES[hundreds]} Hundred"
+        words.append(f"{head} And {words[rest]}" if rest else head)
+    return words
+
+
+UNDER_1000 = _build_under_1000()   # UNDER_1000[n] for 0 < n < 1000
+
+# (divisor, name) from the largest group down; crore counts above 999
+# recurse ("One Thousand Crore")
+_GROUPS = [(10_000_000, "Crore"), (100_000, "Lakh"), (1_000, "Thousand")]
+
+
+def _cardinal(n):
+    if n == 0:
+        return "Zero"
+
+    parts = []
+    for divisor, name in _GROUPS:
+        count, n = divmod(n, divisor)
+        if count:
+            count_words = UNDER_1000[count] if count < 1000 else _cardinal(count)
+            parts.append(f"{count_words} {name}")
+
+    if n:
+        # A trailing amount under 100 is joined with "And" ("One Lakh And Five")
+        if parts and n < 100:
+            parts.append("And")
+        parts.append(UNDER_1000[n])
+
+    return " ".join(parts)
+
+
+@lru_cache(maxsize=4096)
 def amount_to_words(amount: Decimal):
+    amount = Decimal(amount).quantize(TWOPLACES, ROUND_HALF_UP)
+    # Refunds / credit notes: "Minus" as num2words said it, paise included
+    sign = "Minus " if amount < 0 else ""
+    amount = abs(amount)
     rupees = int(amount)
     paise = int((amount - rupees) * 100)
 
-    words = num2words(rupees, lang="en_IN").replace(",", "").title()
-    text = f"Indian Rupees {words}"
+    text = f"Indian Rupees {sign}{_cardinal(rupees)}"
 
     if paise > 0:
-        text += f" And {num2words(paise).title()} Paise"
+        text += f" And {UNDER_1000[paise]} Paise"
 
     return text + " Only"
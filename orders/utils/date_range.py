@@ -0,0 +1,54 @@
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+
+# =====================================
+# LOCAL-DAY → TIMESTAMP RANGES
+# =====================================
+# `created_at__date__range` casts the column to a date (in IST) for every
+# row, so no index on created_at can be used. These helpers turn local
+# calendar days into a half-open [start, end) range of aware datetimes
+# instead: same rows, but a plain indexed range scan.
+def _as_date(value):
+    if value is None or isinstance(value, date):
+        return value
+    try:
+        parsed = parse_date(value)
+    except ValueError:      # well formed but impossible, e.g. 2024-13-01
+        parsed = None
+    if parsed is None:
+        # Dates come straight from query strings → 400, not 500
+        raise ValidationError({"date": f"Invalid date {value!r}, expected YYYY-MM-DD"})
+    return parsed
+
+
+def day_start(day):
+    """Midnight at the start of `day` in the current (IST) time zone."""
+    return timezone.make_aware(datetime.combine(_as_date(day), time.min))
+
+
+def local_day_bounds(start_date=None, end_date=None):
+    """(start, end) datetimes covering the local days start..end inclusive."""
+    start = day_start(start_date) if start_date else None
+    end = day_start(_as_date(end_date) + timedelta(days=1)) if end_date else None
+    return start, end
+
+
+def created_between(start_date=None, end_date=None, field="created_at"):
+    """Q for `field` within local days start..end; either side may be open."""
+    start, end = local_day_bounds(start_date, end_date)
+
+    q = Q()
+    if start:
+        q &= Q(**{f"{field}__gte": start})
+    if end:
+        q &= Q(**{f"{field}__lt": end})
+    return q
+
+
+def created_on(day, field="created_at"):
+    return created_between(day, day, field=field)
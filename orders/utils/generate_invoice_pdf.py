@@ -1,39 +1,427 @@
-# from io import BytesIO
-# from django.template.loader import get_template
-# from django.conf import settings
-# import pdfkit
-# import os
-# from decimal import Decimal
-# from orders.utils.amount_to_words import amount_to_words
-# WKHTML_PATH = r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe"
-# config = pdfkit.configuration(wkhtmltopdf=WKHTML_PATH)
-
-# def generate_invoice_pdf(order):
-#     # Absolute path for logo
-#     logo_path = f"file:///{os.path.join(settings.BASE_DIR, 'static/logo.png').replace(os.sep, '/')}" 
-#     order.total_in_words = amount_to_words(Decimal(order.total_amount))
-#     template = get_template("tax_invoice.html")
-#     html = template.render({
-#         "order": order,
-#         "logo_path": logo_path,
-#     })
-
-#     pdf = pdfkit.from_string(
-#         html,
-#         False,
-#         configuration=config,
-#         options={
-#             "page-size": "A4",
-#             "encoding": "UTF-8",
-#             "enable-local-file-access": True,  # MUST be True
-#             "margin-top": "10mm",
-#             "margin-bottom": "10mm",
-#             "margin-left": "10mm",
-#             "margin-right": "10mm",
-#         }
-#     )
-
-#     return BytesIO(pdf)
+import hashlib
+import json
+import os
+import tempfile
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from reportlab.platypus.doctemplate import LayoutError
+
+from orders.models import Order
+from .amount_to_words import amount_to_words
+
+# =====================================
+# TAX INVOICE PDF
+# =====================================
+# Same content as templates/tax_invoice.html, drawn with reportlab.
+# PDFs are cached on disk as MEDIA_ROOT/invoices/<order id>-<hash>.pdf,
+# where the hash covers everything printed on the invoice — any change
+# to the order (or to RENDERER_VERSION) renders a fresh file.
+RENDERER_VERSION = 1
+INVOICE_DIR = "invoices"      # storage name prefix, as Order.invoice_pdf upload_to
+LOGO_PATH = os.path.join(settings.BASE_DIR, "orders", "static", "logo.png")
+
+COMPANY = [
+    "Coimbatore, Tamil Nadu 641006",
+    "India",
+    "GSTIN: 33ASHPA2999P1Z7",
+    "Phone: 91-8610871752",
+    "thexperfumes@gmail.com",
+]
+HSN_CODE = "33072000"
+SIGNATORY = "Alexander V"
+BORDER = colors.HexColor("#999999")
+SHADE = colors.HexColor("#f2f2f2")
+
+
+# =====================================
+# FONTS + LOGO (loaded once per process)
+# =====================================
+def _register_fonts():
+    """
+    Helvetica has no ₹ glyph; set INVOICE_FONT / INVOICE_FONT_BOLD to
+    TTF paths (e.g. DejaVuSans) to print it, otherwise "Rs." is used.
+    """
+    regular = getattr(settings, "INVOICE_FONT", None)
+    bold = getattr(settings, "INVOICE_FONT_BOLD", None)
+    if regular and bold and os.path.exists(regular) and os.path.exists(bold):
+        pdfmetrics.registerFont(TTFont("Invoice", regular))
+        pdfmetrics.registerFont(TTFont("Invoice-Bold", bold))
+        return "Invoice", "Invoice-Bold", "₹"
+    return "Helvetica", "Helvetica-Bold", "Rs."
+
+
+def _load_logo():
+    try:
+        with open(LOGO_PATH, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+FONT, FONT_BOLD, RUPEE = _register_fonts()
+LOGO = _load_logo()
+
+STYLES = {
+    "text": ParagraphStyle("text", fontName=FONT, fontSize=9, leading=12),
+    "bold": ParagraphStyle("bold", fontName=FONT_BOLD, fontSize=9, leading=12),
+    "company": ParagraphStyle("company", fontName=FONT_BOLD, fontSize=11, leading=14),
+    "title": ParagraphStyle(
+        "title", fontName=FONT_BOLD, fontSize=22, leading=26, alignment=TA_RIGHT
+    ),
+    "center": ParagraphStyle(
+        "center", fontName=FONT, fontSize=9, leading=12, alignment=TA_CENTER
+    ),
+}
+
+
+# =====================================
+# INVOICE DATA
+# =====================================
+def invoice_context(order):
+    """Everything printed on the invoice, as plain strings."""
+    items = order.items.select_related("perfume").order_by("id")
+
+    return {
+        "version": RENDERER_VERSION,
+        "invoice_number": order.invoice_number,
+        "invoice_date": timezone.localtime(order.created_at).strftime("%d %B %Y"),
+        "payment_mode": order.payment_mode,
+        "ship_name": order.ship_name,
+        "ship_address": order.ship_address,
+        "ship_pincode": order.ship_pincode,
+        "ship_phone": order.ship_phone,
+        "items": [
+            {
+                "name": item.perfume.name,
+                "quantity": item.quantity,
+                "price": str(item.price),
+                "cgst_amount": str(item.cgst_amount),
+                "sgst_amount": str(item.sgst_amount),
+                "total_amount": str(item.total_amount),
+            }
+            for item in items
+        ],
+        "subtotal": str(order.subtotal),
+        "discount_amount": str(order.discount_amount or ""),
+        "shipping_charge": str(order.shipping_charge),
+        "cgst_total": str(order.cgst_total),
+        "sgst_total": str(order.sgst_total),
+        "total_amount": str(order.total_amount),
+        "total_in_words": amount_to_words(order.total_amount),
+    }
+
+
+def content_hash(context):
+    raw = json.dumps(context, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+# =====================================
+# RENDERING
+# =====================================
+def _grid(rows, widths, style=(), header_rows=0):
+    table = Table(rows, colWidths=widths)
+    commands = [
+        ("GRID", (0, 0), (-1, -1), 0.5, BORDER),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("FONTNAME", (0, 0), (-1, -1), FONT),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+    ]
+    if header_rows:
+        commands += [
+            ("BACKGROUND", (0, 0), (-1, header_rows - 1), SHADE),
+            ("FONTNAME", (0, 0), (-1, header_rows - 1), FONT_BOLD),
+        ]
+    table.setStyle(TableStyle(commands + list(style)))
+    return table
+
+
+def _plain(rows, widths, style=()):
+    table = Table(rows, colWidths=widths)
+    table.setStyle(TableStyle([
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("FONTNAME", (0, 0), (-1, -1), FONT),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("LEFTPADDING", (0, 0), (-1, -1), 2),
+    ] + list(style)))
+    return table
+
+
+def render_invoice(context):
+    """Lay out one A4 tax invoice; returns the PDF bytes."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=10 * mm,
+        rightMargin=10 * mm,
+        topMargin=10 * mm,
+        bottomMargin=10 * mm,
+        title=f"Tax Invoice {context['invoice_number']}",
+    )
+    width = doc.width
+    text, bold = STYLES["text"], STYLES["bold"]
+
+    # ---------- Header ----------
+    company = [Paragraph("The X Perfumes", STYLES["company"])]
+    company += [Paragraph(line, text) for line in COMPANY]
+    if LOGO:
+        company.insert(0, Image(BytesIO(LOGO), width=30 * mm, height=20 * mm))
+        company[0].hAlign = "LEFT"
+    header = _plain(
+        [[company, Paragraph("TAX INVOICE", STYLES["title"])]],
+        [width * 0.6, width * 0.4],
+    )
+
+    # ---------- Invoice meta ----------
+    meta = _grid(
+        [[
+            _plain([
+                ["Invoice No", f": {context['invoice_number']}"],
+                ["Invoice Date", f": {context['invoice_date']}"],
+                ["Payment Mode", f": {context['payment_mode']}"],
+            ], [30 * mm, None], [("FONTNAME", (0, 0), (0, -1), FONT_BOLD)]),
+            _plain(
+                [["Place Of Supply", ": Tamil Nadu (33)"]],
+                [30 * mm, None],
+                [("FONTNAME", (0, 0), (0, -1), FONT_BOLD)],
+            ),
+        ]],
+        [width * 0.6, width * 0.4],
+    )
+
+    # ---------- Bill to ----------
+    bill_to = _grid(
+        [
+            ["Bill To"],
+            [[
+                Paragraph(escape(context["ship_name"]), bold),
+                Paragraph(escape(context["ship_address"]), text),
+                Paragraph(f"<b>Pincode:</b> {escape(context['ship_pincode'])}", text),
+                Paragraph(f"<b>Phone:</b> {escape(context['ship_phone'])}", text),
+            ]],
+        ],
+        [width],
+        header_rows=1,
+    )
+
+    # ---------- Items ----------
+    rows = [
+        ["#", "Item", "HSN", "Qty", "Rate", "CGST", "", "SGST", "", "Amount"],
+        ["", "", "", "", "", "%", "Amt", "%", "Amt", ""],
+    ]
+    for n, item in enumerate(context["items"], start=1):
+        rows.append([
+            n,
+            Paragraph(escape(item["name"]), text),
+            HSN_CODE,
+            item["quantity"],
+            item["price"],
+            "9%",
+            item["cgst_amount"],
+            "9%",
+            item["sgst_amount"],
+            item["total_amount"],
+        ])
+    items = _grid(
+        rows,
+        [w * mm for w in (8, 54, 20, 10, 18, 10, 18, 10, 18, 24)],
+        [
+            ("SPAN", (5, 0), (6, 0)),
+            ("SPAN", (7, 0), (8, 0)),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ],
+        header_rows=2,
+    )
+
+    # ---------- Totals ----------
+    money = [
+        ["Sub Total", context["subtotal"]],
+    ]
+    if context["discount_amount"] and float(context["discount_amount"]):
+        money.append(["Discount", f"- {RUPEE}{context['discount_amount']}"])
+    money += [
+        ["Shipping Charge", f"{RUPEE} {context['shipping_charge']}"],
+        ["CGST (9%)", context["cgst_total"]],
+        ["SGST (9%)", context["sgst_total"]],
+        ["Total", f"{RUPEE} {context['total_amount']}"],
+        ["Payment Made", f"({RUPEE} {context['total_amount']})"],
+        ["Balance Due", f"{RUPEE} 0.00"],
+    ]
+    total_row = len(money) - 3
+    totals = _plain(money, [None, 30 * mm], [
+        ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+        ("FONTNAME", (0, total_row), (-1, total_row), FONT_BOLD),
+        ("FONTNAME", (0, -1), (-1, -1), FONT_BOLD),
+    ])
+    signature = [
+        Spacer(1, 14 * mm),
+        Paragraph(SIGNATORY, STYLES["center"]),
+        Paragraph("<b>Authorized Signature</b>", STYLES["center"]),
+    ]
+    footer = _plain(
+        [[
+            [
+                Paragraph("<b>Total In Words</b>", text),
+                Paragraph(context["total_in_words"], text),
+                Spacer(1, 4 * mm),
+                Paragraph("<b>Notes</b>", text),
+                Paragraph("Thanks for your business.", text),
+            ],
+            [totals, signature],
+        ]],
+        [width * 0.6, width * 0.4],
+        [("BOX", (1, 0), (1, 0), 0.5, BORDER)],
+    )
+
+    doc.build([
+        header, Spacer(1, 4 * mm),
+        meta, bill_to, items, Spacer(1, 4 * mm),
+        footer,
+    ])
+    return buffer.getvalue()
+
+
+# =====================================
+# ON-DISK CACHE
+# =====================================
+class InvoiceRenderError(Exception):
+    """reportlab could not lay the invoice out (e.g. too much on a page)."""
+
+
+def invoice_dir():
+    """Where invoice files live — resolved through storage on every call,
+    so it always matches order.invoice_pdf.path (and MEDIA_ROOT overrides)."""
+    return default_storage.path(INVOICE_DIR)
+
+
+def write_invoice(order_id, context):
+    """
+    Render `context` to MEDIA_ROOT/invoices/<order id>-<hash>.pdf unless
+    that file already exists. Returns (storage name, hash). Older renders
+    stay until the new one is recorded (see remove_stale_invoices).
+    """
+    digest = content_hash(context)
+    name = f"{INVOICE_DIR}/{order_id}-{digest}.pdf"
+    path = default_storage.path(name)
+
+    if os.path.exists(path):
+        return name, digest
+
+    directory = invoice_dir()
+    os.makedirs(directory, exist_ok=True)
+    try:
+        pdf = render_invoice(context)
+    except LayoutError as exc:
+        raise InvoiceRenderError(f"Order {order_id}: {exc}") from exc
+
+    # Write-then-rename: concurrent renders never expose a partial file
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(pdf)
+    os.replace(tmp, path)
+
+    return name, digest
+
+
+def remove_stale_invoices(current):
+    """
+    current: {order id: recorded storage name}. Delete every other render
+    of those orders. Runs only once the new names are committed, so a
+    download that read the old name before then still finds its file.
+    """
+    keep = {os.path.basename(name) for name in current.values()}
+    directory = invoice_dir()
+    try:
+        filenames = os.listdir(directory)
+    except FileNotFoundError:
+        return
+
+    for filename in filenames:
+        order_id, _, _ = filename.partition("-")
+        if (
+            filename.endswith(".pdf")
+            and filename not in keep
+            and order_id.isdigit()
+            and int(order_id) in current
+        ):
+            try:
+                os.remove(os.path.join(directory, filename))
+            except OSError:
+                pass
+
+
+def remove_stale_invoices_on_commit(current):
+    transaction.on_commit(lambda: remove_stale_invoices(current))
+
+
+def record_invoice(order, name, digest):
+    """Point the Order at its rendered artifact (no save() side effects)."""
+    rendered_at = timezone.now()
+    Order.objects.filter(pk=order.pk).update(
+        invoice_pdf=name,
+        invoice_hash=digest,
+        invoice_rendered_at=rendered_at,
+    )
+    order.invoice_pdf.name = name
+    order.invoice_hash = digest
+    order.invoice_rendered_at = rendered_at
+    remove_stale_invoices_on_commit({order.pk: name})
+
+
+def render_order_invoice(order):
+    """
+    The invoice pipeline stage (orders.render_invoice job): render once,
+    persist under MEDIA_ROOT and record it on the Order. Returns the path.
+    """
+    name, digest = write_invoice(order.id, invoice_context(order))
+    if order.invoice_pdf.name != name:
+        record_invoice(order, name, digest)
+    return order.invoice_pdf.path
+
+
+def invoice_pdf_path(order):
+    """
+    The recorded artifact — a plain file read. Only orders confirmed
+    before the pipeline existed (or whose file went missing) render here.
+    """
+    if order.invoice_pdf and os.path.exists(order.invoice_pdf.path):
+        return order.invoice_pdf.path
+    return render_order_invoice(order)
+
+
+def open_invoice_pdf(order):
+    """
+    Open the order's PDF for reading. If a newer render replaced the file
+    between looking up the path and opening it, follow the new record
+    once; a second miss raises FileNotFoundError.
+    """
+    try:
+        return open(invoice_pdf_path(order), "rb")
+    except FileNotFoundError:
+        order.refresh_from_db(fields=["invoice_pdf", "invoice_hash", "invoice_rendered_at"])
+        return open(invoice_pdf_path(order), "rb")
+
+
+def invoice_pdf_bytes(order):
+    with open_invoice_pdf(order) as f:
+        return f.read()
+
 
 def generate_invoice_pdf(order):
-    return None
\ No newline at end of file
+    """The order's invoice as a BytesIO (served from the recorded file)."""
+    return BytesIO(invoice_pdf_bytes(order))
@@ -1,9 +1,126 @@
-from orders.models import Order
+import threading
 
-def generate_invoice_number():
-    last = Order.objects.order_by("-id").first()
-    if not last or not last.invoice_number:
-        return "INV-001"
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+
+from orders.models import Order, InvoiceSequence
+
+SEQUENCE_NAME = "invoice"
+PG_SEQUENCE = "orders_invoice_number_seq"
+
+# How many numbers a process reserves per trip to the counter row.
+# Unused numbers are lost on restart → gaps, never duplicates.
+# 1 = no per-process blocks (fewest gaps, one counter UPDATE per number).
+BLOCK_SIZE = getattr(settings, "INVOICE_NUMBER_BLOCK_SIZE", 20)
+
+
+def format_invoice_number(number):
+    return f"INV-{number:03d}"
+
+
+def parse_invoice_number(invoice_number):
+    try:
+        return int(invoice_number.split("-")[1])
+    except (AttributeError, IndexError, ValueError):
+        return 0
+
+
+def last_issued_number():
+    """Highest number already on an Order (used to seed the counter)."""
+    last = (
+        Order.objects
+        .exclude(invoice_number="")
+        .order_by("-id")
+        .values_list("invoice_number", flat=True)
+        .first()
+    )
+    return parse_invoice_number(last)
+
+
+class InvoiceNumberAllocator:
+    """
+    Hands out unique, increasing invoice numbers without locking Orders.
 
-    num = int(last.invoice_number.split("-")[1]) + 1
-    return f"INV-{num:03d}"
+    - PostgreSQL: nextval() on a native sequence (no row lock at all).
+    - Others: reserve a block of BLOCK_SIZE numbers from the
+      InvoiceSequence row and serve it from memory. Numbers are
+      monotonic per process; across processes blocks interleave.
+
+    The series is deliberately NOT gapless. A number is consumed even if
+    the order that took it rolls back (nextval is not transactional),
+    and the rest of a process's block is lost when it restarts. Gaps are
+    the price of not serialising every checkout on one row; invoice
+    numbers are never reused or duplicated.
+    """
+
+    def __init__(self, name=SEQUENCE_NAME, block_size=BLOCK_SIZE):
+        self.name = name
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+
+    def next(self):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT nextval(%s)", [PG_SEQUENCE])
+                return cursor.fetchone()[0]
+
+        with self._lock:
+            if self._next >= self._end:
+                if connection.in_atomic_block:
+                    # A block reserved inside an outer transaction could be
+                    # rolled back and handed out again elsewhere, so take
+                    # exactly one number and keep nothing. That holds the
+                    # counter row until the outer commit — only when the
+                    # block has run out; a block reserved earlier (e.g. by
+                    # checkout, which allocates before its transaction) is
+                    # served from memory even inside one.
+                    start, _ = self._reserve(1)
+                    return start
+                self._next, self._end = self._reserve(self.block_size)
+
+            number = self._next
+            self._next += 1
+            return number
+
+    def _reserve(self, size):
+        """
+        Bump the counter in a single UPDATE and read it back in the same
+        transaction. The UPDATE takes the row (SQLite: database) write
+        lock, so the value read back is ours alone — unlike a
+        read-then-save, which SQLite's no-op select_for_update() can't
+        protect.
+        """
+        while True:
+            with transaction.atomic():
+                bumped = InvoiceSequence.objects.filter(name=self.name).update(
+                    next_value=F("next_value") + size
+                )
+                if bumped:
+                    end = (
+                        InvoiceSequence.objects
+                        .filter(name=self.name)
+                        .values_list("next_value", flat=True)
+                        .get()
+                    )
+                    return end - size, end
+
+            # First use: seed the row, then go round again to bump it.
+            # A concurrent seeder wins the INSERT; ours is then a no-op.
+            try:
+                with transaction.atomic():
+                    InvoiceSequence.objects.create(
+                        name=self.name,
+                        next_value=last_issued_number() + 1
+                    )
+            except IntegrityError:
+                pass
+
+
+allocator = InvoiceNumberAllocator()
+
+
+def generate_invoice_number():
+    return format_invoice_number(allocator.next())
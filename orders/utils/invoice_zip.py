@@ -0,0 +1,202 @@
+import multiprocessing
+import os
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from orders.models import Order
+from .generate_invoice_pdf import remove_stale_invoices_on_commit
+from .render_worker import init_render_worker, render_invoice_for_id
+
+ZIP_WORKERS = getattr(settings, "INVOICE_ZIP_WORKERS", min(4, os.cpu_count() or 1))
+FILE_CHUNK = 64 * 1024      # bytes read from each PDF at a time
+# Renders one download keeps submitted at once; the rest wait their turn
+# here rather than in the shared pool's queue, ahead of other requests
+MAX_IN_FLIGHT = ZIP_WORKERS * 2
+MANIFEST_NAME = "MANIFEST.txt"
+
+
+# =====================================
+# RENDER POOL (one per server process)
+# =====================================
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def render_pool():
+    """
+    A single bounded pool shared by every ZIP download in this process,
+    so concurrent requests queue for ZIP_WORKERS renderers instead of
+    each starting their own. Workers are spawned, not forked: forking a
+    threaded server (gunicorn threads, channels) can copy held locks.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=ZIP_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_render_worker,
+            )
+        return _pool
+
+
+def _submit_render(order_id):
+    global _pool
+    try:
+        return render_pool().submit(render_invoice_for_id, order_id)
+    except BrokenProcessPool:
+        # A worker died (OOM) and took the pool with it; start a fresh one
+        with _pool_lock:
+            _pool = None
+        return render_pool().submit(render_invoice_for_id, order_id)
+
+
+# =====================================
+# STREAMING INVOICE ZIP
+# =====================================
+class _Sink:
+    """
+    Write-only, unseekable target for ZipFile: zipfile then writes data
+    descriptors instead of seeking back, and we hand each written piece
+    straight to the response.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _open_pdf(path, arcname):
+    """
+    Open the PDF and build its entry header. A file that vanished raises
+    OSError here, with nothing written to the archive yet.
+    """
+    src = open(path, "rb")
+    try:
+        info = zipfile.ZipInfo.from_file(path, arcname)
+    except OSError:
+        src.close()
+        raise
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return src, info
+
+
+def _add_pdf(archive, sink, src, info):
+    # Once the header is out a read error can't be undone: it propagates
+    # and aborts the download rather than leave a truncated entry behind
+    with src, archive.open(info, "w") as dst:
+        while chunk := src.read(FILE_CHUNK):
+            dst.write(chunk)
+            if sink.chunks:
+                yield sink.drain()
+    yield sink.drain()
+
+
+def _add_manifest(archive, sink, failed):
+    lines = ["These invoices could not be rendered and are missing from this archive:", ""]
+    lines += [f"Invoice_{number}.pdf: {error}" for number, error in failed]
+    archive.writestr(MANIFEST_NAME, "\n".join(lines) + "\n")
+    yield sink.drain()
+
+
+def stream_invoice_zip(orders):
+    """
+    Yield a ZIP of the invoice PDFs for `orders` (a queryset), one file
+    at a time — memory stays flat whatever the period's order count.
+    Recorded renders are added straight from disk while any missing ones
+    render in the shared pool, at most MAX_IN_FLIGHT at a time; those
+    are recorded on their Orders at the end. An invoice that fails to
+    render is left out and listed in MANIFEST.txt instead of cutting the
+    download short.
+    """
+    cached, missing = [], {}
+    for order_id, number, name in (
+        orders.order_by("created_at", "id")
+        .values_list("id", "invoice_number", "invoice_pdf")
+        .iterator()
+    ):
+        path = default_storage.path(name) if name else None
+        if path and os.path.exists(path):
+            cached.append((order_id, number, path))
+        else:
+            missing[order_id] = number
+
+    sink = _Sink()
+    to_render = deque(missing)
+    futures = {}
+    failed = []
+
+    def top_up():
+        while to_render and len(futures) < MAX_IN_FLIGHT:
+            order_id = to_render.popleft()
+            futures[_submit_render(order_id)] = order_id
+
+    try:
+        with zipfile.ZipFile(sink, "w", compresslevel=1) as archive:
+            top_up()
+            for order_id, number, path in cached:
+                try:
+                    pdf = _open_pdf(path, f"Invoice_{number}.pdf")
+                except OSError:
+                    # Replaced by a re-render since we listed it
+                    missing[order_id] = number
+                    to_render.append(order_id)
+                    top_up()
+                    continue
+                yield from _add_pdf(archive, sink, *pdf)
+
+            rendered = []
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    order_id = futures.pop(future)
+                    top_up()
+                    arcname = f"Invoice_{missing[order_id]}.pdf"
+                    try:
+                        _, name, digest = future.result()
+                        pdf = _open_pdf(default_storage.path(name), arcname)
+                    except Exception as exc:
+                        failed.append((missing[order_id], f"{type(exc).__name__}: {exc}"))
+                        continue
+
+                    rendered.append(Order(
+                        id=order_id,
+                        invoice_pdf=name,
+                        invoice_hash=digest,
+                        invoice_rendered_at=timezone.now(),
+                    ))
+                    yield from _add_pdf(archive, sink, *pdf)
+
+            if failed:
+                yield from _add_manifest(archive, sink, failed)
+
+            if rendered:
+                Order.objects.bulk_update(
+                    rendered, ["invoice_pdf", "invoice_hash", "invoice_rendered_at"],
+                    batch_size=500,
+                )
+                remove_stale_invoices_on_commit({o.id: o.invoice_pdf.name for o in rendered})
+        yield sink.drain()   # central directory
+    finally:
+        # Client went away: don't leave this download's renders queued
+        # ahead of other requests
+        for future in futures:
+            future.cancel()
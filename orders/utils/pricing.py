@@ -0,0 +1,78 @@
+from decimal import Decimal
+from datetime import date
+
+from django.db.models import Q
+
+from products.models import Coupon
+from .calculate_invoice import CGST_RATE, SGST_RATE
+
+SHIPPING_CHARGE = Decimal("500.00")
+
+
+# =====================================
+# CHECKOUT MATH (shared by cart + checkout)
+# =====================================
+def line_amounts(unit_price, quantity):
+    base = unit_price * quantity
+    cgst = base * CGST_RATE
+    sgst = base * SGST_RATE
+    return base, cgst, sgst
+
+
+def coupon_discount(coupon, subtotal):
+    if not coupon:
+        return Decimal("0.00")
+
+    if coupon.min_order_value and subtotal < coupon.min_order_value:
+        return Decimal("0.00")
+
+    if coupon.discount_type == "flat":
+        return coupon.discount_value
+    return (subtotal * coupon.discount_value) / Decimal("100")
+
+
+def get_active_coupon(code):
+    if not code:
+        return None
+    return Coupon.objects.filter(code=code, is_active=True).first()
+
+
+def best_coupon_for(subtotal):
+    # Highest-value active, unexpired coupon the subtotal qualifies for
+    return (
+        Coupon.objects
+        .filter(is_active=True)
+        .filter(Q(expiry_date__gte=date.today()) | Q(expiry_date__isnull=True))
+        .filter(min_order_value__lte=subtotal)
+        .order_by("-discount_value")
+        .first()
+    )
+
+
+def order_totals(lines, discount=Decimal("0.00")):
+    """
+    lines: iterable of (unit_price, quantity).
+    Mirrors what CreateRazorpayOrderView stores on the Order.
+    """
+    subtotal = Decimal("0.00")
+    cgst_total = Decimal("0.00")
+    sgst_total = Decimal("0.00")
+
+    for unit_price, quantity in lines:
+        base, cgst, sgst = line_amounts(unit_price, quantity)
+        subtotal += base
+        cgst_total += cgst
+        sgst_total += sgst
+
+    shipping_charge = SHIPPING_CHARGE if subtotal > 0 else Decimal("0.00")
+
+    return {
+        "subtotal": subtotal,
+        "discount": discount,
+        "cgst_total": cgst_total,
+        "sgst_total": sgst_total,
+        "shipping_charge": shipping_charge,
+        "total_amount": (
+            subtotal - discount + cgst_total + sgst_total + shipping_charge
+        ),
+    }
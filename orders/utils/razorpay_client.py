@@ -9,4 +9,4 @@ client = razorpay.Client(
     auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
 )
 
-client.session.timeout = 10   # seconds
+# Timeouts are passed per call (razorpay_order.DEADLINE)
@@ -0,0 +1,105 @@
+import time
+from datetime import timedelta
+
+import requests
+from django.db.models import Q
+from django.utils import timezone
+from razorpay.errors import ServerError
+
+from orders.models import Order
+from .razorpay_client import client
+
+MAX_ATTEMPTS = 2
+RETRY_DELAY = 0.5   # seconds before the second attempt
+DEADLINE = 8        # seconds a request worker may spend on the gateway in total
+MIN_ATTEMPT = 2     # don't start an attempt with less time than this left
+CLAIM_TIMEOUT = 60  # a CREATING claim older than this belongs to a dead request
+
+# Worth another try: the gateway may succeed next time. 4xx (bad
+# request, auth) never will.
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, ServerError)
+
+
+class GatewayError(Exception):
+    pass
+
+
+class GatewayBusy(GatewayError):
+    """Another request is creating this order's gateway order right now."""
+
+
+def _existing(order):
+    return {
+        "id": order.razorpay_order_id,
+        "amount": int(order.total_amount * 100),
+    }
+
+
+def _claim(order):
+    """Conditional UPDATE → only one request talks to the gateway per order."""
+    now = timezone.now()
+    return Order.objects.filter(
+        Q(gateway_status__in=["PENDING", "FAILED"])
+        | Q(gateway_status="CREATING", gateway_claimed_at__lt=now - timedelta(seconds=CLAIM_TIMEOUT)),
+        id=order.id,
+    ).update(gateway_status="CREATING", gateway_claimed_at=now)
+
+
+def create_gateway_order(order):
+    """
+    Phase 2 of checkout: create the Razorpay order for an already
+    committed Order. Must NOT run inside a DB transaction.
+
+    Records progress on the Order (gateway_status / attempts / error)
+    so a failed call can be retried or compensated later. Raises
+    GatewayBusy if a concurrent request holds the claim.
+    """
+    if order.gateway_status == "CREATED" and order.razorpay_order_id:
+        return _existing(order)
+
+    if not _claim(order):
+        order.refresh_from_db(fields=["gateway_status", "razorpay_order_id"])
+        if order.gateway_status == "CREATED" and order.razorpay_order_id:
+            return _existing(order)
+        raise GatewayBusy("Payment gateway order is already being created")
+
+    deadline = time.monotonic() + DEADLINE
+    last_error = None
+
+    for attempt in range(MAX_ATTEMPTS):
+        remaining = deadline - time.monotonic()
+        if attempt and remaining < RETRY_DELAY + MIN_ATTEMPT:
+            break
+        if attempt:
+            time.sleep(RETRY_DELAY)
+            remaining -= RETRY_DELAY
+
+        order.gateway_attempts += 1
+        try:
+            razorpay_order = client.order.create({
+                "amount": int(order.total_amount * 100),
+                "currency": "INR",
+                "receipt": str(order.id),
+            }, timeout=remaining)
+        except TRANSIENT_ERRORS as e:
+            last_error = e
+            continue
+        except Exception as e:
+            last_error = e
+            break
+
+        order.razorpay_order_id = razorpay_order["id"]
+        order.gateway_status = "CREATED"
+        order.gateway_error = ""
+        order.save(update_fields=[
+            "razorpay_order_id",
+            "gateway_status",
+            "gateway_attempts",
+            "gateway_error",
+        ])
+        return razorpay_order
+
+    order.gateway_status = "FAILED"
+    order.gateway_error = str(last_error)[:255]
+    order.save(update_fields=["gateway_status", "gateway_attempts", "gateway_error"])
+    raise GatewayError(order.gateway_error)
@@ -0,0 +1,25 @@
+# =====================================
+# INVOICE RENDER WORKERS (process pools)
+# =====================================
+# Used by regenerate_invoices (forked pool) and the invoice ZIP (spawned
+# pool). A spawned worker imports this module to unpickle its initializer
+# before Django is set up, so nothing here may import models at load time.
+
+
+def init_render_worker():
+    """ProcessPoolExecutor initializer: set up Django, no shared DB sockets."""
+    import django
+    from django.db import connections
+
+    django.setup()              # no-op under fork, needed under spawn
+    connections.close_all()
+
+
+def render_invoice_for_id(order_id):
+    """Runs in a pool worker — renders only; the parent records results."""
+    from orders.models import Order
+    from .generate_invoice_pdf import invoice_context, write_invoice
+
+    order = Order.objects.get(id=order_id)
+    name, digest = write_invoice(order.id, invoice_context(order))
+    return order_id, name, digest
@@ -1,14 +1,25 @@
 from django.core.mail import EmailMessage
 from django.conf import settings
-from .generate_invoice_pdf import generate_invoice_pdf
+
+from jobs.mail import send_batch
+from .generate_invoice_pdf import invoice_pdf_bytes
+
+def _attach_invoice(message, order, pdf):
+    message.attach(
+        f"Invoice_{order.invoice_number}.pdf",
+        pdf,
+        "application/pdf"
+    )
+
 
 def send_invoice_email(order):
     """
-    Sends invoice email to both customer and admin.
-    Customer gets thank-you message.
-    Admin gets invoice PDF + order details.
+    Sends the invoice to the customer with a thank-you message.
+    The admin copy is a separate job (send_invoice_email_admin), so a
+    retry of one never sends the other twice.
     """
-    pdf_buffer = generate_invoice_pdf(order)
+    # Same cached file the download view serves
+    pdf = invoice_pdf_bytes(order)
 
     # ---------- Customer Email ----------
     customer_email = EmailMessage(
@@ -22,12 +33,13 @@ def send_invoice_email(order):
         from_email=settings.DEFAULT_FROM_EMAIL,
         to=[order.customer.email],
     )
-    customer_email.attach(
-        f"Invoice_{order.invoice_number}.pdf",
-        pdf_buffer.getvalue(),
-        "application/pdf"
-    )
-    customer_email.send(fail_silently=False)
+    _attach_invoice(customer_email, order, pdf)
+    send_batch([customer_email])
+
+
+def send_invoice_email_admin(order):
+    """Sends the admin the invoice PDF + order details."""
+    pdf = invoice_pdf_bytes(order)
 
     # ---------- Admin Email with Order Details ----------
     order_items_text = "\n".join([
@@ -52,9 +64,5 @@ def send_invoice_email(order):
         from_email=settings.DEFAULT_FROM_EMAIL,
         to=[settings.DEFAULT_FROM_EMAIL],  # Admin email
     )
-    admin_email.attach(
-        f"Invoice_{order.invoice_number}.pdf",
-        pdf_buffer.getvalue(),
-        "application/pdf"
-    )
-    admin_email.send(fail_silently=False)
\ No newline at end of file
+    _attach_invoice(admin_email, order, pdf)
+    send_batch([admin_email])
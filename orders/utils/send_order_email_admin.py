@@ -1,6 +1,8 @@
 from django.core.mail import EmailMessage
 from django.conf import settings
 
+from jobs.mail import send_batch
+
 def send_order_email_admin(order):
     subject = f"🛒 New Order Received - {order.invoice_number}"
 
@@ -43,4 +45,4 @@ def send_order_email_admin(order):
         [settings.DEFAULT_FROM_EMAIL],  # Admin receives
     )
     email.content_subtype = "html"  # Important for HTML table formatting
-    email.send(fail_silently=False)
\ No newline at end of file
+    send_batch([email])
@@ -9,29 +9,31 @@ import hashlib
 from django.conf import settings
 from django.db import transaction
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date
 
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
 
-import razorpay
-
-from orders.models import Order, OrderItem, Notification
-from products.models import Perfume, Coupon
+from orders.models import Order, OrderItem, NotificationReceipt
+from products.models import Perfume
 from orders.serializers import OrderListSerializer, AdminOrderSerializer
 from orders.signals import order_confirmed
-from orders.utils.generate_invoice_pdf import generate_invoice_pdf
-
-
-# ==============================
-# RAZORPAY CLIENT
-# ==============================
-client = razorpay.Client(
-    auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
+from orders.tasks import queue_invoice_render
+from orders.utils.generate_invoice_pdf import InvoiceRenderError, open_invoice_pdf
+from orders.utils.pricing import (
+    line_amounts,
+    coupon_discount,
+    get_active_coupon,
+    order_totals,
 )
-client.session.timeout = 10
+from orders.utils.date_range import created_between
+from orders.utils.invoice_number import generate_invoice_number
+from orders.utils.invoice_zip import stream_invoice_zip
+from orders.utils.razorpay_order import create_gateway_order, GatewayBusy, GatewayError
 
 
 # ==============================
@@ -56,24 +58,53 @@ class MyOrdersAPIView(APIView):
 # ==============================
 # INVOICE PDF DOWNLOAD
 # ==============================
+# Paid orders, at any fulfilment stage
+INVOICED_STATUSES = ("CONFIRMED", "PACKED", "SHIPPED", "DELIVERED")
+
+
 class OrderInvoicePDFView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, order_id):
-        order = get_object_or_404(Order, id=order_id)
+        # Only paid orders have an invoice
+        order = get_object_or_404(Order, id=order_id, status__in=INVOICED_STATUSES)
 
         if not (request.user.is_staff or order.customer == request.user):
             return Response({"error": "Permission denied"}, status=403)
 
-        pdf_buffer = generate_invoice_pdf(order)
+        # Rendered at confirmation (orders.render_invoice) → a static file
+        # read; FileResponse streams it (wsgi.file_wrapper → sendfile)
+        # Not rendered yet (job still queued) or the file is gone → render
+        # inline. If that fails too, hand it to the worker, which retries.
+        try:
+            pdf = open_invoice_pdf(order)
+        except FileNotFoundError:
+            # Replaced twice while we looked — rare enough to just retry
+            return Response({"error": "Invoice not available, try again"}, status=404)
+        except (OSError, InvoiceRenderError):
+            queue_invoice_render(order.id)
+            return Response(
+                {"detail": "Invoice is being generated, try again shortly"},
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Retry-After": "30"},
+            )
+
+        etag = f'"{order.id}-{order.invoice_hash}"'
 
-        response = HttpResponse(
-            pdf_buffer.getvalue(),
-            content_type="application/pdf"
-        )
-        response["Content-Disposition"] = (
-            f'attachment; filename="Invoice_{order.order_id}.pdf"'
+        # 304 when any If-None-Match tag (weakly) equals ours
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            pdf.close()
+            not_modified["ETag"] = etag
+            return not_modified
+
+        response = FileResponse(
+            pdf,
+            as_attachment=True,
+            filename=f"Invoice_{order.order_id}.pdf",
+            content_type="application/pdf",
         )
+        response["ETag"] = etag
         return response
 
 
@@ -81,9 +112,15 @@ class OrderInvoicePDFView(APIView):
 # CREATE RAZORPAY ORDER
 # ==============================
 class CreateRazorpayOrderView(APIView):
+    """
+    Two-phase checkout:
+      1. Order + lines are written and committed in a short transaction.
+      2. The Razorpay order is created *outside* the transaction, so a
+         slow gateway never holds DB locks. Failures are recorded on the
+         Order (gateway_status=FAILED) and can be retried.
+    """
     permission_classes = [IsAuthenticated]
 
-    @transaction.atomic
     def post(self, request):
         user = request.user
         data = request.data
@@ -97,122 +134,138 @@ class CreateRazorpayOrderView(APIView):
                 status=400
             )
 
-        coupon_code = data.get("coupon")
-        discount_amount = Decimal("0.00")
+        # ---------- PERFUMES (one query for all lines) ----------
+        try:
+            requested = [
+                (int(item.get("perfume_id")), int(item.get("quantity", 1)))
+                for item in items
+            ]
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid perfume"}, status=400)
+
+        perfumes = Perfume.objects.filter(is_active=True).in_bulk(
+            {perfume_id for perfume_id, _ in requested}
+        )
+
+        if any(perfume_id not in perfumes for perfume_id, _ in requested):
+            return Response({"error": "Invalid perfume"}, status=400)
+
+        if any(quantity < 1 for _, quantity in requested):
+            return Response({"error": "Invalid quantity"}, status=400)
+
+        lines = [
+            (perfumes[perfume_id], quantity)
+            for perfume_id, quantity in requested
+        ]
+        priced = [(perfume.final_price, quantity) for perfume, quantity in lines]
 
         # ---------- COUPON ----------
-        if coupon_code:
-            try:
-                coupon = Coupon.objects.get(code=coupon_code, is_active=True)
-            except Coupon.DoesNotExist:
-                coupon = None
-
-            if coupon:
-                subtotal_for_discount = Decimal("0.00")
-
-                for item in items:
-                    perfume = Perfume.objects.filter(
-                        id=item.get("perfume_id"),
-                        is_active=True
-                    ).first()
-                    if perfume:
-                        subtotal_for_discount += (
-                            perfume.final_price *
-                            int(item.get("quantity", 1))
-                        )
-
-                if (
-                    not coupon.min_order_value or
-                    subtotal_for_discount >= coupon.min_order_value
-                ):
-                    if coupon.discount_type == "flat":
-                        discount_amount = coupon.discount_value
-                    else:
-                        discount_amount = (
-                            subtotal_for_discount *
-                            coupon.discount_value
-                        ) / Decimal("100")
-
-        # ---------- CREATE ORDER ----------
-        order = Order.objects.create(
-            customer=user,
-            ship_name=shipping["name"],
-            ship_phone=shipping["mobile"],
-            ship_address=shipping["address"],
-            ship_pincode=shipping["pincode"],
-            coupon_code=coupon_code if discount_amount > 0 else None,
-            discount_amount=discount_amount,
+        coupon_code = data.get("coupon")
+        coupon = get_active_coupon(coupon_code)
+        subtotal_for_discount = sum(
+            (price * quantity for price, quantity in priced),
+            Decimal("0.00")
         )
+        discount_amount = coupon_discount(coupon, subtotal_for_discount)
+
+        totals = order_totals(priced, discount_amount)
+        total_amount = totals["total_amount"]
+
+        # Allocated outside the transaction → served from the
+        # process-local block, no counter-row lock held below
+        invoice_number = generate_invoice_number()
+
+        # ---------- PHASE 1: COMMIT ORDER ----------
+        with transaction.atomic():
+            order = Order.objects.create(
+                invoice_number=invoice_number,
+                customer=user,
+                ship_name=shipping["name"],
+                ship_phone=shipping["mobile"],
+                ship_address=shipping["address"],
+                ship_pincode=shipping["pincode"],
+                coupon_code=coupon_code if discount_amount > 0 else None,
+                discount_amount=discount_amount,
+                subtotal=totals["subtotal"],
+                cgst_total=totals["cgst_total"],
+                sgst_total=totals["sgst_total"],
+                shipping_charge=totals["shipping_charge"],
+                total_amount=total_amount,
+            )
 
-        subtotal = Decimal("0.00")
-        cgst_total = Decimal("0.00")
-        sgst_total = Decimal("0.00")
-
-        # ---------- CREATE ITEMS ----------
-        for item in items:
-            perfume = Perfume.objects.filter(
-                id=item.get("perfume_id"),
-                is_active=True
-            ).first()
-
-            if not perfume:
-                transaction.set_rollback(True)
-                return Response(
-                    {"error": "Invalid perfume"},
-                    status=400
-                )
-
-            quantity = int(item.get("quantity", 1))
-            base = perfume.final_price * quantity
-            cgst = base * Decimal("0.09")
-            sgst = base * Decimal("0.09")
-
-            OrderItem.objects.create(
-                order=order,
-                perfume=perfume,
-                quantity=quantity,
-                price=perfume.final_price,
-                cgst_amount=cgst,
-                sgst_amount=sgst,
-                total_amount=base + cgst + sgst,
+            # ---------- CREATE ITEMS (single INSERT, tax precomputed) ----------
+            order_items = []
+            for perfume, quantity in lines:
+                base, cgst, sgst = line_amounts(perfume.final_price, quantity)
+                order_items.append(OrderItem(
+                    order=order,
+                    perfume=perfume,
+                    quantity=quantity,
+                    price=perfume.final_price,
+                    cgst_amount=cgst,
+                    sgst_amount=sgst,
+                    total_amount=base + cgst + sgst,
+                ))
+
+            OrderItem.objects.bulk_create(order_items)
+
+        # ---------- PHASE 2: RAZORPAY (no transaction) ----------
+        try:
+            razorpay_order = create_gateway_order(order)
+        except GatewayError:
+            return Response(
+                {
+                    "error": "Payment gateway unavailable, please retry",
+                    "order": order.id,
+                },
+                status=502
             )
 
-            subtotal += base
-            cgst_total += cgst
-            sgst_total += sgst
+        return Response({
+            "order_id": razorpay_order["id"],
+            "amount": razorpay_order["amount"],
+            "razorpay_key": settings.RAZORPAY_KEY_ID,
+            "discount_applied": float(discount_amount),
+        })
 
-        shipping_charge = Decimal("500.00") if subtotal > 0 else Decimal("0.00")
 
-        total_before_tax = subtotal - discount_amount
-        total_amount = (
-            total_before_tax +
-            cgst_total +
-            sgst_total +
-            shipping_charge
-        )
+class RetryRazorpayOrderView(APIView):
+    """Re-run phase 2 for an order whose gateway call failed."""
+    permission_classes = [IsAuthenticated]
 
-        order.subtotal = subtotal
-        order.cgst_total = cgst_total
-        order.sgst_total = sgst_total
-        order.shipping_charge = shipping_charge
-        order.total_amount = total_amount
-        order.save()
-
-        # ---------- RAZORPAY ----------
-        razorpay_order = client.order.create({
-            "amount": int(total_amount * 100),
-            "currency": "INR",
-            "receipt": str(order.id),
-        })
+    def post(self, request, order_id):
+        order = get_object_or_404(
+            Order,
+            id=order_id,
+            customer=request.user,
+            status="PENDING"
+        )
 
-        order.razorpay_order_id = razorpay_order["id"]
-        order.save(update_fields=["razorpay_order_id"])
+        try:
+            razorpay_order = create_gateway_order(order)
+        except GatewayBusy:
+            # Double click: the first request is still talking to Razorpay
+            return Response(
+                {
+                    "error": "Payment is already being set up, please retry",
+                    "order": order.id,
+                },
+                status=409
+            )
+        except GatewayError:
+            return Response(
+                {
+                    "error": "Payment gateway unavailable, please retry",
+                    "order": order.id,
+                },
+                status=502
+            )
 
         return Response({
             "order_id": razorpay_order["id"],
             "amount": razorpay_order["amount"],
             "razorpay_key": settings.RAZORPAY_KEY_ID,
-            "discount_applied": float(discount_amount),
+            "discount_applied": float(order.discount_amount),
         })
 
 
@@ -248,16 +301,32 @@ class VerifyPaymentAPIView(APIView):
         if order.status == "CONFIRMED":
             return Response({"message": "Already verified"})
 
-        order.razorpay_payment_id = razorpay_payment_id
-        order.razorpay_signature = razorpay_signature
-        order.status = "CONFIRMED"
-        order.save(update_fields=[
-            "razorpay_payment_id",
-            "razorpay_signature",
-            "status"
-        ])
-
-        order_confirmed.send(sender=Order, instance=order)
+        with transaction.atomic():
+            # Conditional UPDATE: a double-submitted verify confirms (and
+            # counts into the sales rollup) exactly once.
+            confirmed = (
+                Order.objects
+                .filter(pk=order.pk)
+                .exclude(status="CONFIRMED")
+                .update(
+                    razorpay_payment_id=razorpay_payment_id,
+                    razorpay_signature=razorpay_signature,
+                    status="CONFIRMED",
+                )
+            )
+            if not confirmed:
+                return Response({"message": "Already verified"})
+
+            previous_status = order.status
+            order.razorpay_payment_id = razorpay_payment_id
+            order.razorpay_signature = razorpay_signature
+            order.status = "CONFIRMED"
+
+            order_confirmed.send(
+                sender=Order,
+                instance=order,
+                previous_status=previous_status
+            )
 
         return Response({"message": "Payment verified successfully"})
 
@@ -274,10 +343,7 @@ class AdminOrderListAPIView(APIView):
 
         orders = Order.objects.filter(status="CONFIRMED")
 
-        if start_date:
-            orders = orders.filter(created_at__date__gte=start_date)
-        if end_date:
-            orders = orders.filter(created_at__date__lte=end_date)
+        orders = orders.filter(created_between(start_date, end_date))
 
         orders = (
             orders.select_related("customer")
@@ -289,6 +355,42 @@ class AdminOrderListAPIView(APIView):
         return Response(serializer.data)
 
 
+# ==============================
+# ADMIN - INVOICE ZIP (GST filing)
+# ==============================
+class AdminInvoiceZipAPIView(APIView):
+    """Every confirmed order's invoice for a date range, as one streamed ZIP."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        start_date = request.GET.get("start_date")
+        end_date = request.GET.get("end_date")
+
+        try:
+            valid = parse_date(start_date or "") and parse_date(end_date or "")
+        except ValueError:
+            valid = False
+        if not valid:
+            return Response(
+                {"error": "start_date and end_date (YYYY-MM-DD) are required"},
+                status=400
+            )
+
+        orders = Order.objects.filter(
+            created_between(start_date, end_date),
+            status="CONFIRMED",
+        )
+
+        response = StreamingHttpResponse(
+            stream_invoice_zip(orders),
+            content_type="application/zip"
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="invoices_{start_date}_{end_date}.zip"'
+        )
+        return response
+
+
 # ==============================
 # ADMIN - NOTIFICATIONS
 # ==============================
@@ -296,18 +398,21 @@ class AdminNotificationsAPIView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        notifications = Notification.objects.filter(
-            admin=request.user
-        ).order_by("-created_at")[:50]
+        receipts = (
+            NotificationReceipt.objects
+            .filter(admin=request.user)
+            .select_related("notification")
+            .order_by("-notification__created_at")[:50]
+        )
 
         data = [
             {
-                "id": n.id,
-                "text": n.message,
-                "timestamp": n.created_at.isoformat(),
-                "is_read": n.is_read,
+                "id": r.notification.id,
+                "text": r.notification.message,
+                "timestamp": r.notification.created_at.isoformat(),
+                "is_read": r.is_read,
             }
-            for n in notifications
+            for r in receipts
         ]
 
         return Response(data)
@@ -317,7 +422,7 @@ class MarkNotificationsReadAPIView(APIView):
     permission_classes = [IsAdminUser]
 
     def post(self, request):
-        Notification.objects.filter(
+        NotificationReceipt.objects.filter(
             admin=request.user,
             is_read=False
         ).update(is_read=True)
@@ -329,13 +434,13 @@ class MarkSingleNotificationReadAPIView(APIView):
     permission_classes = [IsAdminUser]
 
     def post(self, request, pk):
-        notification = get_object_or_404(
-            Notification,
-            id=pk,
+        receipt = get_object_or_404(
+            NotificationReceipt,
+            notification_id=pk,
             admin=request.user
         )
 
-        notification.is_read = True
-        notification.save(update_fields=["is_read"])
+        receipt.is_read = True
+        receipt.save(update_fields=["is_read"])
 
-        return Response({"message": "Notification marked as read"})
\ No newline at end of file
+        return Response({"message": "Notification marked as read"})
@@ -0,0 +1,135 @@
+import hashlib
+import time
+from datetime import timedelta
+
+from django.core.cache import cache, caches
+
+
+# =====================================
+# CATALOG VERSION
+# =====================================
+# Every cached catalog page is keyed on this counter, so bumping it
+# (on any Perfume save/delete) invalidates all of them at once.
+CATALOG_VERSION_KEY = "catalog:version"
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def catalog_cache():
+    """The shared on-disk "catalog" alias (see CACHES in settings)."""
+    return caches["catalog"]
+
+
+def get_catalog_version():
+    store = catalog_cache()
+    version = store.get(CATALOG_VERSION_KEY)
+    if version is None:
+        store.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        version = store.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version():
+    store = catalog_cache()
+    try:
+        return store.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        # Key evicted / never set → start a fresh generation
+        store.set(CATALOG_VERSION_KEY, 2, timeout=None)
+        return 2
+
+
+# =====================================
+# REPORT DATA VERSION
+# =====================================
+# Finished report files are reused while their data version stays the
+# same. The version is derived from counters scoped to what each report
+# reads, so a change only invalidates reports that could show it:
+#
+#   reports:orders:<day>     any order created on that local day changed
+#                            (sales + products exports list every order)
+#   reports:confirmed:<day>  a confirmed order on that day changed
+#                            (customer export counts confirmed orders only)
+#   reports:customers        a customer's name / email changed
+#   reports:catalog          a perfume changed (name, stock)
+#
+# Checkouts touch only today's counters; logins and OTP saves touch none.
+# The epoch starts from the clock, so a flushed cache can't reproduce a
+# version already stored on a job.
+REPORT_EPOCH_KEY = "reports:epoch"
+
+# report type → (per-day scope, global scopes)
+REPORT_SCOPES = {
+    "sales": ("orders", ("customers",)),
+    "users": ("confirmed", ("customers",)),
+    "products": ("orders", ("catalog",)),
+}
+
+
+def _day_key(scope, day):
+    return f"reports:{scope}:{day.isoformat()}"
+
+
+def _bump(key):
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def bump_report_scope(scope):
+    """A whole-report input changed (scope: "customers" or "catalog")."""
+    return _bump(f"reports:{scope}")
+
+
+def bump_report_days(days, confirmed=False):
+    """Orders created on `days` (local dates) changed."""
+    scopes = ("orders", "confirmed") if confirmed else ("orders",)
+    for day in set(days):
+        for scope in scopes:
+            _bump(_day_key(scope, day))
+
+
+def report_data_version(report_type, start_date, end_date):
+    """One number for everything a (type, date range) report reads."""
+    epoch = cache.get(REPORT_EPOCH_KEY)
+    if epoch is None:
+        cache.add(REPORT_EPOCH_KEY, int(time.time()), timeout=None)
+        epoch = cache.get(REPORT_EPOCH_KEY, 0)
+
+    day_scope, scopes = REPORT_SCOPES[report_type]
+    keys = [
+        _day_key(day_scope, start_date + timedelta(days=n))
+        for n in range((end_date - start_date).days + 1)
+    ]
+    keys += [f"reports:{scope}" for scope in scopes]
+    counters = cache.get_many(keys)
+
+    # Unchanged days have no counter; only the ones that moved count
+    raw = f"{epoch}|" + "|".join(f"{key}={counters[key]}" for key in keys if key in counters)
+    digest = hashlib.blake2b(raw.encode(), digest_size=7).digest()
+    return int.from_bytes(digest, "big")     # fits PositiveBigIntegerField
+
+
+# =====================================
+# PRE-RENDERED CATALOG PAGES
+# =====================================
+def catalog_cache_key(request, version, **params):
+    # Image URLs are absolute, so scheme + host are part of the key
+    parts = [request.scheme, request.get_host()]
+    parts += [f"{k}={params[k]}" for k in sorted(params)]
+    digest = hashlib.md5("|".join(parts).encode()).hexdigest()
+    return f"catalog:v{version}:{digest}"
+
+
+def get_cached_catalog(key):
+    """Return (etag, body) or None."""
+    return catalog_cache().get(key)
+
+
+def set_cached_catalog(key, body):
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    catalog_cache().set(key, (etag, body), CATALOG_CACHE_TIMEOUT)
+    return etag, body
@@ -0,0 +1,133 @@
+from django.db.models import Case, When, F, Value, IntegerField
+from django.db.models.functions import Greatest
+
+from .models import Perfume, CartItem
+
+
+# =====================================
+# PAYLOAD PARSING
+# =====================================
+class CartSyncError(Exception):
+    pass
+
+
+def perfume_id_from(value):
+    # Accept both a bare id and a full perfume object (like CartAPIView)
+    if isinstance(value, dict):
+        value = value.get("id")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise CartSyncError(f"Invalid perfume id: {value!r}")
+
+
+def parse_lines(lines, qty_key):
+    """[{perfume, <qty_key>}, ...] → {perfume_id: qty}, summing duplicates."""
+    if not isinstance(lines, list):
+        raise CartSyncError("Expected a list")
+
+    parsed = {}
+    for line in lines:
+        if not isinstance(line, dict):
+            raise CartSyncError("Each line must be an object")
+        perfume_id = perfume_id_from(line.get("perfume"))
+        try:
+            qty = int(line.get(qty_key, 0))
+        except (TypeError, ValueError):
+            raise CartSyncError(f"Invalid {qty_key} for perfume {perfume_id}")
+        parsed[perfume_id] = parsed.get(perfume_id, 0) + qty
+    return parsed
+
+
+def check_perfumes(perfume_ids):
+    """One query: every id must be an active perfume."""
+    if not perfume_ids:
+        return
+    found = set(
+        Perfume.objects
+        .filter(id__in=perfume_ids, is_active=True)
+        .values_list("id", flat=True)
+    )
+    missing = sorted(set(perfume_ids) - found)
+    if missing:
+        raise CartSyncError(f"Invalid perfume ids: {missing}")
+
+
+# =====================================
+# APPLY (call inside transaction.atomic)
+# =====================================
+def apply_cart_state(cart, desired):
+    """
+    Make the cart contain exactly `desired` ({perfume_id: qty}).
+
+    Only perfumes new to the cart must be active. Lines already in the
+    cart whose perfume has since been deactivated are dropped instead of
+    failing the sync; their ids are returned so the client can say so.
+    """
+    desired = {pid: qty for pid, qty in desired.items() if qty > 0}
+
+    existing = {item.perfume_id: item for item in cart.items.select_related("perfume")}
+    check_perfumes([pid for pid in desired if pid not in existing])
+
+    removed = sorted(
+        pid for pid in desired
+        if pid in existing and not existing[pid].perfume.is_active
+    )
+    for pid in removed:
+        del desired[pid]
+
+    CartItem.objects.filter(cart=cart).exclude(perfume_id__in=desired.keys()).delete()
+
+    to_update = []
+    to_create = []
+    for perfume_id, qty in desired.items():
+        item = existing.get(perfume_id)
+        if item is None:
+            to_create.append(CartItem(cart=cart, perfume_id=perfume_id, quantity=qty))
+        elif item.quantity != qty:
+            item.quantity = qty
+            to_update.append(item)
+
+    if to_update:
+        CartItem.objects.bulk_update(to_update, ["quantity"])
+    if to_create:
+        CartItem.objects.bulk_create(to_create)
+    return removed
+
+
+def apply_cart_deltas(cart, deltas):
+    """Add each delta ({perfume_id: +n/-n}) to the current quantity."""
+    deltas = {pid: d for pid, d in deltas.items() if d != 0}
+    if not deltas:
+        return
+
+    existing = set(
+        cart.items.filter(perfume_id__in=deltas.keys())
+        .values_list("perfume_id", flat=True)
+    )
+    new_ids = [pid for pid, d in deltas.items() if pid not in existing and d > 0]
+    check_perfumes(new_ids)
+
+    # Single UPDATE with per-row F() increments, clamped at 0
+    if existing:
+        CartItem.objects.filter(cart=cart, perfume_id__in=existing).update(
+            quantity=Greatest(
+                Case(
+                    *[
+                        When(perfume_id=pid, then=F("quantity") + Value(deltas[pid]))
+                        for pid in existing
+                    ],
+                    default=F("quantity"),
+                    output_field=IntegerField(),
+                ),
+                Value(0),
+                output_field=IntegerField(),
+            )
+        )
+        CartItem.objects.filter(cart=cart, quantity=0).delete()
+
+    if new_ids:
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, perfume_id=pid, quantity=deltas[pid])
+            for pid in new_ids
+        ])
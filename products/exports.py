@@ -0,0 +1,91 @@
+import csv
+import tempfile
+
+from django.http import HttpResponse, StreamingHttpResponse
+from openpyxl import Workbook
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CHUNK_SIZE = 2000           # rows fetched per DB round-trip
+FILE_CHUNK = 64 * 1024      # bytes per chunk of the spooled xlsx
+
+
+# =====================================
+# STREAMING REPORT EXPORTS
+# =====================================
+class _Echo:
+    """csv.writer target that hands each encoded line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(rows, columns):
+    """
+    rows: iterable of records (dicts or objects) — pass querysets through
+    .iterator(chunk_size=...) so nothing is held in memory.
+    columns: list of (header, getter) where getter(record) → cell value.
+    """
+    for record in rows:
+        yield [getter(record) for _, getter in columns]
+
+
+def stream_csv(rows, columns, title=None):   # title: xlsx only
+    writer = csv.writer(_Echo())
+    yield "\ufeff"   # BOM so Excel opens UTF-8 (₹) correctly
+    yield writer.writerow([header for header, _ in columns])
+    for row in iter_rows(rows, columns):
+        yield writer.writerow(row)
+
+
+def stream_xlsx(rows, columns, title="Report"):
+    """
+    Spooled, not streamed: openpyxl write-only mode keeps one row in
+    memory at a time, but an XLSX is a zip that can only be written once
+    the sheet is complete, so the first byte goes out after the last row
+    is read. Memory stays flat; time to first byte grows with the range.
+    Large XLSX exports belong on the report-job path (reports/jobs/),
+    which builds the same file on the worker; ?output=csv streams.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title)
+    sheet.append([header for header, _ in columns])
+    for row in iter_rows(rows, columns):
+        sheet.append(row)
+
+    with tempfile.TemporaryFile() as spool:
+        workbook.save(spool)
+        spool.seek(0)
+        while chunk := spool.read(FILE_CHUNK):
+            yield chunk
+
+
+# output → (content type, extension, streamer)
+OUTPUTS = {
+    "csv": ("text/csv; charset=utf-8", "csv", stream_csv),
+    "xlsx": (XLSX_CONTENT_TYPE, "xlsx", stream_xlsx),
+}
+
+
+def stream_export(rows, columns, output="xlsx", title="Report"):
+    """Yield the finished file as bytes chunks."""
+    _, _, streamer = OUTPUTS[output]
+    for chunk in streamer(rows, columns, title=title):
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+def export_response(request, rows, columns, filename, title="Report"):
+    """
+    Stream `rows` as CSV (?output=csv) or XLSX (default, spooled — see
+    stream_xlsx). `filename` has no extension.
+    """
+    output = request.GET.get("output", "xlsx").lower()
+    if output not in OUTPUTS:
+        return HttpResponse("output must be csv or xlsx", status=400)
+
+    content_type, extension, _ = OUTPUTS[output]
+    response = StreamingHttpResponse(
+        stream_export(rows, columns, output, title=title),
+        content_type=content_type,
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{extension}"'
+    return response
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from products.tasks import REPORT_RETENTION_DAYS, purge_reports
+
+
+class Command(BaseCommand):
+    help = "Delete superseded report files and finished report jobs past retention"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=REPORT_RETENTION_DAYS)
+
+    def handle(self, *args, **options):
+        superseded, expired = purge_reports(options["days"])
+        self.stdout.write(
+            f"Removed {superseded} superseded report files and {expired} expired report jobs"
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.21 on 2026-10-18 04:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_alter_perfume_category'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='perfume',
+            index=models.Index(fields=['-created_at', '-id'], name='perfume_created_id_idx'),
+        ),
+    ]
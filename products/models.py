@@ -82,6 +82,12 @@ class Perfume(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination key (newest first)
+            models.Index(fields=["-created_at", "-id"], name="perfume_created_id_idx"),
+        ]
+
     @property
     def final_price(self):
         return self.price - (self.price * self.discount / 100)
@@ -205,3 +211,57 @@ class CartItem(models.Model):
 
     def __str__(self):
         return f"{self.perfume.name} x {self.quantity}"
+
+
+# =====================================
+# REPORT JOBS (background exports)
+# =====================================
+class ReportJob(models.Model):
+    REPORT_TYPES = (
+        ("sales", "Sales"),
+        ("users", "Customers"),
+        ("products", "Products"),
+    )
+    OUTPUTS = (
+        ("xlsx", "Excel"),
+        ("csv", "CSV"),
+    )
+    STATUS = (
+        ("QUEUED", "Queued"),
+        ("RUNNING", "Running"),
+        ("DONE", "Done"),
+        ("FAILED", "Failed"),
+    )
+
+    report_type = models.CharField(max_length=20, choices=REPORT_TYPES)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    output = models.CharField(max_length=10, choices=OUTPUTS, default="xlsx")
+
+    # Report data version at request time — same (type, range, output,
+    # version) is served from the finished file instead of regenerating.
+    data_version = models.PositiveBigIntegerField()
+
+    status = models.CharField(max_length=10, choices=STATUS, default="QUEUED")
+    file = models.FileField(upload_to="reports/", blank=True)
+    error = models.TextField(blank=True)
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["report_type", "start_date", "end_date", "output", "data_version"],
+                name="report_job_lookup_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.report_type} {self.start_date}→{self.end_date} ({self.status})"
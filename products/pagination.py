@@ -0,0 +1,113 @@
+import base64
+
+from django.db.models import Q
+from django.utils.http import urlencode
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+
+
+class AdminPerfumePagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+
+
+class ProductReportPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class UserReportPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+# =====================================
+# KEYSET (CURSOR) PAGINATION
+# =====================================
+class PerfumeKeysetPagination:
+    """
+    Newest-first keyset pagination on (created_at, id).
+
+    Each page is a single indexed range query — no COUNT(*), no OFFSET.
+    The cursor is an opaque token holding the last row's key.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    page_size = 20
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+    @classmethod
+    def is_requested(cls, request):
+        return (
+            cls.cursor_query_param in request.GET
+            or cls.page_size_query_param in request.GET
+        )
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.GET.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, obj):
+        raw = f"{obj.created_at.isoformat()}|{obj.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, token):
+        try:
+            raw = base64.urlsafe_b64decode(token.encode()).decode()
+            created_at, pk = raw.rsplit("|", 1)
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError
+            return created_at, int(pk)
+        except (ValueError, UnicodeDecodeError):
+            raise NotFound("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, params=None):
+        """
+        params: the view's validated filters, carried into the next link.
+        Nothing else from the request is echoed back, so a cached page
+        holds no other client's query string.
+        """
+        self.request = request
+        self.params = {k: v for k, v in (params or {}).items() if v}
+        self.page_size = page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+
+        token = request.GET.get(self.cursor_query_param)
+        if token:
+            created_at, pk = self.decode_cursor(token)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) |
+                Q(created_at=created_at, id__lt=pk)
+            )
+
+        # Fetch one extra row to know whether a next page exists
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        query = {
+            **self.params,
+            self.page_size_query_param: self.page_size,
+            self.cursor_query_param: self.encode_cursor(self.page[-1]),
+        }
+        return f"{self.request.build_absolute_uri(self.request.path)}?{urlencode(query)}"
+
+    def get_paginated_data(self, data):
+        return {
+            "next": self.get_next_link(),
+            "results": data,
+        }
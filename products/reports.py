@@ -0,0 +1,250 @@
+from decimal import Decimal
+from operator import itemgetter
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils.timezone import localtime
+
+from accounts.models import CustomUser
+from customer.stats import COUNTED_STATUS
+from orders.models import Order
+from orders.utils.date_range import created_between
+from .exports import CHUNK_SIZE
+from .models import Perfume
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+ZERO = Value(Decimal("0"))
+
+
+# =====================================
+# PRODUCT SALES
+# =====================================
+def product_sales(start_date=None, end_date=None, include_unsold=False):
+    """
+    Per-perfume sales as one Perfume LEFT JOIN OrderItem GROUP BY.
+    Rows: product_id, product, stock, sold_qty, revenue, profit.
+
+    Revenue is pre-tax (price * quantity) — the same definition for the
+    report screen and the export. Unsold perfumes come back with zeros
+    when include_unsold=True.
+    """
+    sold = Q(orderitem__isnull=False)
+
+    if start_date and end_date:
+        sold &= created_between(start_date, end_date, field="orderitem__order__created_at")
+
+    revenue = ExpressionWrapper(
+        F("orderitem__price") * F("orderitem__quantity"),
+        output_field=MONEY
+    )
+    profit = ExpressionWrapper(
+        (F("orderitem__price") - F("cost_price")) * F("orderitem__quantity"),
+        output_field=MONEY
+    )
+
+    rows = Perfume.objects.annotate(
+        product_id=F("id"),
+        product=F("name"),
+        sold_qty=Coalesce(Sum("orderitem__quantity", filter=sold), 0),
+        revenue=Coalesce(Sum(revenue, filter=sold), ZERO, output_field=MONEY),
+        profit=Coalesce(Sum(profit, filter=sold), ZERO, output_field=MONEY),
+    )
+
+    if not include_unsold:
+        rows = rows.filter(sold_qty__gt=0)     # HAVING
+
+    return (
+        rows
+        .values("product_id", "product", "stock", "sold_qty", "revenue", "profit")
+        .order_by("-sold_qty", "product_id")   # best selling first
+    )
+
+
+def product_sales_summary(rows):
+    """Totals over the whole (unpaginated) report — one more aggregate."""
+    totals = rows.aggregate(
+        total_revenue=Sum("revenue"),
+        total_units=Sum("sold_qty"),
+        total_profit=Sum("profit"),
+    )
+    top = rows.first()
+
+    return {
+        "total_revenue": round(totals["total_revenue"] or Decimal("0"), 2),
+        "total_units": totals["total_units"] or 0,
+        "total_profit": round(totals["total_profit"] or Decimal("0"), 2),
+        "top_product": top["product"] if top else None,
+    }
+
+
+def with_derived_metrics(row):
+    revenue = row["revenue"] or Decimal("0")
+    profit = row["profit"] or Decimal("0")
+    sold_qty = row["sold_qty"] or 0
+
+    row["avg_price"] = round(revenue / sold_qty, 2) if sold_qty else 0
+    row["margin"] = round(profit / revenue * 100, 2) if revenue else 0
+    return row
+
+
+# =====================================
+# CUSTOMER TOTALS
+# =====================================
+def customer_order_totals(start_date=None, end_date=None):
+    """
+    Customers (no staff/admins) annotated with total_orders, total_spent
+    and last_order over confirmed orders (COUNTED_STATUS) — one LEFT
+    JOIN + GROUP BY, optionally date-filtered.
+    """
+    order_filter = Q(orders__status=COUNTED_STATUS)
+
+    if start_date and end_date:
+        order_filter &= created_between(start_date, end_date, field="orders__created_at")
+
+    return (
+        CustomUser.objects
+        .filter(is_staff=False, is_superuser=False)
+        .annotate(
+            total_orders=Count("orders", filter=order_filter),
+            total_spent=Sum("orders__total_amount", filter=order_filter),
+            last_order=Max("orders__created_at", filter=order_filter),
+        )
+    )
+
+
+def customer_report(start_date=None, end_date=None):
+    """
+    Customer report rows, biggest spenders first, ordered in SQL.
+    All-time figures come straight from CustomerStats (no orders join);
+    only a date-ranged report still aggregates over orders.
+    """
+    if start_date and end_date:
+        users = customer_order_totals(start_date, end_date)
+    else:
+        users = (
+            CustomUser.objects
+            .filter(is_staff=False, is_superuser=False)
+            .annotate(
+                total_orders=Coalesce("stats__order_count", 0),
+                total_spent=Coalesce("stats__lifetime_spend", Value(Decimal("0"))),
+                last_order=F("stats__last_order"),
+            )
+        )
+
+    return (
+        users
+        .order_by(F("total_spent").desc(nulls_last=True), "id")
+        .values("id", "name", "email", "total_orders", "total_spent", "last_order")
+    )
+
+
+def customer_report_summary(rows):
+    """Totals over the whole (unpaginated) report."""
+    totals = rows.aggregate(
+        total_users=Count("id"),
+        total_revenue=Sum("total_spent"),
+        repeat_customers=Count("id", filter=Q(total_orders__gt=1)),
+    )
+    top = rows.first()
+
+    return {
+        "total_users": totals["total_users"],          # ✅ frontend safe
+        "total_customers": totals["total_users"],      # ✅ business term
+        "total_revenue": round(totals["total_revenue"] or Decimal("0"), 2),
+        "repeat_customers": totals["repeat_customers"],
+        "top_customer": top["name"] if top else None,
+        "orders_counted": COUNTED_STATUS,              # totals are paid orders only
+    }
+
+
+def with_customer_metrics(row):
+    total_orders = row["total_orders"] or 0
+    total_spent = row["total_spent"] or Decimal("0")
+
+    row["total_orders"] = total_orders
+    row["total_spent"] = round(total_spent, 2)
+    row["average_order_value"] = round(total_spent / total_orders, 2) if total_orders else 0
+    row["customer_type"] = "Returning" if total_orders > 1 else "One-time"
+    return row
+
+
+# =====================================
+# EXPORT DEFINITIONS
+# =====================================
+# Each returns (rows, columns) for products/exports.py — rows stream
+# straight from the DB, columns are (header, getter) pairs.
+def sales_export(start_date, end_date):
+    orders = (
+        Order.objects
+        .filter(created_between(start_date, end_date))
+        .order_by("created_at", "id")
+        .values(
+            "invoice_number",
+            "customer__name",
+            "customer__email",
+            "created_at",
+            "total_amount",
+            "payment_mode",
+        )
+    )
+
+    columns = [
+        ("Order ID", itemgetter("invoice_number")),  # better than o.id
+        # same fallback as CustomUser.full_name()
+        ("Customer", lambda r: (r["customer__name"] or "").strip() or r["customer__email"]),
+        ("Date", lambda r: localtime(r["created_at"]).strftime("%d-%m-%Y")),
+        ("Amount (₹)", lambda r: float(r["total_amount"])),
+        ("Payment Mode", itemgetter("payment_mode")),
+    ]
+    return orders.iterator(chunk_size=CHUNK_SIZE), columns
+
+
+def users_export(start_date, end_date):
+    # ✅ ONLY CUSTOMERS (exclude admin & staff) with orders in range —
+    # one grouped query (HAVING total_orders > 0)
+    users = (
+        customer_order_totals(start_date, end_date)
+        .filter(total_orders__gt=0)
+        .order_by("id")
+        .values("name", "email", "total_orders", "total_spent", "last_order")
+    )
+
+    columns = [
+        ("Customer Name", itemgetter("name")),
+        ("Email", itemgetter("email")),
+        ("Confirmed Orders", itemgetter("total_orders")),
+        ("Confirmed Spend (₹)", lambda r: float(r["total_spent"])),
+        ("Last Confirmed Order", lambda r: localtime(r["last_order"]).strftime("%d-%m-%Y")),
+    ]
+    return users.iterator(chunk_size=CHUNK_SIZE), columns
+
+
+def products_export(start_date, end_date):
+    # One grouped LEFT JOIN — unsold perfumes still listed with zeros
+    rows = (
+        product_sales(start_date, end_date, include_unsold=True)
+        .order_by("product_id")
+    )
+
+    columns = [
+        ("Product", itemgetter("product")),
+        ("Sold Qty", itemgetter("sold_qty")),
+        ("Revenue", lambda r: float(r["revenue"])),   # pre-tax, as on the report screen
+        ("Stock", itemgetter("stock")),
+    ]
+    return rows.iterator(chunk_size=CHUNK_SIZE), columns
+
+
+# report type → (builder, sheet title, file name prefix)
+EXPORTS = {
+    "sales": (sales_export, "Sales", "sales_report"),
+    "users": (users_export, "Customers", "customer_report"),
+    "products": (products_export, "Products", "product_report"),
+}
+
+
+def build_export(report_type, start_date, end_date):
+    """Return (rows, columns, title, filename) for a report type."""
+    builder, title, prefix = EXPORTS[report_type]
+    rows, columns = builder(start_date, end_date)
+    return rows, columns, title, f"{prefix}_{start_date}_to_{end_date}"
@@ -1,3 +1,4 @@
+from django.urls import reverse
 from rest_framework import serializers
 from .models import (
     Perfume,
@@ -7,6 +8,7 @@ from .models import (
     Brand,
     CartItem,
     Cart,
+    ReportJob,
 )
 
 
@@ -17,10 +19,47 @@ class PerfumeSerializer(serializers.ModelSerializer):
     final_price = serializers.ReadOnlyField()
     image_url = serializers.SerializerMethodField()
 
+    # Model columns each computed field reads (for .only() projection)
+    FIELD_SOURCES = {
+        "final_price": ("price", "discount"),
+        "image_url": ("image",),
+    }
+
     class Meta:
         model = Perfume
         fields = "__all__"
 
+    def __init__(self, *args, **kwargs):
+        # Optional projection: PerfumeSerializer(..., fields=["id", "name"])
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def parse_fields(cls, value):
+        """Validate a `fields=` query param → list of known field names."""
+        if not value:
+            return None
+        fields = [f.strip() for f in value.split(",") if f.strip()]
+        unknown = sorted(set(fields) - set(cls().fields))
+        if unknown:
+            raise serializers.ValidationError({"fields": f"Unknown fields: {', '.join(unknown)}"})
+        return fields or None
+
+    @classmethod
+    def only_columns(cls, fields):
+        """Model columns needed to serialize `fields` (plus the keyset key)."""
+        model_fields = {f.name for f in Perfume._meta.concrete_fields}
+        columns = {"id", "created_at"}
+        for name in fields:
+            columns.update(cls.FIELD_SOURCES.get(name, ()))
+            if name in model_fields:
+                columns.add(name)
+        return sorted(columns)
+
     def get_image_url(self, obj):
         request = self.context.get("request")
         if obj.image and request:
@@ -132,4 +171,39 @@ class CartSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Cart
-        fields = ["id", "items"]
\ No newline at end of file
+        fields = ["id", "items"]
+
+
+# ======================================
+# REPORT JOB SERIALIZER
+# ======================================
+class ReportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            "id",
+            "report_type",
+            "start_date",
+            "end_date",
+            "output",
+            "status",
+            "error",
+            "created_at",
+            "finished_at",
+            "download_url",
+        ]
+        read_only_fields = ["status", "error", "created_at", "finished_at"]
+
+    def validate(self, data):
+        if data["start_date"] > data["end_date"]:
+            raise serializers.ValidationError("start_date must be on or before end_date")
+        return data
+
+    def get_download_url(self, obj):
+        if obj.status != "DONE":
+            return None
+        request = self.context.get("request")
+        url = reverse("report-job-download", args=[obj.id])
+        return request.build_absolute_uri(url) if request else url
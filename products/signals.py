@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from orders.models import Order
+from orders.signals import order_confirmed
+from .models import Perfume
+from .cache import bump_catalog_version, bump_report_days, bump_report_scope
+
+User = get_user_model()
+
+
+# =====================================
+# CATALOG INVALIDATION
+# =====================================
+@receiver(post_save, sender=Perfume)
+@receiver(post_delete, sender=Perfume)
+def perfume_changed_handler(sender, instance, **kwargs):
+    # After commit: bumping first would let a concurrent request cache
+    # the old rows under the new version for the whole TTL
+    transaction.on_commit(bump_catalog_version)
+
+
+# =====================================
+# REPORT DATA VERSION
+# =====================================
+# Scoped to what the report exports read (see products/cache.py): an
+# order only invalidates reports covering the day it was placed.
+# Bumped on commit: bumping first would let a concurrent request build
+# (and store) a report from the old rows under the new version.
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_report_handler(sender, instance, **kwargs):
+    # Anything past PENDING is (or was) a confirmed order
+    days = [timezone.localdate(instance.created_at)]
+    confirmed = instance.status != "PENDING"
+    transaction.on_commit(lambda: bump_report_days(days, confirmed=confirmed))
+
+
+@receiver(order_confirmed)
+def order_confirmed_report_handler(sender, instance, **kwargs):
+    # VerifyPayment confirms with .update(), so post_save doesn't see it
+    days = [timezone.localdate(instance.created_at)]
+    transaction.on_commit(lambda: bump_report_days(days, confirmed=True))
+
+
+@receiver(post_save, sender=Perfume)
+@receiver(post_delete, sender=Perfume)
+def perfume_report_handler(sender, **kwargs):
+    transaction.on_commit(lambda: bump_report_scope("catalog"))
+
+
+# Customers appear in reports by name / email only; last_login and OTP
+# saves must not invalidate anything
+REPORTED_USER_FIELDS = ("name", "email")
+
+
+def _reported_user_fields(user):
+    # __dict__: never trigger a query for a deferred field
+    return tuple(user.__dict__.get(field) for field in REPORTED_USER_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_reported_user_fields(sender, instance, **kwargs):
+    instance._reported_fields = _reported_user_fields(instance)
+
+
+@receiver(post_save, sender=User)
+def customer_report_handler(sender, instance, created, **kwargs):
+    current = _reported_user_fields(instance)
+    if not created and current != instance._reported_fields:
+        transaction.on_commit(lambda: bump_report_scope("customers"))
+    instance._reported_fields = current
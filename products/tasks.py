@@ -0,0 +1,128 @@
+import tempfile
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from jobs.queue import dead_letter_handler, job_handler
+from .exports import stream_export
+from .models import ReportJob
+from .reports import build_export
+
+REPORT_RETENTION_DAYS = getattr(settings, "REPORT_RETENTION_DAYS", 7)
+
+
+def notify_report_status(job):
+    """Tell connected admins (AdminNotificationConsumer) a report finished."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:   # no CHANNEL_LAYERS configured
+        return
+
+    label = dict(ReportJob.REPORT_TYPES)[job.report_type]
+    text = (
+        f"📊 {label} report {job.start_date} → {job.end_date} is ready"
+        if job.status == "DONE" else
+        f"⚠️ {label} report {job.start_date} → {job.end_date} failed"
+    )
+
+    async_to_sync(channel_layer.group_send)(
+        "admins",
+        {
+            "type": "send_notification",
+            "data": {
+                "kind": "report",
+                "report_job": job.id,
+                "status": job.status,
+                "text": text,
+                "timestamp": timezone.now().isoformat(),
+            }
+        }
+    )
+
+
+# =========================
+# 📊 Generate a report file
+# =========================
+@job_handler("reports.generate")
+def generate_report_job(report_job_id):
+    job = ReportJob.objects.get(id=report_job_id)
+    if job.status == "DONE":
+        return
+
+    ReportJob.objects.filter(id=job.id).update(status="RUNNING", error="")
+
+    try:
+        rows, columns, title, filename = build_export(
+            job.report_type, job.start_date, job.end_date
+        )
+
+        # Spool to a temp file, then hand it to storage (MEDIA_ROOT/reports/)
+        with tempfile.TemporaryFile() as spool:
+            for chunk in stream_export(rows, columns, job.output, title=title):
+                spool.write(chunk)
+            spool.seek(0)
+            job.file.save(f"{filename}.{job.output}", File(spool), save=False)
+    except Exception as exc:
+        # Still QUEUED while the job queue retries it, so a re-POST reuses
+        # this row; report_failed marks it FAILED after the last attempt
+        ReportJob.objects.filter(id=job.id).update(status="QUEUED", error=str(exc)[:1000])
+        raise
+
+    job.status = "DONE"
+    job.error = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=["file", "status", "error", "finished_at"])
+    notify_report_status(job)
+
+
+@dead_letter_handler("reports.generate")
+def report_failed(report_job_id, error):
+    job = ReportJob.objects.filter(id=report_job_id).exclude(status="DONE").first()
+    if job is None:
+        return
+
+    job.status = "FAILED"
+    job.error = error.strip().splitlines()[-1][:1000] if error.strip() else ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at"])
+    notify_report_status(job)
+
+
+# =========================
+# 🧹 Report file retention
+# =========================
+def purge_reports(older_than_days=REPORT_RETENTION_DAYS):
+    """
+    Free MEDIA_ROOT/reports: drop the file of every finished report a
+    newer one for the same type / range / output has superseded, and
+    delete finished jobs (with their files) older than the cutoff.
+    Returns (superseded, expired).
+    """
+    finished = ReportJob.objects.filter(status="DONE").exclude(file="")
+    newer = finished.filter(
+        report_type=OuterRef("report_type"),
+        start_date=OuterRef("start_date"),
+        end_date=OuterRef("end_date"),
+        output=OuterRef("output"),
+        id__gt=OuterRef("id"),
+    )
+
+    superseded = 0
+    for job in finished.filter(Exists(newer)):
+        job.file.delete(save=False)
+        job.save(update_fields=["file"])
+        superseded += 1
+
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    expired = ReportJob.objects.filter(
+        status__in=["DONE", "FAILED"], created_at__lt=cutoff
+    )
+    for job in expired.exclude(file=""):
+        job.file.delete(save=False)
+    expired_count, _ = expired.delete()
+
+    return superseded, expired_count
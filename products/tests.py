@@ -1,3 +1,517 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser
+from dashboard.rollup import rebuild_rollup
+from jobs.models import Job
+from jobs.queue import claim_jobs, run_job
+from orders.models import Order
+from orders.signals import order_confirmed
+from orders.utils.pricing import order_totals
+from products.cache import get_catalog_version
+from products.models import Cart, CartItem, Perfume, ReportJob
+from products.tasks import purge_reports
+
+SHIPPING = {
+    "ship_name": "Customer",
+    "ship_phone": "9999999999",
+    "ship_address": "Somewhere",
+    "ship_pincode": "600001",
+}
+
+
+@override_settings(ALLOWED_HOSTS=["*"])
+class APITestCase(TestCase):
+    """An admin user and an API client logged in as it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_superuser(
+            email="admin@example.com", password="x", name="Admin"
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    @staticmethod
+    def bulk_orders(customer_ids, **fields):
+        """One CONFIRMED order per customer id (repeats allowed), one INSERT."""
+        fields.setdefault("status", "CONFIRMED")
+        return Order.objects.bulk_create([
+            Order(
+                order_id=f"ORD-T{n:08d}",
+                invoice_number=f"T-{n}",
+                customer_id=customer_id,
+                **SHIPPING,
+                **fields,
+            )
+            for n, customer_id in enumerate(customer_ids)
+        ], batch_size=1000)
+
+
+class SalesReportQueryCountTests(APITestCase):
+    """SalesReportAPIView must stay at a fixed number of round-trips."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        customer = CustomUser.objects.create_user(
+            email="customer@example.com", password="x", name="Customer"
+        )
+
+        statuses = ["CONFIRMED", "CONFIRMED", "CANCELLED", "PENDING"]
+        modes = ["RAZORPAY", "COD"]
+        orders = []
+        for i in range(40):
+            orders.append(Order.objects.create(
+                customer=customer,
+                payment_mode=modes[i % 2],
+                status=statuses[i % 4],
+                total_amount=Decimal("100.00") * (i + 1),
+                **SHIPPING,
+            ))
+
+        # Spread orders over ten days
+        for i, order in enumerate(orders):
+            Order.objects.filter(pk=order.pk).update(
+                created_at=timezone.now() - timedelta(days=i % 10)
+            )
+
+        rebuild_rollup()
+
+    def test_report_query_count(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/sales/")
+
+        self.assertEqual(response.status_code, 200)
+
+        confirmed = Order.objects.filter(status="CONFIRMED")
+        summary = response.data["summary"]
+        self.assertEqual(summary["total_orders"], 40)
+        self.assertEqual(summary["completed_orders"], 20)
+        self.assertEqual(summary["cancelled_orders"], 10)
+        self.assertEqual(
+            summary["total_revenue"],
+            sum(o.total_amount for o in confirmed)
+        )
+
+        daily = response.data["daily_sales"]
+        self.assertEqual(sum(d["total_orders"] for d in daily), 20)
+        self.assertEqual([d["date"] for d in daily], sorted((d["date"] for d in daily), reverse=True))
+
+        split = {p["payment_mode"]: p["total_orders"] for p in response.data["payment_split"]}
+        self.assertEqual(split, {"COD": 10, "RAZORPAY": 10})
+
+    def test_query_count_independent_of_range(self):
+        today = timezone.localdate()
+        with self.assertNumQueries(2):
+            self.client.get("/api/sales/", {
+                "start_date": (today - timedelta(days=3)).isoformat(),
+                "end_date": today.isoformat(),
+            })
+
+
+class ReportDateValidationTests(APITestCase):
+    def test_bad_dates_are_400(self):
+        for url, params in (
+            ("/api/sales/", {"start_date": "2024-13-01", "end_date": "2024-12-31"}),
+            ("/api/products/", {"start_date": "foo", "end_date": "2024-12-31"}),
+            ("/api/users/", {"start_date": "2024-01-01", "end_date": "2024-02-30"}),
+            ("/api/sales/reports/", {"from": "2024-01-01", "to": "soon"}),
+            ("/api/products/reports/", {"from": "yesterday", "to": "2024-01-01"}),
+            ("/api/users/reports/", {"from": "2024-01-01", "to": "2024-01-32"}),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, params).status_code, 400)
+
+
+class UserExportQueryCountTests(APITestCase):
+    """ExportUserReportAPIView is one grouped query, whatever the user count."""
+
+    USERS = 10_000
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        CustomUser.objects.bulk_create([
+            CustomUser(email=f"user{i}@example.com", name=f"User {i}", password="!")
+            for i in range(cls.USERS)
+        ], batch_size=1000)
+
+        # Every third customer ordered twice in range
+        buyers = list(
+            CustomUser.objects
+            .filter(is_staff=False, is_superuser=False)
+            .order_by("id")
+            .values_list("id", flat=True)[::3]
+        )
+        cls.buyers = len(buyers)
+        cls.bulk_orders(buyers * 2, total_amount=Decimal("150.00"))
+
+    def test_export_is_one_query(self):
+        today = timezone.localdate().isoformat()
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/users/reports/", {
+                "from": today, "to": today, "output": "csv",
+            })
+            body = b"".join(response.streaming_content).decode("utf-8-sig")
+
+        lines = body.strip().splitlines()
+        self.assertEqual(len(lines), self.buyers + 1)   # header + buyers
+        self.assertTrue(lines[1].endswith(f",2,300.0,{timezone.localdate():%d-%m-%Y}"))
+
+
+class PublicCatalogTests(APITestCase):
+    """PublicPerfumeListAPIView serves pre-rendered JSON per catalog version."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.perfumes = [
+            Perfume.objects.create(
+                name=f"scent {n}", category="Unisex", sku=f"SCENT-{n}",
+                price=Decimal("1000.00"),
+            )
+            for n in range(3)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_if_none_match_list(self):
+        etag = self.client.get("/api/public/perfumes/")["ETag"]
+
+        response = self.client.get(
+            "/api/public/perfumes/", HTTP_IF_NONE_MATCH=f'"other", W/{etag}'
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        # A tag that merely contains ours is a different tag
+        response = self.client.get("/api/public/perfumes/", HTTP_IF_NONE_MATCH=f'"x{etag[1:]}')
+        self.assertEqual(response.status_code, 200)
+
+    def test_next_link_carries_only_validated_params(self):
+        response = self.client.get(
+            "/api/public/perfumes/",
+            {"limit": 2, "category": "unisex", "fields": "id, name", "utm_source": "mail"},
+        )
+        next_url = response.json()["next"]
+        query = parse_qs(urlsplit(next_url).query)
+        self.assertEqual(set(query), {"limit", "category", "fields", "cursor"})
+        self.assertEqual(query["fields"], ["id,name"])
+
+        # The cached page is served to the next client unchanged
+        response = self.client.get(
+            "/api/public/perfumes/",
+            {"limit": 2, "category": "unisex", "fields": "id, name", "utm_source": "ads"},
+        )
+        self.assertEqual(response.json()["next"], next_url)
+
+        page = self.client.get(next_url).json()
+        self.assertEqual([p["name"] for p in page["results"]], ["scent 0"])
+        self.assertIsNone(page["next"])
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get("/api/public/perfumes/", {"fields": "name,secret"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("secret", response.json()["fields"])
+
+    def test_version_bumps_after_commit(self):
+        version = get_catalog_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.perfumes[0].name = "renamed"
+            self.perfumes[0].save()
+            self.assertEqual(get_catalog_version(), version)
+
+        self.assertEqual(get_catalog_version(), version + 1)
+
+
+class CartTests(APITestCase):
+    """CartAPIView / CartSyncAPIView and the products/cart.py merge logic."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.customer = CustomUser.objects.create_user(
+            email="customer@example.com", password="x", name="Customer"
+        )
+        cls.oud, cls.musk, cls.retired = [
+            Perfume.objects.create(
+                name=name, category="Unisex", sku=name.upper(),
+                price=Decimal("1000.00"), is_active=active,
+            )
+            for name, active in (("oud", True), ("musk", True), ("retired", False))
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+        self.cart = Cart.objects.create(user=self.customer)
+
+    def add(self, perfume, quantity):
+        CartItem.objects.create(cart=self.cart, perfume=perfume, quantity=quantity)
+
+    def test_get_returns_item_list(self):
+        self.add(self.oud, 2)
+
+        response = self.client.get("/api/cart/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(response.data[0]["quantity"], 2)
+
+    def test_totals_skip_inactive_perfumes(self):
+        self.add(self.oud, 2)
+        self.add(self.retired, 5)
+
+        response = self.client.get("/api/cart/", {"with_totals": 1})
+
+        self.assertEqual(len(response.data["items"]), 2)
+        self.assertEqual(response.data["unavailable"], [self.retired.id])
+        # Same lines checkout would accept: only the active perfume
+        expected = order_totals([(self.oud.final_price, 2)])
+        self.assertEqual(
+            response.data["totals"]["total_amount"],
+            float(round(expected["total_amount"], 2)),
+        )
+
+    # ---------- cart/sync/ ----------
+    def sync(self, body):
+        return self.client.post("/api/cart/sync/", body, format="json")
+
+    def quantities(self):
+        return dict(self.cart.items.values_list("perfume_id", "quantity"))
+
+    def test_sync_rejects_non_object_body(self):
+        for body in ([{"perfume": self.oud.id, "quantity": 1}], "oops", 3):
+            self.assertEqual(self.sync(body).status_code, 400)
+
+    def test_sync_items_merges_duplicate_lines(self):
+        self.add(self.musk, 4)
+
+        response = self.sync({"items": [
+            {"perfume": self.oud.id, "quantity": 1},
+            {"perfume": {"id": self.oud.id}, "quantity": 2},
+        ]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantities(), {self.oud.id: 3})
+
+    def test_sync_rejects_unknown_and_inactive_perfumes(self):
+        self.add(self.oud, 1)
+
+        for perfume_id in (self.retired.id, 999999):
+            response = self.sync({"items": [{"perfume": perfume_id, "quantity": 1}]})
+            self.assertEqual(response.status_code, 400)
+
+        # Whole batch rejected, cart untouched
+        self.assertEqual(self.quantities(), {self.oud.id: 1})
+
+    def test_sync_drops_deactivated_lines_already_in_cart(self):
+        self.add(self.oud, 1)
+        self.add(self.retired, 2)
+
+        response = self.sync({"items": [
+            {"perfume": self.oud.id, "quantity": 2},
+            {"perfume": self.retired.id, "quantity": 2},
+        ]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["removed"], [self.retired.id])
+        self.assertEqual([item["quantity"] for item in response.data["items"]], [2])
+        self.assertEqual(self.quantities(), {self.oud.id: 2})
+
+    def test_guest_cart_deltas_merge_into_user_cart(self):
+        # Logged-in cart already has oud; the guest cart pushes its lines as deltas
+        self.add(self.oud, 1)
+        self.add(self.musk, 2)
+
+        response = self.sync({"deltas": [
+            {"perfume": self.oud.id, "delta": 2},
+            {"perfume": self.musk.id, "delta": -2},
+            {"perfume": self.retired.id, "delta": 0},
+        ]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantities(), {self.oud.id: 3})
+
+    def test_deltas_cannot_add_inactive_perfume(self):
+        response = self.sync({"deltas": [{"perfume": self.retired.id, "delta": 1}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.quantities(), {})
+
+
+class ReportJobTests(APITestCase):
+    URL = "/api/reports/jobs/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.customer = CustomUser.objects.create_user(
+            email="customer@example.com", password="x", name="Customer"
+        )
+        cls.perfume = Perfume.objects.create(
+            name="Oud", category="Unisex", price=Decimal("1000"), stock=10
+        )
+        cls.today = timezone.localdate()
+        cls.last_month = cls.today - timedelta(days=30)
+
+        order = Order.objects.create(customer=cls.customer, total_amount=Decimal("1180"), **SHIPPING)
+        Order.objects.filter(pk=order.pk).update(
+            status="CONFIRMED",
+            created_at=timezone.now() - timedelta(days=30),
+        )
+        cls.invoice_number = order.invoice_number
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        overrides = override_settings(MEDIA_ROOT=media)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def request_report(self, report_type="sales", start=None, end=None):
+        return self.client.post(self.URL, {
+            "report_type": report_type,
+            "start_date": str(start or self.last_month),
+            "end_date": str(end or self.last_month),
+            "output": "csv",
+        })
+
+    def run_worker(self):
+        for job in claim_jobs("test-worker", 10):
+            self.assertTrue(run_job(job), job.last_error)
+
+    def generate(self, **kwargs):
+        response = self.request_report(**kwargs)
+        self.assertEqual(response.status_code, 202)
+        self.run_worker()
+        return ReportJob.objects.get(id=response.data["id"])
+
+    def test_generate_and_download(self):
+        job = self.generate()
+        self.assertEqual(job.status, "DONE")
+
+        detail = self.client.get(f"{self.URL}{job.id}/")
+        self.assertEqual(detail.data["status"], "DONE")
+        self.assertTrue(detail.data["download_url"].endswith(f"/reports/jobs/{job.id}/download/"))
+
+        download = self.client.get(f"{self.URL}{job.id}/download/")
+        self.assertEqual(download.status_code, 200)
+        body = b"".join(download.streaming_content).decode("utf-8-sig")
+        self.assertIn(self.invoice_number, body)
+        self.assertIn("Customer", body)
+
+    def test_missing_file_is_gone(self):
+        job = self.generate()
+        job.file.storage.delete(job.file.name)
+
+        response = self.client.get(f"{self.URL}{job.id}/download/")
+        self.assertEqual(response.status_code, 410)
+
+    def test_finished_report_is_reused(self):
+        job = self.generate()
+
+        response = self.request_report()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["id"], job.id)
+
+    def test_unrelated_writes_keep_past_reports(self):
+        jobs = {kind: self.generate(report_type=kind) for kind in ("sales", "users", "products")}
+
+        # Today's checkout, a login and an OTP-style full save
+        Order.objects.create(customer=self.customer, **SHIPPING)
+        self.customer.last_login = timezone.now()
+        self.customer.save(update_fields=["last_login"])
+        CustomUser.objects.get(pk=self.customer.pk).save()
+
+        for kind, job in jobs.items():
+            response = self.request_report(report_type=kind)
+            self.assertEqual(response.status_code, 200, kind)
+            self.assertEqual(response.data["id"], job.id, kind)
+
+    def test_order_on_a_covered_day_invalidates(self):
+        week = {"start": self.today - timedelta(days=7), "end": self.today}
+        self.generate(report_type="sales", **week)
+        self.generate(report_type="users", **week)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(customer=self.customer, **SHIPPING)
+            # Versions only move once the write commits
+            self.assertEqual(self.request_report(report_type="sales", **week).status_code, 200)
+        self.assertEqual(self.request_report(report_type="sales", **week).status_code, 202)
+        # Still pending → the confirmed-only customer report is unchanged
+        self.assertEqual(self.request_report(report_type="users", **week).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.filter(pk=order.pk).update(status="CONFIRMED")
+            order.status = "CONFIRMED"
+            order_confirmed.send(sender=Order, instance=order, previous_status="PENDING")
+        self.assertEqual(self.request_report(report_type="users", **week).status_code, 202)
+
+    def test_scoped_global_changes(self):
+        self.generate(report_type="sales")
+        self.generate(report_type="products")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.perfume.stock = 9
+            self.perfume.save()
+        self.assertEqual(self.request_report(report_type="sales").status_code, 200)
+        self.assertEqual(self.request_report(report_type="products").status_code, 202)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customer.name = "Renamed"
+            self.customer.save()
+        self.assertEqual(self.request_report(report_type="sales").status_code, 202)
+
+    def test_failed_attempt_stays_queued_until_dead_lettered(self):
+        response = self.request_report()
+        report_id = response.data["id"]
+
+        with mock.patch("products.tasks.build_export", side_effect=RuntimeError("boom")):
+            for attempt in range(2):
+                Job.objects.update(run_at=timezone.now())
+                [job] = claim_jobs("test-worker", 1)
+                self.assertFalse(run_job(job))
+
+                report = ReportJob.objects.get(id=report_id)
+                if attempt == 0:
+                    # Retry pending → a re-POST reuses this row
+                    self.assertEqual(report.status, "QUEUED")
+                    self.assertEqual(report.error, "boom")
+                    self.assertEqual(self.request_report().data["id"], report_id)
+
+        self.assertEqual(report.status, "FAILED")
+        self.assertEqual(report.error, "RuntimeError: boom")
+        self.assertEqual(self.request_report().status_code, 202)
+
+    def test_purge_superseded_and_expired(self):
+        old = self.generate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customer.name = "Renamed"
+            self.customer.save()
+        new = self.generate()
+        old_file = old.file.name
+
+        self.assertEqual(purge_reports(), (1, 0))
+        old.refresh_from_db()
+        self.assertEqual(old.file.name, "")
+        self.assertFalse(new.file.storage.exists(old_file))
+        self.assertEqual(self.client.get(f"{self.URL}{old.id}/download/").status_code, 410)
+
+        ReportJob.objects.update(created_at=timezone.now() - timedelta(days=30))
+        self.assertEqual(purge_reports(older_than_days=7), (0, 2))
+        self.assertFalse(new.file.storage.exists(new.file.name))
@@ -35,10 +35,14 @@ from .views import (
     ExportProductReportAPIView,
     UserReportAPIView,
     ExportUserReportAPIView,
+    ReportJobListCreateAPIView,
+    ReportJobDetailAPIView,
+    ReportJobDownloadAPIView,
 
     # Cart
     CartAPIView,
     CartUpdateAPIView,
+    CartSyncAPIView,
     CartRemoveAPIView,
     CartClearAPIView,
 )
@@ -101,11 +105,21 @@ urlpatterns = [
     path("users/", UserReportAPIView.as_view()),
     path("users/reports/", ExportUserReportAPIView.as_view()),
 
+    # Large exports run on the job worker
+    path("reports/jobs/", ReportJobListCreateAPIView.as_view()),
+    path("reports/jobs/<int:pk>/", ReportJobDetailAPIView.as_view()),
+    path(
+        "reports/jobs/<int:pk>/download/",
+        ReportJobDownloadAPIView.as_view(),
+        name="report-job-download",
+    ),
+
     # ==========================
     # CART
     # ==========================
     path("cart/", CartAPIView.as_view()),
     path("cart/update/", CartUpdateAPIView.as_view()),
+    path("cart/sync/", CartSyncAPIView.as_view()),
     path("cart/remove/<int:product_id>/", CartRemoveAPIView.as_view()),
     path("cart/clear/", CartClearAPIView.as_view()),
 ]
\ No newline at end of file
@@ -1,19 +1,19 @@
 # =========================
 # 📦 Standard Library
 # =========================
-from io import BytesIO
-import pandas as pd
+import os
 from datetime import date
 from decimal import Decimal
 
 # =========================
 # 🐍 Django
 # =========================
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
 from django.shortcuts import get_object_or_404
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q, F, Sum, Count, Avg, Max
 from django.db.models.functions import TruncDate
+from django.utils.cache import get_conditional_response
 from django.utils import timezone
 from django.utils.timezone import now
 
@@ -22,6 +22,7 @@ from django.utils.timezone import now
 # =========================
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
 from rest_framework.permissions import (
     AllowAny,
     IsAuthenticated,
@@ -55,6 +56,7 @@ from .models import (
     Promotion,
     Cart,
     CartItem,
+    ReportJob,
 )
 from .serializers import (
     CategorySerializer,
@@ -63,6 +65,36 @@ from .serializers import (
     CouponSerializer,
     PromotionSerializer,
     CartItemSerializer,
+    ReportJobSerializer,
+)
+from .cart import (
+    CartSyncError,
+    parse_lines,
+    apply_cart_state,
+    apply_cart_deltas,
+)
+from .pagination import (
+    AdminPerfumePagination,
+    PerfumeKeysetPagination,
+    ProductReportPagination,
+    UserReportPagination,
+)
+from .exports import export_response
+from .reports import (
+    build_export,
+    customer_report,
+    customer_report_summary,
+    product_sales,
+    product_sales_summary,
+    with_customer_metrics,
+    with_derived_metrics,
+)
+from .cache import (
+    get_catalog_version,
+    catalog_cache_key,
+    get_cached_catalog,
+    set_cached_catalog,
+    report_data_version,
 )
 from products.models import Perfume as ProductPerfume
 from products.serializers import PerfumeSerializer as ProductPerfumeSerializer
@@ -71,13 +103,15 @@ from products.serializers import PerfumeSerializer as ProductPerfumeSerializer
 # 📦 Orders
 # =========================
 from orders.models import Order, OrderItem
-
-class AdminPerfumePagination(PageNumberPagination):
-    page_size = 20
-    page_size_query_param = "page_size"
-
-
-
+from jobs.queue import enqueue
+from dashboard.models import DailySalesRollup
+from orders.utils.date_range import created_between
+from orders.utils.pricing import (
+    coupon_discount,
+    get_active_coupon,
+    best_coupon_for,
+    order_totals,
+)
 
 class AdminPerfumeListAPIView(APIView):
     permission_classes = [IsAuthenticated, CanManageProducts]
@@ -86,9 +120,13 @@ class AdminPerfumeListAPIView(APIView):
         search = request.GET.get("search", "").strip()
         category = request.GET.get("category", "all")
         status = request.GET.get("status", "all")
+        fields = PerfumeSerializer.parse_fields(request.GET.get("fields"))
 
         perfumes = Perfume.objects.all().order_by("-id")
 
+        if fields:
+            perfumes = perfumes.only(*PerfumeSerializer.only_columns(fields))
+
         if search:
             perfumes = perfumes.filter(
                 Q(name__icontains=search) |
@@ -104,12 +142,30 @@ class AdminPerfumeListAPIView(APIView):
         elif status == "inactive":
             perfumes = perfumes.filter(is_active=False)
 
+        # ✅ Keyset mode (?limit= / ?cursor=) skips COUNT(*) and OFFSET
+        if PerfumeKeysetPagination.is_requested(request):
+            paginator = PerfumeKeysetPagination()
+            page = paginator.paginate_queryset(perfumes, request, params={
+                "search": search,
+                "category": category if category != "all" else "",
+                "status": status if status != "all" else "",
+                "fields": ",".join(fields or []),
+            })
+            serializer = PerfumeSerializer(
+                page,
+                many=True,
+                fields=fields,
+                context={"request": request}
+            )
+            return Response(paginator.get_paginated_data(serializer.data))
+
         paginator = AdminPerfumePagination()
         page = paginator.paginate_queryset(perfumes, request)
 
         serializer = PerfumeSerializer(
             page,
             many=True,
+            fields=fields,
             context={"request": request}
         )
 
@@ -315,33 +371,16 @@ class ApplyBestCouponAPIView(APIView):
 
     def post(self, request):
         subtotal = Decimal(request.data.get("subtotal", 0))
-        today = date.today()
-
-        coupons = Coupon.objects.filter(
-            is_active=True
-        ).filter(
-            expiry_date__gte=today
-        ) | Coupon.objects.filter(
-            is_active=True,
-            expiry_date__isnull=True
-        )
 
-        coupons = coupons.filter(
-            min_order_value__lte=subtotal
-        ).order_by("-discount_value")
+        coupon = best_coupon_for(subtotal)
 
-        if not coupons.exists():
+        if not coupon:
             return Response({
                 "applied": False,
                 "discount": 0
             })
 
-        coupon = coupons.first()
-
-        if coupon.discount_type == "flat":
-            discount = coupon.discount_value
-        else:
-            discount = (subtotal * coupon.discount_value) / 100
+        discount = coupon_discount(coupon, subtotal)
 
         return Response({
             "applied": True,
@@ -384,42 +423,48 @@ class SalesReportAPIView(APIView):
         end_date = request.GET.get("end_date")
 
         orders = Order.objects.all()
+        # Per-day money comes from the daily rollup: cost scales with
+        # days in the range, not with orders.
+        rollup = DailySalesRollup.objects.all()
 
         if start_date and end_date:
-            orders = orders.filter(created_at__date__range=[start_date, end_date])
-
-        # ✅ KPI SUMMARY
+            orders = orders.filter(created_between(start_date, end_date))
+            rollup = rollup.filter(date__range=[start_date, end_date])
+
+        # ✅ KPI SUMMARY — one pass over the orders
+        confirmed = Q(status="CONFIRMED")
+        kpis = orders.aggregate(
+            total_orders=Count("id"),
+            completed_orders=Count("id", filter=confirmed),
+            cancelled_orders=Count("id", filter=Q(status="CANCELLED")),
+            total_revenue=Sum("total_amount", filter=confirmed),
+            average_order_value=Avg("total_amount", filter=confirmed),
+        )
         summary = {
-            "total_orders": orders.count(),
-            "completed_orders": orders.filter(status="CONFIRMED").count(),
-            "cancelled_orders": orders.filter(status="CANCELLED").count(),
-            "total_revenue": orders.filter(status="CONFIRMED")
-                .aggregate(total=Sum("total_amount"))["total"] or 0,
-            "average_order_value": orders.filter(status="CONFIRMED")
-                .aggregate(avg=Avg("total_amount"))["avg"] or 0,
+            "total_orders": kpis["total_orders"],
+            "completed_orders": kpis["completed_orders"],
+            "cancelled_orders": kpis["cancelled_orders"],
+            "total_revenue": kpis["total_revenue"] or 0,
+            "average_order_value": kpis["average_order_value"] or 0,
         }
 
-        # ✅ DAILY SALES
-        daily_sales = (
-            orders.filter(status="CONFIRMED")
-            .annotate(date=TruncDate("created_at"))
-            .values("date")
-            .annotate(
-                total_orders=Count("id"),
-                total_amount=Sum("total_amount")
-            )
-            .order_by("-date")
-        )
-
-        # ✅ PAYMENT MODE SPLIT
-        payment_split = (
-            orders.filter(status="CONFIRMED")
-            .values("payment_mode")
-            .annotate(
-                total_orders=Count("id"),
-                total_amount=Sum("total_amount")
-            )
-        )
+        # ✅ DAILY SALES + PAYMENT MODE SPLIT — rollup rows are already
+        # grouped by (date, payment_mode); fold them both ways in one read
+        by_date = {}
+        by_mode = {}
+        for row in rollup.values("date", "payment_mode", "orders", "revenue"):
+            for groups, key, value in (
+                (by_date, "date", row["date"]),
+                (by_mode, "payment_mode", row["payment_mode"]),
+            ):
+                bucket = groups.setdefault(
+                    value, {key: value, "total_orders": 0, "total_amount": 0}
+                )
+                bucket["total_orders"] += row["orders"]
+                bucket["total_amount"] += row["revenue"]
+
+        daily_sales = [by_date[d] for d in sorted(by_date, reverse=True)]
+        payment_split = [by_mode[m] for m in sorted(by_mode)]
 
         return Response({
             "summary": summary,
@@ -439,60 +484,26 @@ class ProductReportAPIView(APIView):
         start_date = request.GET.get("start_date")
         end_date = request.GET.get("end_date")
 
-        items = OrderItem.objects.select_related("perfume", "order")
-
-        if start_date and end_date:
-            items = items.filter(
-                order__created_at__date__range=[start_date, end_date]
-            )
-
-        report = {}
-
-        for item in items:
-            p = item.perfume
-            key = p.id
-
-            if key not in report:
-                report[key] = {
-                    "product_id": p.id,
-                    "product": p.name,
-                    "sold_qty": 0,
-                    "revenue": 0,
-                    "profit": 0,
-                    "stock": p.stock,
-                }
-
-            revenue = item.price * item.quantity
-            profit = (item.price - p.cost_price) * item.quantity
-
-            report[key]["sold_qty"] += item.quantity
-            report[key]["revenue"] += revenue
-            report[key]["profit"] += profit
+        # Aggregated in SQL: memory is O(products), not O(order lines)
+        rows = product_sales(start_date, end_date)
+        summary = product_sales_summary(rows)
 
-        # Convert + calculate derived metrics
-        data = []
-        for r in report.values():
-            avg_price = r["revenue"] / r["sold_qty"] if r["sold_qty"] else 0
-            margin = (r["profit"] / r["revenue"] * 100) if r["revenue"] else 0
+        top = request.GET.get("top")
+        if top and top.isdigit():
+            rows = rows[:int(top)]
 
-            r["avg_price"] = round(avg_price, 2)
-            r["margin"] = round(margin, 2)
-            data.append(r)
-
-        # Sort by BEST selling
-        data.sort(key=lambda x: x["sold_qty"], reverse=True)
-
-        # KPI summary
-        summary = {
-            "total_revenue": round(sum(d["revenue"] for d in data), 2),
-            "total_units": sum(d["sold_qty"] for d in data),
-            "total_profit": round(sum(d["profit"] for d in data), 2),
-            "top_product": data[0]["product"] if data else None,
-        }
+        if "page" in request.GET:
+            paginator = ProductReportPagination()
+            page = paginator.paginate_queryset(rows, request, view=self)
+            response = paginator.get_paginated_response(
+                [with_derived_metrics(r) for r in page]
+            )
+            response.data["summary"] = summary
+            return response
 
         return Response({
             "summary": summary,
-            "products": data
+            "products": [with_derived_metrics(r) for r in rows]
         })
 
 
@@ -504,55 +515,22 @@ class UserReportAPIView(APIView):
         start_date = request.GET.get("start_date")
         end_date = request.GET.get("end_date")
 
-        order_filter = Q()
-
-        if start_date and end_date:
-            order_filter &= Q(
-                orders__created_at__date__range=[start_date, end_date]
-            )
+        # Sorted, summed and paged in SQL — never the whole table in Python
+        rows = customer_report(start_date, end_date)
+        summary = customer_report_summary(rows)
 
-        users = (
-            CustomUser.objects
-            .filter(is_staff=False, is_superuser=False)
-            .annotate(
-                total_orders=Count("orders", filter=order_filter),
-                total_spent=Sum("orders__total_amount", filter=order_filter),
-                last_order=Max("orders__created_at", filter=order_filter),
+        if "page" in request.GET:
+            paginator = UserReportPagination()
+            page = paginator.paginate_queryset(rows, request, view=self)
+            response = paginator.get_paginated_response(
+                [with_customer_metrics(r) for r in page]
             )
-        )
-
-        report = []
-        for u in users:
-            total_orders = u.total_orders or 0
-            total_spent = u.total_spent or 0
-            aov = total_spent / total_orders if total_orders else 0
-
-            report.append({
-                "id": u.id,
-                "name": u.name,
-                "email": u.email,
-                "total_orders": total_orders,
-                "total_spent": round(total_spent, 2),
-                "average_order_value": round(aov, 2),
-                "last_order": u.last_order,
-                "customer_type": "Returning" if total_orders > 1 else "One-time",
-            })
-
-        report.sort(key=lambda x: x["total_spent"], reverse=True)
-
-        summary = {
-            "total_users": len(report),          # ✅ frontend safe
-            "total_customers": len(report),      # ✅ business term
-            "total_revenue": round(sum(u["total_spent"] for u in report), 2),
-            "repeat_customers": sum(
-                1 for u in report if u["customer_type"] == "Returning"
-            ),
-            "top_customer": report[0]["name"] if report else None,
-        }
+            response.data["summary"] = summary
+            return response
 
         return Response({
             "summary": summary,
-            "users": report
+            "users": [with_customer_metrics(r) for r in rows]
         })
 
 
@@ -572,54 +550,8 @@ class ExportUserReportAPIView(APIView):
                 status=400
             )
 
-        # ✅ ONLY CUSTOMERS (exclude admin & staff)
-        users = CustomUser.objects.filter(
-            is_superuser=False,
-            is_staff=False
-        )
-
-        data = []
-
-        for user in users:
-            orders = Order.objects.filter(
-                customer=user,
-                created_at__date__range=[start_date, end_date]
-            ).order_by("-created_at")
-
-            if not orders.exists():
-                continue  # skip users with no orders
-
-            total_spent = sum(o.total_amount for o in orders)
-            last_order = orders.first()
-
-            data.append({
-                "Customer Name": user.name,
-                "Email": user.email,
-                "Total Orders": orders.count(),
-                "Total Spent (₹)": float(total_spent),
-                "Last Order Date": last_order.created_at.strftime("%d-%m-%Y"),  # ✅ FIX
-            })
-
-        df = pd.DataFrame(data)
-
-        output = BytesIO()
-        df.to_excel(
-            output,
-            index=False,
-            engine="openpyxl"
-        )
-
-        response = HttpResponse(
-            output.getvalue(),
-            content_type=(
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        )
-        response["Content-Disposition"] = (
-            f'attachment; filename="customer_report_{start_date}_to_{end_date}.xlsx"'
-        )
-
-        return response
+        rows, columns, title, filename = build_export("users", start_date, end_date)
+        return export_response(request, rows, columns, filename, title=title)
 
 
 
@@ -637,40 +569,8 @@ class ExportSalesReportAPIView(APIView):
                 status=400
             )
 
-        orders = Order.objects.filter(
-            created_at__date__range=[start_date, end_date]
-        ).select_related("customer")
-
-        data = []
-        for o in orders:
-            data.append({
-                "Order ID": o.invoice_number,  # better than o.id
-                "Customer": o.customer.full_name() or o.customer.name,
-                "Date": o.created_at.strftime("%d-%m-%Y"),  # ✅ FIX HERE
-                "Amount (₹)": float(o.total_amount),
-                "Payment Mode": o.payment_mode,
-            })
-
-        df = pd.DataFrame(data)
-
-        output = BytesIO()
-        df.to_excel(
-            output,
-            index=False,
-            engine="openpyxl"
-        )
-
-        response = HttpResponse(
-            output.getvalue(),
-            content_type=(
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            ),
-        )
-        response["Content-Disposition"] = (
-            f'attachment; filename="sales_report_{start_date}_to_{end_date}.xlsx"'
-        )
-
-        return response
+        rows, columns, title, filename = build_export("sales", start_date, end_date)
+        return export_response(request, rows, columns, filename, title=title)
 
     
 class ExportProductReportAPIView(APIView):
@@ -683,36 +583,70 @@ class ExportProductReportAPIView(APIView):
         if not start_date or not end_date:
             return HttpResponse("Date range required", status=400)
 
-        data = []
+        rows, columns, title, filename = build_export("products", start_date, end_date)
+        return export_response(request, rows, columns, filename, title=title)
 
-        for product in Perfume.objects.all():
-            items = OrderItem.objects.filter(
-                perfume=product,
-                order__created_at__date__range=[start_date, end_date]
-            )
 
-            data.append({
-                "Product": product.name,
-                "Sold Qty": sum(i.quantity for i in items),
-                "Revenue": sum(i.total_amount for i in items),
-                "Stock": product.stock,
-            })
 
-        df = pd.DataFrame(data)
 
-        output = BytesIO()
-        df.to_excel(output, index=False, engine="openpyxl")
+# =====================================
+# 📊 BACKGROUND REPORT JOBS
+# =====================================
+class ReportJobListCreateAPIView(APIView):
+    """
+    POST queues a report for the job worker (202), or returns the finished
+    job for the same type / range / output / data version (200).
+    """
+    permission_classes = [IsAdminUser]
 
-        response = HttpResponse(
-            output.getvalue(),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response["Content-Disposition"] = (
-            f'attachment; filename="product_report_{start_date}_to_{end_date}.xlsx"'
+    def get(self, request):
+        jobs = ReportJob.objects.filter(requested_by=request.user).order_by("-id")[:20]
+        return Response(ReportJobSerializer(jobs, many=True, context={"request": request}).data)
+
+    def post(self, request):
+        serializer = ReportJobSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+
+        data = serializer.validated_data
+        version = report_data_version(data["report_type"], data["start_date"], data["end_date"])
+        existing = (
+            ReportJob.objects
+            .filter(data_version=version, **serializer.validated_data)
+            .exclude(status="FAILED")
+            .order_by("-id")
+            .first()
         )
-        return response
+        if existing and (existing.status != "DONE" or existing.file.storage.exists(existing.file.name)):
+            return Response(ReportJobSerializer(existing, context={"request": request}).data)
 
+        with transaction.atomic():
+            job = serializer.save(data_version=version, requested_by=request.user)
+            enqueue("reports.generate", max_attempts=2, report_job_id=job.id)
 
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class ReportJobDetailAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, pk):
+        job = get_object_or_404(ReportJob, pk=pk)
+        return Response(ReportJobSerializer(job, context={"request": request}).data)
+
+
+class ReportJobDownloadAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, pk):
+        job = get_object_or_404(ReportJob, pk=pk, status="DONE")
+        if not job.file or not job.file.storage.exists(job.file.name):
+            return Response({"error": "Report file no longer available"}, status=410)
+
+        return FileResponse(
+            job.file.open("rb"),
+            as_attachment=True,
+            filename=os.path.basename(job.file.name),
+        )
 
 
 class PublicPerfumeListAPIView(APIView):
@@ -720,18 +654,63 @@ class PublicPerfumeListAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        queryset = Perfume.objects.filter(is_active=True)
-
-        category = request.GET.get("category")
-        if category:
-            queryset = queryset.filter(category__iexact=category)
-
-        serializer = PerfumeSerializer(
-            queryset,
-            many=True,
-            context={"request": request}
+        category = request.GET.get("category", "").strip().lower()
+        fields = PerfumeSerializer.parse_fields(request.GET.get("fields"))
+        paginate = PerfumeKeysetPagination.is_requested(request)
+
+        # ✅ Serve pre-rendered JSON for the current catalog version
+        version = get_catalog_version()
+        key = catalog_cache_key(
+            request,
+            version,
+            category=category,
+            fields=",".join(fields or []),
+            cursor=request.GET.get("cursor", "") if paginate else "",
+            limit=request.GET.get("limit", "") if paginate else "",
         )
-        return Response(serializer.data)
+        cached = get_cached_catalog(key)
+
+        if cached is None:
+            queryset = Perfume.objects.filter(is_active=True)
+            if category:
+                queryset = queryset.filter(category__iexact=category)
+            if fields:
+                queryset = queryset.only(*PerfumeSerializer.only_columns(fields))
+
+            if paginate:
+                paginator = PerfumeKeysetPagination()
+                page = paginator.paginate_queryset(queryset, request, params={
+                    "category": category,
+                    "fields": ",".join(fields or []),
+                })
+                data = PerfumeSerializer(
+                    page,
+                    many=True,
+                    fields=fields,
+                    context={"request": request}
+                ).data
+                data = paginator.get_paginated_data(data)
+            else:
+                data = PerfumeSerializer(
+                    queryset,
+                    many=True,
+                    fields=fields,
+                    context={"request": request}
+                ).data
+
+            body = JSONRenderer().render(data)
+            cached = set_cached_catalog(key, body)
+
+        etag, body = cached
+
+        # 304 when any If-None-Match tag (weakly) equals ours
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type="application/json")
+
+        response["ETag"] = etag
+        response["Cache-Control"] = "public, max-age=0, must-revalidate"
+        return response
 
 
 
@@ -866,18 +845,70 @@ class TogglePromotionStatus(APIView):
 
 
 
+def cart_items_data(cart, request, items=None):
+    if items is None:
+        items = cart.items.select_related("perfume")
+    serializer = CartItemSerializer(
+        items,
+        many=True,
+        context={"request": request}   # 🔥 REQUIRED
+    )
+    return serializer.data
+
+
+def cart_totals_data(items, coupon_code=None):
+    """
+    Server-computed totals with the same math as CreateRazorpayOrderView.
+    Inactive perfumes are left out (checkout rejects them) and listed
+    under "unavailable"; without an explicit coupon code the best
+    applicable coupon is applied.
+    """
+    available = [item for item in items if item.perfume.is_active]
+    lines = [(item.perfume.final_price, item.quantity) for item in available]
+    subtotal = sum((price * qty for price, qty in lines), Decimal("0.00"))
+
+    if coupon_code:
+        coupon = get_active_coupon(coupon_code)
+    else:
+        coupon = best_coupon_for(subtotal) if lines else None
+
+    discount = coupon_discount(coupon, subtotal)
+    totals = order_totals(lines, discount)
+
+    return {
+        "coupon": coupon.code if coupon and discount > 0 else None,
+        "unavailable": [item.perfume_id for item in items if not item.perfume.is_active],
+        "totals": {
+            key: float(round(value, 2)) for key, value in totals.items()
+        },
+    }
+
+
+def cart_response(cart, request, with_totals=False, coupon_code=None):
+    """
+    The cart item list (unchanged shape). With ?with_totals=1 it is
+    {items, coupon, unavailable, totals} instead.
+    """
+    items = list(cart.items.select_related("perfume"))
+    data = cart_items_data(cart, request, items)
+
+    if not with_totals:
+        return data
+    return {"items": data, **cart_totals_data(items, coupon_code)}
+
+
+def wants_totals(request):
+    return request.GET.get("with_totals") in ("1", "true")
+
+
 class CartAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         cart, _ = Cart.objects.get_or_create(user=request.user)
-        items = cart.items.all()
-        serializer = CartItemSerializer(
-            items,
-            many=True,
-            context={"request": request}   # 🔥 REQUIRED
+        return Response(
+            cart_response(cart, request, wants_totals(request), request.GET.get("coupon"))
         )
-        return Response(serializer.data)
 
 
     def post(self, request):
@@ -940,6 +971,50 @@ class CartUpdateAPIView(APIView):
         return Response({"message": "Updated"})
 
 
+class CartSyncAPIView(APIView):
+    """
+    Apply a whole batch of cart changes in one request / one transaction.
+
+    Full state:  {"items":  [{"perfume": 3, "quantity": 2}, ...]}
+    Deltas:      {"deltas": [{"perfume": 3, "delta": -1}, ...]}
+
+    Returns {"items": [...], "removed": [perfume ids]} — "removed" lists
+    lines dropped because their perfume was deactivated. ?with_totals=1
+    adds coupon / unavailable / totals as in CartAPIView.get.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not isinstance(request.data, dict):
+            return Response({"error": "Expected a JSON object"}, status=400)
+
+        items = request.data.get("items")
+        deltas = request.data.get("deltas")
+
+        if (items is None) == (deltas is None):
+            return Response(
+                {"error": "Send either items or deltas"},
+                status=400
+            )
+
+        removed = []
+        try:
+            with transaction.atomic():
+                cart, _ = Cart.objects.get_or_create(user=request.user)
+
+                if items is not None:
+                    removed = apply_cart_state(cart, parse_lines(items, "quantity"))
+                else:
+                    apply_cart_deltas(cart, parse_lines(deltas, "delta"))
+        except CartSyncError as e:
+            return Response({"error": str(e)}, status=400)
+
+        data = cart_response(cart, request, wants_totals(request), request.data.get("coupon"))
+        if not isinstance(data, dict):
+            data = {"items": data}
+        return Response({**data, "removed": removed})
+
+
 class CartRemoveAPIView(APIView):
     permission_classes = [IsAuthenticated]
 